@@ -0,0 +1,213 @@
+"""
+Almacén incremental del dataset procesado
+
+Las actualizaciones diarias (un CSV con licitaciones nuevas o modificadas) se agregan
+sin reprocesar el histórico:
+- Solo se enriquecen las filas nuevas o cuyo contenido cambió (p. ej. un cambio de Estado),
+  identificadas por IDLicitacion
+- Cada actualización se guarda como una parte Parquet más; gana la última versión de cada ID
+- El cubo se actualiza restando la contribución de las filas reemplazadas y sumando la de las nuevas
+- El almacén guarda la versión del procesamiento (código, tabla de la UTM, pesos constantes);
+  con otra versión no se abre, porque mezclaría montos calculados de dos formas
+
+Uso desde la línea de comandos:
+    python -m almacen --directorio datos_almacen actualizacion_2024-06-01.csv
+"""
+import argparse
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import procesamiento
+from cache_disco import VERSION_PROCESAMIENTO
+from cubo import DIMENSIONES, actualizar_cubo, construir_cubo
+from ingesta import deduplicar
+
+# Directorio del almacén; vacío lo desactiva y el dashboard carga los CSV completos
+DIRECTORIO_ALMACEN = os.environ.get('LICITACIONES_ALMACEN_DIR', '')
+
+# Columnas que se mantienen en memoria para clasificar y descontar las filas de cada actualización
+COLUMNAS_CLAVE = ['IDLicitacion', 'HuellaFila', *DIMENSIONES, 'Monto_CLP_Millones']
+
+
+def huella_filas(df):
+    """Hash de cada fila tal como viene en el CSV, independiente del orden de las columnas"""
+    columnas = sorted(df.columns)
+    return pd.util.hash_pandas_object(df[columnas].astype(str), index=False).to_numpy()
+
+
+def identificadores(df, huellas):
+    """
+    Clave de cada fila en el almacén: su IDLicitacion o, si no tiene, su huella
+    - Una fila sin ID solo se reconoce cuando vuelve idéntica; si cambia, cuenta como nueva
+    """
+    ids = df['IDLicitacion'].astype(object).to_numpy(copy=True)
+    sin_id = pd.isna(ids)
+    ids[sin_id] = [f'#{huella:016x}' for huella in np.asarray(huellas)[sin_id]]
+    return ids
+
+
+class Almacen:
+    """
+    Partes Parquet del dataset procesado más el cubo persistido
+    - claves: una fila por IDLicitacion vigente, con lo necesario para descontarla del cubo
+    - df: dataset completo; se arma al pedirlo y se invalida con cada actualización
+    """
+
+    def __init__(self, directorio=DIRECTORIO_ALMACEN):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        self._comprobar_version()
+        self._lock = threading.Lock()
+        self._df = None
+        self.claves = self._leer_claves()
+        self.cubo = self._leer_cubo()
+
+    @property
+    def partes(self):
+        return sorted(glob.glob(os.path.join(self.directorio, 'parte-*.parquet')))
+
+    @property
+    def vacio(self):
+        return not self.partes
+
+    @property
+    def _ruta_version(self):
+        return os.path.join(self.directorio, 'version.txt')
+
+    def _comprobar_version(self):
+        """
+        Un almacén con partes debe venir de la versión actual del procesamiento
+        - Si es de otra versión (o no la registra) lanza RuntimeError: hay que recrearlo
+          aplicando los CSV en un directorio vacío
+        """
+        if self.vacio:
+            return
+        try:
+            with open(self._ruta_version, encoding='utf-8') as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            version = None
+        if version != VERSION_PROCESAMIENTO:
+            raise RuntimeError(f"El almacén {self.directorio} se creó con otra versión del procesamiento "
+                               f"({version or 'sin registrar'}, actual {VERSION_PROCESAMIENTO}); "
+                               f"vuelve a crearlo aplicando los CSV en un directorio vacío")
+
+    def _ruta_cubo(self, partes):
+        return os.path.join(self.directorio, f'cubo-{partes:06d}.parquet')
+
+    def _leer_claves(self):
+        frames = [pd.read_parquet(parte, columns=COLUMNAS_CLAVE) for parte in self.partes]
+        claves = deduplicar(procesamiento.concatenar(frames)) if frames else pd.DataFrame(columns=COLUMNAS_CLAVE)
+        return self._indexar(claves)
+
+    @staticmethod
+    def _indexar(claves):
+        """Índice por clave de fila (IDLicitacion o huella de las filas sin ID); gana la última aparición"""
+        claves = claves.set_index(pd.Index(identificadores(claves, claves['HuellaFila']), dtype=object))
+        return claves[~claves.index.duplicated(keep='last')]
+
+    def _leer_cubo(self):
+        """Cubo persistido para las partes actuales; si falta (o quedó atrás) se reconstruye"""
+        partes = len(self.partes)
+        if not partes:
+            return None
+        try:
+            return procesamiento.compactar(pd.read_parquet(self._ruta_cubo(partes)))
+        except (FileNotFoundError, OSError):
+            cubo = construir_cubo(self.df)
+            self._guardar_cubo(cubo, partes)
+            return cubo
+
+    def _guardar_cubo(self, cubo, partes):
+        ruta = self._ruta_cubo(partes)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        cubo.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+        for anterior in glob.glob(os.path.join(self.directorio, 'cubo-*.parquet')):
+            if anterior != ruta:
+                os.remove(anterior)
+
+    @property
+    def df(self):
+        """Dataset vigente: todas las partes, quedándose con la última versión de cada ID"""
+        if self._df is None:
+            frames = [pd.read_parquet(parte, memory_map=True) for parte in self.partes]
+            df = procesamiento.compactar(procesamiento.concatenar(frames)) if frames else pd.DataFrame()
+            self._df = procesamiento.congelar(deduplicar(df).drop(columns='HuellaFila', errors='ignore'))
+        return self._df
+
+    def aplicar_delta(self, origen):
+        """
+        Incorpora un CSV de licitaciones nuevas o actualizadas
+        - Se lee como texto, igual que la ingesta por bloques: '01' no se guarda como 1
+        - Las filas idénticas a las ya guardadas se ignoran (también las que no tienen IDLicitacion)
+        - Devuelve un resumen con la cantidad de filas nuevas, actualizadas y sin cambios
+        """
+        inicio = time.perf_counter()
+        delta = procesamiento.leer_csv(origen, dtype=str)
+        huellas = huella_filas(delta)
+        claves = identificadores(delta, huellas)
+        unicas = ~pd.Index(claves).duplicated(keep='last')
+        delta, huellas, claves = delta[unicas].reset_index(drop=True), huellas[unicas], claves[unicas]
+
+        with self._lock:
+            posiciones = self.claves.index.get_indexer(claves)
+            existentes = posiciones >= 0
+            iguales = existentes.copy()
+            iguales[existentes] = self.claves['HuellaFila'].to_numpy()[posiciones[existentes]] == huellas[existentes]
+            procesar = ~iguales
+            resumen = {
+                'nuevas': int((~existentes).sum()),
+                'actualizadas': int((existentes & procesar).sum()),
+                'sin_cambios': int(iguales.sum()),
+            }
+
+            if procesar.any():
+                nuevas = procesamiento.enriquecer(delta[procesar].reset_index(drop=True))
+                nuevas['HuellaFila'] = huellas[procesar]
+                retiradas = self.claves.iloc[posiciones[existentes & procesar]].reset_index(drop=True)
+
+                partes = len(self.partes) + 1
+                if partes == 1:
+                    with open(self._ruta_version, 'w', encoding='utf-8') as f:
+                        f.write(VERSION_PROCESAMIENTO)
+                nuevas.to_parquet(os.path.join(self.directorio, f'parte-{partes:06d}.parquet'), index=False)
+                self.cubo = actualizar_cubo(self.cubo, nuevas) if self.cubo is not None else construir_cubo(nuevas)
+                if not retiradas.empty:
+                    self.cubo = actualizar_cubo(self.cubo, retiradas=retiradas)
+                self._guardar_cubo(self.cubo, partes)
+
+                vigentes = np.ones(len(self.claves), dtype=bool)
+                vigentes[posiciones[existentes & procesar]] = False
+                vigentes = self.claves[vigentes]
+                self.claves = self._indexar(procesamiento.concatenar([vigentes.reset_index(drop=True),
+                                                                      nuevas[COLUMNAS_CLAVE]]))
+                self._df = None
+
+        resumen['segundos'] = time.perf_counter() - inicio
+        return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archivos', nargs='+', help='CSV de actualización, en orden cronológico')
+    parser.add_argument('--directorio', default=DIRECTORIO_ALMACEN or 'almacen_licitaciones')
+    args = parser.parse_args()
+
+    try:
+        almacen = Almacen(args.directorio)
+    except RuntimeError as e:
+        parser.error(str(e))
+    for archivo in args.archivos:
+        resumen = almacen.aplicar_delta(archivo)
+        print(f"{os.path.basename(archivo)}: {resumen['nuevas']:,} nuevas, {resumen['actualizadas']:,} actualizadas, "
+              f"{resumen['sin_cambios']:,} sin cambios ({resumen['segundos']:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
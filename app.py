@@ -1,13 +1,24 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import re
 from datetime import datetime
 import warnings
 import os  # Añadido para verificar existencia de archivos
+import time
+from contextlib import contextmanager
+from cache_disco import cargar_con_cache
+from cache_datos import DATOS, clave_datos, huella_origen
+from cache_figuras import FIGURAS, clave_figura
+import graficos
+from exportacion import FORMATOS, exportar, formatos_disponibles
+from almacen import DIRECTORIO_ALMACEN, Almacen
+from ingesta import DIRECTORIO_DATOS, archivos_de_directorio, cargar_varios
+from cubo import MESES_ABREVIADOS
+from muestreo import PRESUPUESTO_FIGURA_BYTES, modo_render, reducir_serie
+from tablero import crear_tablero
+from trazas import TRAZAS_POR_DEFECTO, Traza, activar, etapa
 warnings.filterwarnings('ignore')
 
 # Configuración de la página - DEBE SER EL PRIMER COMANDO DE STREAMLIT
@@ -18,6 +29,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Traza de esta ejecución si el panel de diagnóstico está activo
+traza = Traza() if st.session_state.get('diagnostico', TRAZAS_POR_DEFECTO) else None
+activar(traza)
+
 # Título y descripción principal
 st.title("🗑️ Analizador de Licitaciones de Residuos Peligrosos")
 st.markdown("""
@@ -29,27 +44,94 @@ st.markdown("""
 
 # --- FUNCIONES DE PROCESAMIENTO ---
 
-@st.cache_data
-def cargar_y_procesar_datos(uploaded_file=None):
+# Tamaño de página de la tabla de detalle (configurable con LICITACIONES_FILAS_POR_PAGINA)
+OPCIONES_FILAS_POR_PAGINA = [25, 50, 100, 250, 500]
+FILAS_POR_PAGINA = int(os.environ.get('LICITACIONES_FILAS_POR_PAGINA', '100'))
+if FILAS_POR_PAGINA not in OPCIONES_FILAS_POR_PAGINA:
+    OPCIONES_FILAS_POR_PAGINA = sorted(OPCIONES_FILAS_POR_PAGINA + [FILAS_POR_PAGINA])
+
+# Medidas disponibles para la concentración del mercado (etiqueta -> medida del cubo)
+MEDIDAS_CONCENTRACION = {"Licitaciones": "Licitaciones", "Monto": "Monto"}
+
+# Nombre del archivo por defecto
+ARCHIVO_POR_DEFECTO = 'ListaLicitaciones_filtrado_residuos_peligrosos_retiro_traslado.csv'
+
+@st.cache_resource
+def abrir_almacen():
+    """
+    Almacén incremental (LICITACIONES_ALMACEN_DIR), compartido entre sesiones
+    - Si está vacío se inicializa con los CSV del directorio de datos o con el archivo base
+    """
+    almacen = Almacen(DIRECTORIO_ALMACEN)
+    if almacen.vacio:
+        iniciales = archivos_de_directorio(DIRECTORIO_DATOS) if DIRECTORIO_DATOS else []
+        if not iniciales and os.path.exists(ARCHIVO_POR_DEFECTO):
+            iniciales = [ARCHIVO_POR_DEFECTO]
+        for archivo in iniciales:
+            almacen.aplicar_delta(archivo)
+    return almacen
+
+def huella_subida(archivo):
+    """Huella del contenido de un archivo subido; se calcula una vez por archivo y sesión"""
+    huellas = st.session_state.setdefault('huellas_subidas', {})
+    if archivo.file_id not in huellas:
+        huellas[archivo.file_id] = huella_origen(archivo)
+    return huellas[archivo.file_id]
+
+def cargar_y_procesar_datos(uploaded_files=None):
     """
-    Carga y procesa los datos del archivo CSV
-    - Si hay archivo subido, usa ese
+    Carga y procesa los datos de uno o varios archivos CSV
+    - Si hay archivos subidos, usa esos (varios se procesan en paralelo y se unen)
+    - Si no, usa el almacén incremental si LICITACIONES_ALMACEN_DIR está configurado
+    - Si no, usa los CSV de LICITACIONES_DIRECTORIO_DATOS si está configurado
     - Si no, busca el archivo por defecto en el repositorio
+    - Los datasets procesados quedan en el cache compartido DATOS, con clave por contenido
+    - Devuelve (df, clave, reporte, mensaje): clave identifica el dataset compartido y
+      reporte tiene métricas por archivo cuando se cargan varios
     """
-    # Nombre del archivo por defecto
-    archivo_por_defecto = 'ListaLicitaciones_filtrado_residuos_peligrosos_retiro_traslado.csv'
+    archivo_por_defecto = ARCHIVO_POR_DEFECTO
+    clave = None
+    reporte = None
+    mensaje = None
+    archivos_directorio = archivos_de_directorio(DIRECTORIO_DATOS) if DIRECTORIO_DATOS else []
     
-    if uploaded_file is not None:
+    if uploaded_files and len(uploaded_files) == 1:
         # Caso 1: Usuario subió un archivo
-        df = pd.read_csv(uploaded_file, sep=';', encoding='utf-8')
-        st.sidebar.success("✅ Archivo cargado manualmente")
+        clave = huella_subida(uploaded_files[0])
+        df, _ = DATOS.obtener(clave, lambda: (cargar_con_cache(uploaded_files[0], clave), None))
+        mensaje = "✅ Archivo cargado manualmente"
+    
+    elif uploaded_files:
+        # Caso 2: Usuario subió varios archivos (por año o por mes)
+        clave = clave_datos([huella_subida(archivo) for archivo in uploaded_files])
+        df, reporte = DATOS.obtener(clave, lambda: cargar_varios(uploaded_files))
+        mensaje = f"✅ {len(uploaded_files)} archivos cargados: {len(df)} licitaciones únicas"
+    
+    elif DIRECTORIO_ALMACEN:
+        # Caso 3: Almacén incremental con las actualizaciones diarias ya aplicadas
+        try:
+            almacen = abrir_almacen()
+        except RuntimeError as e:
+            st.sidebar.error(f"❌ {e}")
+            df = pd.DataFrame()
+        else:
+            clave = f"almacen-{len(almacen.partes)}"
+            df, _ = DATOS.obtener(clave, lambda: (almacen.df, None), en_disco=False)
+            mensaje = f"✅ Almacén cargado: {len(df)} licitaciones en {len(almacen.partes)} partes"
+    
+    elif archivos_directorio:
+        # Caso 4: Directorio de datos configurado en el servidor
+        clave = clave_datos([huella_origen(archivo) for archivo in archivos_directorio])
+        df, reporte = DATOS.obtener(clave, lambda: cargar_varios(archivos_directorio))
+        mensaje = f"✅ {len(archivos_directorio)} archivos del directorio de datos: {len(df)} licitaciones únicas"
         
     else:
-        # Caso 2: Intentar cargar archivo por defecto del repositorio
+        # Caso 5: Intentar cargar archivo por defecto del repositorio
         if os.path.exists(archivo_por_defecto):
             try:
-                df = pd.read_csv(archivo_por_defecto, sep=';', encoding='utf-8')
-                st.sidebar.success(f"✅ Archivo base cargado: {len(df)} licitaciones")
+                clave = huella_origen(archivo_por_defecto)
+                df, _ = DATOS.obtener(clave, lambda: (cargar_con_cache(archivo_por_defecto), None))
+                mensaje = f"✅ Archivo base cargado: {len(df)} licitaciones"
             except Exception as e:
                 st.sidebar.error(f"❌ Error al cargar archivo por defecto: {e}")
                 df = pd.DataFrame()
@@ -64,143 +146,39 @@ def cargar_y_procesar_datos(uploaded_file=None):
     # Si no hay datos, mostrar advertencia
     if df.empty:
         st.warning("⚠️ No hay datos para procesar. Por favor, sube un archivo CSV válido.")
-        return df
-    
-    # Limpieza y procesamiento
-    df['FechaPublicacion'] = pd.to_datetime(df['FechaPublicacion'], format='%d/%m/%Y %H:%M:%S', errors='coerce')
-    df['Año'] = df['FechaPublicacion'].dt.year
-    df['Mes'] = df['FechaPublicacion'].dt.month
-    df['MesNombre'] = df['FechaPublicacion'].dt.month_name().str[:3]
-    df['Trimestre'] = df['FechaPublicacion'].dt.quarter
-    df['Año-Mes'] = df['FechaPublicacion'].dt.to_period('M').astype(str)
     
-    # Extraer región
-    df['Region'] = df['Organismo'].apply(extraer_region)
-    
-    # Categorizar organismo
-    df['CategoriaOrganismo'] = df['Organismo'].apply(categorizar_organismo)
-    
-    # Procesar montos
-    df['Monto_Numérico_CLP'] = df['MontoLicitacion'].apply(extraer_monto_numerico)
-    df['Monto_CLP_Millones'] = df['Monto_Numérico_CLP'] / 1_000_000
-    df['Tipo_Monto_Categoria'] = df['MontoLicitacion'].apply(clasificar_tipo_monto)
-    df['Monto_UTM_Estimado'] = df['MontoLicitacion'].apply(extraer_utm)
-    
-    return df
+    return df, clave, reporte, mensaje
 
-def extraer_region(organismo):
-    """Extrae la región del nombre del organismo"""
-    organismo_str = str(organismo).upper()
-    
-    regiones = {
-        'Metropolitana': ['METROPOLITANA', 'SANTIAGO', 'MAIPU', 'SAN RAMON', 'RENCA', 'PROVIDENCIA', 
-                         'LAS CONDES', 'NUNOA', 'LA CISTERNA', 'VITACURA', 'LO ESPEJO', 'CERRO NAVIA',
-                         'CONCHALI', 'MACUL', 'LA REINA', 'PEÑAFLOR', 'EL MONTE', 'PAINE'],
-        'Valparaíso': ['VALPARAISO', 'SAN FELIPE', 'VIÑA DEL MAR', 'QUILPUE', 'CARTAGENA', 'SAN ANTONIO',
-                      'LOS ANDES', 'QUILLOTA', 'ZAPALLAR', 'NOGALES', 'LA LIGUA', 'PUCHUNCAVI',
-                      'SAN ESTEBAN', 'CALLE LARGA', 'QUINTA DE TILCOCO', 'LIMACHE', 'SANTA MARIA'],
-        'Biobío': ['BIO BIO', 'CONCEPCIÓN', 'TALCAHUANO', 'LOS ANGELES', 'CHIGUAYANTE', 'SAN PEDRO DE LA PAZ',
-                  'CORONEL', 'LOTA', 'CURANILAHUE', 'MULCHEN', 'NACIMIENTO', 'YUNGAY', 'CABRERO'],
-        'La Araucanía': ['ARAUCANIA', 'TEMUCO', 'ANGOL', 'VICTORIA', 'LAUTARO', 'NUEVA IMPERIAL',
-                        'VILCUN', 'CUNCO', 'GORBEA', 'CURACAUTIN', 'LUMACO', 'CHOLCHOL'],
-        'Los Lagos': ['LOS LAGOS', 'PUERTO MONTT', 'OSORNO', 'CASTRO', 'ANCUD', 'PUERTO VARAS',
-                      'LLANQUIHUE', 'PALENA', 'CHILOE', 'CALBUCO', 'MAULLIN'],
-        'Magallanes': ['MAGALLANES', 'PUNTA ARENAS', 'PORVENIR', 'PUERTO NATALES', 'PORVENIR'],
-        'Coquimbo': ['COQUIMBO', 'LA SERENA', 'OVALLE', 'ILLAPEL', 'COMBARBALA', 'ANDACOLLO'],
-        'Aysén': ['AYSEN', 'COYHAIQUE', 'PUERTO AYSEN', 'COCHRANE'],
-        "O'Higgins": ['OHIGGINS', 'RANCAGUA', 'SAN FERNANDO', 'SAN VICENTE', 'PICHIDEGUA', 
-                      'LAS CABRAS', 'PEUMO', 'COLTAUCO', 'DOÑIHUE', 'CODEGUA', 'MOSTAZAL', 'OLIVAR'],
-        'Maule': ['MAULE', 'CURICO', 'TALCA', 'LINARES', 'CAUQUENES', 'CONSTITUCION', 
-                  'PARRAL', 'SAN JAVIER', 'MOLINA', 'SAGRADA FAMILIA', 'PELARCO'],
-        'Ñuble': ['ÑUBLE', 'CHILLAN', 'SAN CARLOS', 'BULNES', 'COBQUECURA', 'QUIRIHUE', 'COIHUECO'],
-        'Arica y Parinacota': ['ARICA', 'PARINACOTA'],
-        'Tarapacá': ['TARAPACA', 'IQUIQUE', 'ALTO HOSPICIO', 'POZO ALMONTE'],
-        'Los Ríos': ['LOS RIOS', 'VALDIVIA', 'LA UNION', 'RIO BUENO', 'PANGUIPULLI'],
-        'Atacama': ['ATACAMA', 'COPIAPO', 'VALLENAR', 'HUASCO', 'ALTO DEL CARMEN'],
-        'Antofagasta': ['ANTOFAGASTA', 'CALAMA', 'TOCOPILLA', 'MARIA ELENA', 'OLLAGUE']
-    }
-    
-    for region, keywords in regiones.items():
-        if any(keyword in organismo_str for keyword in keywords):
-            return region
-    
-    return 'Otra / Nacional'
+def construir_tablero(clave, df, celdas=None):
+    """
+    Índices y cubo (o base DuckDB, según LICITACIONES_MOTOR) del dataset, compartidos entre sesiones
+    - Se guarda en la entrada del dataset en DATOS y se desaloja junto con ella
+    - La clave del dataset reemplaza al hash del DataFrame, que Streamlit recalcularía en cada ejecución
+    """
+    return DATOS.tablero(clave, lambda: crear_tablero(df, celdas))
 
-def categorizar_organismo(nombre):
-    """Categoriza el tipo de organismo"""
-    nombre = str(nombre).upper()
-    
-    if any(word in nombre for word in ['MUNICIPALIDAD', 'ILUSTRE', 'I.', 'CORP MUNICIPAL', 'CORPORACION MUNICIPAL']):
-        return 'Municipalidad / Corporación'
-    elif any(word in nombre for word in ['SERVICIO DE SALUD', 'HOSPITAL', 'SUBSECRETARIA DE SALUD', 'SEREMI DE SALUD', 
-                                         'CESFAM', 'CENTRO DE SALUD', 'CLINICA', 'COMPLEJO ASISTENCIAL']):
-        return 'Salud'
-    elif any(word in nombre for word in ['UNIVERSIDAD']):
-        return 'Universidad'
-    elif any(word in nombre for word in ['DIRECCION GENERAL DE AERONAUTICA CIVIL', 'DGAC']):
-        return 'DGAC'
-    elif any(word in nombre for word in ['FUERZA AEREA', 'EJERCITO', 'ARMADA', 'COMANDO']):
-        return 'Fuerzas Armadas'
-    elif any(word in nombre for word in ['MINISTERIO DE OBRAS PUBLICAS', 'VIALIDAD', 'MOP']):
-        return 'MOP'
-    else:
-        return 'Otro Servicio Público'
+# Tamaño del JSON de cada figura de la pestaña en curso (nombre -> bytes)
+tamanos_figuras = {}
 
-def extraer_monto_numerico(monto_str):
-    """Extrae un valor numérico del campo MontoLicitacion"""
-    if pd.isna(monto_str) or monto_str in ['', 'nan']:
-        return np.nan
-    
-    monto_str = str(monto_str).replace('.', '').replace(',', '').strip()
-    
-    # Si es un número puro
-    if monto_str.isdigit():
-        try:
-            return float(monto_str)
-        except:
-            return np.nan
-    
-    # Si tiene UTM, extraer número y convertir (valor UTM aproximado)
-    if 'UTM' in monto_str.upper():
-        numeros = re.findall(r'[\d.]+', monto_str)
-        if numeros:
-            try:
-                valor_utm = float(numeros[0].replace('.', ''))
-                # Si hay un segundo número (ej: "Entre 100 y 1000 UTM"), usar el promedio
-                if len(numeros) > 1:
-                    valor_utm2 = float(numeros[1].replace('.', ''))
-                    valor_utm = (valor_utm + valor_utm2) / 2
-                return valor_utm * 60000  # Conversión aproximada
-            except:
-                return np.nan
-    
-    return np.nan
-
-def extraer_utm(monto_str):
-    """Extrae el valor en UTM si está presente"""
-    monto_str = str(monto_str)
-    if 'UTM' in monto_str.upper():
-        numeros = re.findall(r'[\d.]+', monto_str)
-        if numeros:
-            try:
-                valor_utm = float(numeros[0].replace('.', ''))
-                # Si hay un segundo número, devolver el rango
-                if len(numeros) > 1:
-                    return f"{numeros[0]}-{numeros[1]} UTM"
-                return f"{valor_utm} UTM"
-            except:
-                return np.nan
-    return np.nan
-
-def clasificar_tipo_monto(monto_str):
-    """Clasifica el tipo de monto"""
-    monto_str = str(monto_str)
-    if 'UTM' in monto_str.upper():
-        return 'Expresado en UTM'
-    elif monto_str.replace('.', '').replace(',', '').isdigit():
-        return 'Monto fijo en CLP'
-    else:
-        return 'Sin especificar'
+@contextmanager
+def medir_pestaña(nombre):
+    """Muestra al final de la pestaña cuánto tardó en calcularse y cuánto pesa cada figura"""
+    tamanos_figuras.clear()
+    inicio = time.perf_counter()
+    with etapa(f"pestaña {nombre}"):
+        yield
+    st.caption(f"⏱️ Pestaña calculada en {time.perf_counter() - inicio:.2f} s")
+    if tamanos_figuras:
+        detalle = " · ".join(
+            f"{nombre} {tamano / 1024:.1f} KB" + (" ⚠️" if tamano > PRESUPUESTO_FIGURA_BYTES else "")
+            for nombre, tamano in tamanos_figuras.items()
+        )
+        st.caption(f"📦 Figuras: {detalle}")
+
+def mostrar_figura(fig):
+    """Envía la figura al navegador (Streamlit la serializa en cada ejecución)"""
+    with etapa("envío figura"):
+        st.plotly_chart(fig, use_container_width=True)
 
 # --- CARGA DE DATOS ---
 
@@ -208,18 +186,60 @@ with st.sidebar:
     st.image("https://img.icons8.com/color/96/000000/waste--v1.png", width=100)
     st.header("⚙️ Configuración")
     
-    uploaded_file = st.file_uploader(
-        "Cargar archivo CSV de licitaciones",
+    uploaded_files = st.file_uploader(
+        "Cargar archivos CSV de licitaciones",
         type=['csv'],
-        help="Sube el archivo CSV con los datos de licitaciones. Si no subes ninguno, se usará el archivo base del repositorio."
+        accept_multiple_files=True,
+        help="Sube uno o varios CSV (por ejemplo, uno por año). Los IDLicitacion repetidos se cuentan una vez. Si no subes ninguno, se usará el archivo base del repositorio."
     )
     
     # Cargar datos
     with st.spinner('Cargando y procesando datos...'):
-        df = cargar_y_procesar_datos(uploaded_file)
+        with etapa("carga de datos") as registro:
+            df, clave_datos_cargados, reporte_ingesta, mensaje_carga = cargar_y_procesar_datos(uploaded_files)
+            registro.filas = len(df)
+    if mensaje_carga:
+        st.success(mensaje_carga)
+    usa_almacen = bool(DIRECTORIO_ALMACEN) and not uploaded_files
     
     if not df.empty:
         st.success(f"✅ Datos cargados: {len(df)} licitaciones")
+        # El tablero se comparte entre ejecuciones: el conteo de montos sin UTM se hace una vez por dataset
+        with etapa("tablero"):
+            tablero = construir_tablero(clave_datos_cargados, df, abrir_almacen().cubo if usa_almacen else None)
+        filas_sin_utm, ultimo_mes_utm = tablero.fuera_de_tabla_utm
+        if filas_sin_utm:
+            st.warning(f"⚠️ {filas_sin_utm} montos son de meses sin valor en la tabla de la UTM (cubre hasta "
+                       f"{ultimo_mes_utm}): se valoran con el mes más cercano y son aproximados.")
+        
+        if reporte_ingesta is not None:
+            with st.expander("📥 Detalle de la carga por archivo"):
+                st.dataframe(
+                    reporte_ingesta,
+                    hide_index=True,
+                    column_config={
+                        "MB": st.column_config.NumberColumn(format="%.1f"),
+                        "segundos": st.column_config.NumberColumn(format="%.2f"),
+                        "filas_por_segundo": st.column_config.NumberColumn("filas/s", format="%.0f"),
+                    }
+                )
+        
+        if usa_almacen:
+            with st.expander("🔁 Actualización diaria"):
+                archivo_delta = st.file_uploader(
+                    "CSV con licitaciones nuevas o actualizadas",
+                    type=['csv'],
+                    key="archivo_delta",
+                    help="Solo se procesan las licitaciones nuevas o con cambios (por ejemplo, de Estado); el histórico no se reprocesa."
+                )
+                if archivo_delta is not None and st.button("Aplicar actualización"):
+                    st.session_state['resumen_delta'] = abrir_almacen().aplicar_delta(archivo_delta)
+                    DATOS.descartar(clave_datos_cargados)
+                    st.rerun()
+                if 'resumen_delta' in st.session_state:
+                    resumen = st.session_state['resumen_delta']
+                    st.caption(f"Última actualización: {resumen['nuevas']} nuevas, {resumen['actualizadas']} actualizadas, "
+                               f"{resumen['sin_cambios']} sin cambios ({resumen['segundos']:.2f} s)")
         
         # Mostrar info del dataset
         st.markdown("---")
@@ -256,7 +276,18 @@ with st.sidebar:
         )
         
         # Filtro de búsqueda por texto
-        busqueda = st.text_input("🔎 Buscar en nombre u organismo", "")
+        busqueda = st.text_input(
+            "🔎 Buscar en nombre, organismo o descripción",
+            "",
+            help="Sin distinguir mayúsculas ni tildes. Varias palabras deben aparecer todas; termina una palabra con * para buscar por prefijo."
+        )
+        
+        # Re-licitaciones: llamados casi idénticos de un mismo organismo
+        colapsar = st.checkbox(
+            "🔁 Colapsar re-licitaciones",
+            help="Cuenta una sola vez las licitaciones casi idénticas (nombre y descripción) de un mismo organismo, "
+                 "como los llamados que se repiten tras quedar desiertos. Se conserva la más reciente."
+        )
         
         # Botón para aplicar filtros
         aplicar_filtros = st.button("🔄 Aplicar Filtros", type="primary")
@@ -266,19 +297,23 @@ with st.sidebar:
 # --- APLICAR FILTROS ---
 
 if not df.empty:
-    df_filtrado = df.copy()
-
-    if años_seleccionados:
-        df_filtrado = df_filtrado[df_filtrado['Año'].isin(años_seleccionados)]
-    if regiones_seleccionadas:
-        df_filtrado = df_filtrado[df_filtrado['Region'].isin(regiones_seleccionadas)]
-    if categorias_seleccionadas:
-        df_filtrado = df_filtrado[df_filtrado['CategoriaOrganismo'].isin(categorias_seleccionadas)]
-    if busqueda:
-        df_filtrado = df_filtrado[
-            df_filtrado['NombreLicitacion'].str.contains(busqueda, case=False, na=False) |
-            df_filtrado['Organismo'].str.contains(busqueda, case=False, na=False)
-        ]
+    selecciones = {
+        'Año': años_seleccionados,
+        'Region': regiones_seleccionadas,
+        'CategoriaOrganismo': categorias_seleccionadas,
+    }
+    # Métricas y gráficos salen del cubo filtrado; las filas solo se usan en la tabla
+    with etapa("selección"):
+        seleccion = tablero.filtrar(selecciones, busqueda, colapsar)
+    if colapsar:
+        st.sidebar.caption(f"🔁 {tablero.indice_similitud.colapsadas} re-licitaciones colapsadas en el dataset")
+
+    def figura(nombre, construir, **selector):
+        """Figura del cache compartido entre sesiones; solo se construye para un estado de filtros nuevo"""
+        with etapa(f"figura {nombre}"):
+            clave = clave_figura(tablero.version, selecciones, busqueda, nombre, colapsar=colapsar, **selector)
+            fig, tamanos_figuras[nombre] = FIGURAS.obtener(clave, construir)
+        return fig
 
     # --- MÉTRICAS PRINCIPALES ---
 
@@ -287,15 +322,15 @@ if not df.empty:
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        total_licitaciones = len(df_filtrado)
+        total_licitaciones = seleccion.total_licitaciones()
         st.metric(
             label="📋 Total Licitaciones",
             value=f"{total_licitaciones:,}",
-            delta=f"{len(df_filtrado)/len(df)*100:.1f}% del total"
+            delta=f"{total_licitaciones/len(df)*100:.1f}% del total"
         )
 
     with col2:
-        monto_total = df_filtrado['Monto_CLP_Millones'].sum()
+        monto_total = seleccion.monto_total()
         st.metric(
             label="💰 Monto Total (MM CLP)",
             value=f"${monto_total:,.0f}M" if not pd.isna(monto_total) else "N/A",
@@ -303,7 +338,7 @@ if not df.empty:
         )
 
     with col3:
-        monto_promedio = df_filtrado['Monto_CLP_Millones'].mean()
+        monto_promedio = seleccion.monto_promedio()
         st.metric(
             label="📊 Monto Promedio (MM CLP)",
             value=f"${monto_promedio:,.1f}M" if not pd.isna(monto_promedio) else "N/A",
@@ -311,7 +346,7 @@ if not df.empty:
         )
 
     with col4:
-        organizaciones_unicas = df_filtrado['Organismo'].nunique()
+        organizaciones_unicas = seleccion.organismos()
         st.metric(
             label="🏢 Organizaciones",
             value=f"{organizaciones_unicas:,}",
@@ -322,388 +357,457 @@ if not df.empty:
 
     # --- VISUALIZACIONES PRINCIPALES ---
 
-    # Crear pestañas para organizar el contenido
+    # Crear pestañas para organizar el contenido; solo se calcula la pestaña visible
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📊 Visión General",
         "🗺️ Análisis Regional",
         "🏛️ Análisis por Organismo",
         "📅 Tendencia Temporal",
         "📋 Datos Detallados"
-    ])
+    ], key="pestaña_activa", on_change="rerun")
 
     with tab1:
-        st.header("Visión General del Mercado")
+        if tab1.open:
+            with medir_pestaña("Visión General"):
+                st.header("Visión General del Mercado")
         
-        col1, col2 = st.columns(2)
+                col1, col2 = st.columns(2)
         
-        with col1:
-            # Distribución por región
-            if not df_filtrado.empty and 'Region' in df_filtrado.columns:
-                fig_regiones = px.pie(
-                    df_filtrado,
-                    names='Region',
-                    title='Distribución de Licitaciones por Región',
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                fig_regiones.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_regiones, use_container_width=True)
-            else:
-                st.info("No hay datos suficientes para mostrar el gráfico")
+                with col1:
+                    # Distribución por región
+                    if not seleccion.vacia:
+                        def construir_fig_regiones():
+                            fig_regiones = px.pie(
+                                seleccion.distribucion_regiones(),
+                                names='Region',
+                                values='count',
+                                title='Distribución de Licitaciones por Región',
+                                hole=0.4,
+                                color_discrete_sequence=px.colors.qualitative.Set3
+                            )
+                            fig_regiones.update_traces(textposition='inside', textinfo='percent+label')
+                            return fig_regiones
+                        fig_regiones = figura('regiones', construir_fig_regiones)
+                        mostrar_figura(fig_regiones)
+                    else:
+                        st.info("No hay datos suficientes para mostrar el gráfico")
         
-        with col2:
-            # Distribución por tipo de organismo
-            if not df_filtrado.empty and 'CategoriaOrganismo' in df_filtrado.columns:
-                cat_counts = df_filtrado['CategoriaOrganismo'].value_counts().reset_index()
-                cat_counts.columns = ['CategoriaOrganismo', 'count']
-                fig_categorias = px.bar(
-                    cat_counts,
-                    x='count',
-                    y='CategoriaOrganismo',
-                    title='Licitaciones por Tipo de Organismo',
-                    orientation='h',
-                    color='CategoriaOrganismo',
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                fig_categorias.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
-                st.plotly_chart(fig_categorias, use_container_width=True)
-            else:
-                st.info("No hay datos suficientes para mostrar el gráfico")
+                with col2:
+                    # Distribución por tipo de organismo
+                    if not seleccion.vacia:
+                        def construir_fig_categorias():
+                            cat_counts = seleccion.licitaciones_por_categoria()
+                            fig_categorias = px.bar(
+                                cat_counts,
+                                x='count',
+                                y='CategoriaOrganismo',
+                                title='Licitaciones por Tipo de Organismo',
+                                orientation='h',
+                                color='CategoriaOrganismo',
+                                color_discrete_sequence=px.colors.qualitative.Pastel
+                            )
+                            fig_categorias.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
+                            return fig_categorias
+                        fig_categorias = figura('categorias', construir_fig_categorias)
+                        mostrar_figura(fig_categorias)
+                    else:
+                        st.info("No hay datos suficientes para mostrar el gráfico")
         
-        # Evolución anual
-        if not df_filtrado.empty and 'Año' in df_filtrado.columns:
-            evolucion_anual = df_filtrado.groupby('Año').agg({
-                'IDLicitacion': 'count',
-                'Monto_CLP_Millones': 'sum'
-            }).reset_index().rename(columns={'IDLicitacion': 'Cantidad'})
+                # Evolución anual
+                if not seleccion.vacia:
+                    def construir_fig_evolucion():
+                        evolucion_anual = seleccion.evolucion_anual()
             
-            fig_evolucion = make_subplots(specs=[[{"secondary_y": True}]])
+                        fig_evolucion = make_subplots(specs=[[{"secondary_y": True}]])
             
-            fig_evolucion.add_trace(
-                go.Bar(x=evolucion_anual['Año'], y=evolucion_anual['Cantidad'], name="Cantidad", marker_color='#3498db'),
-                secondary_y=False,
-            )
+                        fig_evolucion.add_trace(
+                            go.Bar(x=evolucion_anual['Año'], y=evolucion_anual['Cantidad'], name="Cantidad", marker_color='#3498db'),
+                            secondary_y=False,
+                        )
             
-            fig_evolucion.add_trace(
-                go.Scatter(x=evolucion_anual['Año'], y=evolucion_anual['Monto_CLP_Millones'], 
-                           name="Monto Total (MM CLP)", marker_color='#e74c3c', line=dict(width=3)),
-                secondary_y=True,
-            )
+                        fig_evolucion.add_trace(
+                            go.Scatter(x=evolucion_anual['Año'], y=evolucion_anual['Monto_CLP_Millones'], 
+                                       name="Monto Total (MM CLP)", marker_color='#e74c3c', line=dict(width=3)),
+                            secondary_y=True,
+                        )
             
-            fig_evolucion.update_layout(
-                title_text="Evolución Anual de Licitaciones",
-                hovermode='x unified'
-            )
-            fig_evolucion.update_xaxes(title_text="Año")
-            fig_evolucion.update_yaxes(title_text="Cantidad de Licitaciones", secondary_y=False)
-            fig_evolucion.update_yaxes(title_text="Monto Total (MM CLP)", secondary_y=True)
+                        fig_evolucion.update_layout(
+                            title_text="Evolución Anual de Licitaciones",
+                            hovermode='x unified'
+                        )
+                        fig_evolucion.update_xaxes(title_text="Año")
+                        fig_evolucion.update_yaxes(title_text="Cantidad de Licitaciones", secondary_y=False)
+                        fig_evolucion.update_yaxes(title_text="Monto Total (MM CLP)", secondary_y=True)
+                        return fig_evolucion
+                    fig_evolucion = figura('evolucion_anual', construir_fig_evolucion)
             
-            st.plotly_chart(fig_evolucion, use_container_width=True)
+                    mostrar_figura(fig_evolucion)
 
     with tab2:
-        st.header("Análisis Regional Detallado")
+        if tab2.open:
+            with medir_pestaña("Análisis Regional"):
+                st.header("Análisis Regional Detallado")
         
-        if not df_filtrado.empty and 'Region' in df_filtrado.columns and len(df_filtrado['Region'].unique()) > 0:
-            # Selector de región para análisis detallado
-            region_analisis = st.selectbox(
-                "Selecciona una región para análisis detallado",
-                options=sorted(df_filtrado['Region'].unique())
-            )
+                if not seleccion.vacia and len(seleccion.valores('Region')) > 0:
+                    # Selector de región para análisis detallado
+                    region_analisis = st.selectbox(
+                        "Selecciona una región para análisis detallado",
+                        options=seleccion.valores('Region')
+                    )
             
-            df_region = df_filtrado[df_filtrado['Region'] == region_analisis]
+                    seleccion_region = seleccion.por_region(region_analisis)
             
-            if not df_region.empty:
-                col1, col2, col3 = st.columns(3)
+                    if not seleccion_region.vacia:
+                        col1, col2, col3 = st.columns(3)
                 
-                with col1:
-                    st.metric("Licitaciones en región", len(df_region))
-                with col2:
-                    monto_region = df_region['Monto_CLP_Millones'].sum()
-                    st.metric("Monto total (MM CLP)", f"${monto_region:,.0f}M" if not pd.isna(monto_region) else "N/A")
-                with col3:
-                    st.metric("Organismos en región", df_region['Organismo'].nunique())
+                        with col1:
+                            st.metric("Licitaciones en región", seleccion_region.total_licitaciones())
+                        with col2:
+                            monto_region = seleccion_region.monto_total()
+                            st.metric("Monto total (MM CLP)", f"${monto_region:,.0f}M" if not pd.isna(monto_region) else "N/A")
+                        with col3:
+                            st.metric("Organismos en región", seleccion_region.organismos())
                 
-                col1, col2 = st.columns(2)
+                        col1, col2 = st.columns(2)
                 
-                with col1:
-                    # Top organismos en la región
-                    top_organismos_region = df_region['Organismo'].value_counts().head(10)
-                    if not top_organismos_region.empty:
-                        fig_top_region = px.bar(
-                            x=top_organismos_region.values,
-                            y=top_organismos_region.index,
-                            title=f'Top 10 Organismos en {region_analisis}',
-                            orientation='h',
-                            color=top_organismos_region.values,
-                            color_continuous_scale='Viridis'
-                        )
-                        fig_top_region.update_layout(xaxis_title="Cantidad de Licitaciones", yaxis_title="")
-                        st.plotly_chart(fig_top_region, use_container_width=True)
+                        with col1:
+                            # Top organismos en la región
+                            top_organismos_region = seleccion_region.top_organismos_por_cantidad(10)
+                            if not top_organismos_region.empty:
+                                fig_top_region = figura('top_region', lambda: graficos.top_region(top_organismos_region, region_analisis),
+                                                        region=region_analisis)
+                                mostrar_figura(fig_top_region)
                 
-                with col2:
-                    # Evolución en la región
-                    evolucion_region = df_region.groupby('Año').size().reset_index(name='Cantidad')
-                    if not evolucion_region.empty:
-                        fig_evol_region = px.line(
-                            evolucion_region,
-                            x='Año',
-                            y='Cantidad',
-                            title=f'Evolución en {region_analisis}',
-                            markers=True
-                        )
-                        fig_evol_region.update_layout(xaxis_title="Año", yaxis_title="Licitaciones")
-                        st.plotly_chart(fig_evol_region, use_container_width=True)
+                        with col2:
+                            # Evolución en la región
+                            evolucion_region = seleccion_region.licitaciones_por_año()
+                            if not evolucion_region.empty:
+                                fig_evol_region = figura('evolucion_region', lambda: graficos.evolucion_region(evolucion_region, region_analisis),
+                                                         region=region_analisis)
+                                mostrar_figura(fig_evol_region)
                 
-                # Mapa de calor mensual
-                heatmap_data = df_region.groupby(['Año', 'MesNombre']).size().reset_index(name='Cantidad')
-                meses_orden = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                              'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+                        # Mapa de calor mensual
+                        heatmap_data = seleccion_region.mapa_calor_mensual()
                 
-                if not heatmap_data.empty:
-                    fig_heatmap = px.density_heatmap(
-                        heatmap_data,
-                        x='Año',
-                        y='MesNombre',
-                        z='Cantidad',
-                        title=f'Estacionalidad de Licitaciones en {region_analisis}',
-                        color_continuous_scale='Reds',
-                        category_orders={"MesNombre": meses_orden}
-                    )
-                    st.plotly_chart(fig_heatmap, use_container_width=True)
-        else:
-            st.info("No hay datos suficientes para el análisis regional")
+                        if not heatmap_data.empty:
+                            fig_heatmap = figura('mapa_calor', lambda: graficos.mapa_calor(heatmap_data, region_analisis),
+                                                 region=region_analisis)
+                            mostrar_figura(fig_heatmap)
+                else:
+                    st.info("No hay datos suficientes para el análisis regional")
 
     with tab3:
-        st.header("Análisis por Organismo")
+        if tab3.open:
+            with medir_pestaña("Análisis por Organismo"):
+                st.header("Análisis por Organismo")
         
-        if not df_filtrado.empty and 'CategoriaOrganismo' in df_filtrado.columns:
-            # Selector de categoría
-            categoria_analisis = st.selectbox(
-                "Selecciona tipo de organismo",
-                options=['Todos'] + sorted(df_filtrado['CategoriaOrganismo'].unique())
-            )
+                if not seleccion.vacia:
+                    # Selector de categoría
+                    categoria_analisis = st.selectbox(
+                        "Selecciona tipo de organismo",
+                        options=['Todos'] + seleccion.valores('CategoriaOrganismo')
+                    )
             
-            df_categoria = df_filtrado if categoria_analisis == 'Todos' else df_filtrado[df_filtrado['CategoriaOrganismo'] == categoria_analisis]
+                    seleccion_categoria = seleccion.por_categoria(categoria_analisis)
             
-            if not df_categoria.empty:
-                # Top organismos general
-                st.subheader(f"Top 20 Organismos Licitantes - {categoria_analisis}")
-                
-                top_20 = df_categoria.groupby('Organismo').agg({
-                    'IDLicitacion': 'count',
-                    'Monto_CLP_Millones': 'sum'
-                }).round(2).rename(columns={'IDLicitacion': 'Cantidad', 'Monto_CLP_Millones': 'Monto_Total_MM'})
+                    if not seleccion_categoria.vacia:
+                        # Top organismos general
+                        st.subheader(f"Top 20 Organismos Licitantes - {categoria_analisis}")
                 
-                top_20 = top_20.sort_values('Cantidad', ascending=False).head(20).reset_index()
+                        top_20 = seleccion_categoria.top_organismos(20)
                 
-                if not top_20.empty:
-                    col1, col2 = st.columns([2, 1])
+                        if not top_20.empty:
+                            col1, col2 = st.columns([2, 1])
                     
-                    with col1:
-                        fig_top = px.bar(
-                            top_20,
-                            x='Cantidad',
-                            y='Organismo',
-                            title='Por Cantidad de Licitaciones',
-                            orientation='h',
-                            color='Monto_Total_MM',
-                            color_continuous_scale='Viridis',
-                            text='Cantidad'
-                        )
-                        fig_top.update_layout(yaxis={'categoryorder':'total ascending'})
-                        st.plotly_chart(fig_top, use_container_width=True)
+                            with col1:
+                                fig_top = figura('top_organismos', lambda: graficos.top_organismos(top_20), categoria=categoria_analisis)
+                                mostrar_figura(fig_top)
                     
-                    with col2:
-                        # Tabla resumen
-                        st.dataframe(
-                            top_20[['Organismo', 'Cantidad', 'Monto_Total_MM']],
-                            use_container_width=True,
-                            hide_index=True,
-                            column_config={
-                                "Monto_Total_MM": st.column_config.NumberColumn(
-                                    "Monto Total (MM CLP)",
-                                    format="$ %.0fM"
+                            with col2:
+                                # Tabla resumen
+                                st.dataframe(
+                                    top_20[['Organismo', 'Cantidad', 'Monto_Total_MM']],
+                                    use_container_width=True,
+                                    hide_index=True,
+                                    column_config={
+                                        "Monto_Total_MM": st.column_config.NumberColumn(
+                                            "Monto Total (MM CLP)",
+                                            format="$ %.0fM"
+                                        )
+                                    }
                                 )
-                            }
-                        )
                     
-                    # Análisis de concentración
-                    st.subheader("Análisis de Concentración del Mercado")
+                            # Análisis de concentración
+                            st.subheader("Análisis de Concentración del Mercado")
                     
-                    # Calcular concentración (Top N %)
-                    total_lic = len(df_categoria)
-                    top_5_pct = (top_20.head(5)['Cantidad'].sum() / total_lic * 100) if total_lic > 0 else 0
-                    top_10_pct = (top_20.head(10)['Cantidad'].sum() / total_lic * 100) if total_lic > 0 else 0
-                    top_20_pct = (top_20['Cantidad'].sum() / total_lic * 100) if total_lic > 0 else 0
+                            # Concentración sobre todos los organismos de la selección (no solo el top 20)
+                            medida_nombre = st.radio("Medir por", options=list(MEDIDAS_CONCENTRACION), horizontal=True)
+                            medida = MEDIDAS_CONCENTRACION[medida_nombre]
+                            concentracion = seleccion_categoria.concentracion(medida)
                     
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Concentración Top 5", f"{top_5_pct:.1f}%")
-                    with col2:
-                        st.metric("Concentración Top 10", f"{top_10_pct:.1f}%")
-                    with col3:
-                        st.metric("Concentración Top 20", f"{top_20_pct:.1f}%")
-        else:
-            st.info("No hay datos suficientes para el análisis por organismo")
+                            if not concentracion.empty:
+                                indicadores = concentracion.iloc[0]
+                                col1, col2, col3, col4, col5 = st.columns(5)
+                                with col1:
+                                    st.metric("Concentración Top 5", f"{indicadores['Top5']:.1f}%")
+                                with col2:
+                                    st.metric("Concentración Top 10", f"{indicadores['Top10']:.1f}%")
+                                with col3:
+                                    st.metric("Concentración Top 20", f"{indicadores['Top20']:.1f}%")
+                                with col4:
+                                    st.metric("HHI", f"{indicadores['HHI']:,.0f}",
+                                              help="Índice Herfindahl-Hirschman (0–10.000): sobre 2.500 se considera un mercado muy concentrado.")
+                                with col5:
+                                    st.metric("Gini", f"{indicadores['Gini']:.2f}",
+                                              help="0 si todos los organismos licitan lo mismo, cerca de 1 si unos pocos concentran todo.")
+                    
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    fig_lorenz = figura('lorenz', lambda: graficos.curva_lorenz(seleccion_categoria.curva_lorenz(medida), medida_nombre),
+                                                        categoria=categoria_analisis, medida=medida)
+                                    mostrar_figura(fig_lorenz)
+                                with col2:
+                                    fig_concentracion = figura('concentracion_anual',
+                                                               lambda: graficos.tendencia_concentracion(seleccion_categoria.concentracion_anual(medida)),
+                                                               categoria=categoria_analisis, medida=medida)
+                                    mostrar_figura(fig_concentracion)
+                    
+                                # Grilla completa Año × Región × Tipo de organismo, calculada una vez por dataset
+                                st.download_button(
+                                    label="📥 Concentración por año, región y tipo de organismo (CSV)",
+                                    data=lambda: tablero.grilla_concentracion(medida, colapsar).to_csv(index=False).encode('utf-8-sig'),
+                                    file_name=f"concentracion_{medida.lower()}.csv",
+                                    mime="text/csv",
+                                    on_click="ignore"
+                                )
+                else:
+                    st.info("No hay datos suficientes para el análisis por organismo")
 
     with tab4:
-        st.header("Análisis de Tendencia Temporal")
+        if tab4.open:
+            with medir_pestaña("Tendencia Temporal"):
+                st.header("Análisis de Tendencia Temporal")
         
-        if not df_filtrado.empty:
-            col1, col2 = st.columns(2)
+                if not seleccion.vacia:
+                    col1, col2 = st.columns(2)
             
-            with col1:
-                # Vista por mes
-                tendencia_mensual = df_filtrado.groupby(df_filtrado['FechaPublicacion'].dt.to_period('M')).size().reset_index(name='Cantidad')
-                if not tendencia_mensual.empty:
-                    tendencia_mensual['Fecha'] = tendencia_mensual['FechaPublicacion'].astype(str)
+                    with col1:
+                        # Vista por mes
+                        tendencia_mensual = seleccion.tendencia_mensual()
+                        if not tendencia_mensual.empty:
                     
-                    fig_mensual = px.line(
-                        tendencia_mensual,
-                        x='Fecha',
-                        y='Cantidad',
-                        title='Tendencia Mensual de Licitaciones',
-                        markers=True
-                    )
-                    fig_mensual.update_xaxes(title_text="Mes-Año")
-                    fig_mensual.update_yaxes(title_text="Cantidad")
-                    st.plotly_chart(fig_mensual, use_container_width=True)
+                            def construir_fig_mensual():
+                                # Serie reducida con LTTB si supera MAX_PUNTOS_SERIE meses
+                                serie = reducir_serie(tendencia_mensual, 'Cantidad')
+                                fig_mensual = px.line(
+                                    serie,
+                                    x='Fecha',
+                                    y='Cantidad',
+                                    title='Tendencia Mensual de Licitaciones',
+                                    markers=True,
+                                    render_mode=modo_render(len(serie))
+                                )
+                                fig_mensual.update_xaxes(title_text="Mes-Año")
+                                fig_mensual.update_yaxes(title_text="Cantidad")
+                                return fig_mensual
+                            fig_mensual = figura('tendencia_mensual', construir_fig_mensual)
+                            mostrar_figura(fig_mensual)
             
-            with col2:
-                # Distribución por trimestre
-                trimestres = df_filtrado.groupby(['Año', 'Trimestre']).size().reset_index(name='Cantidad')
-                if not trimestres.empty:
-                    trimestres['Año-Trim'] = trimestres['Año'].astype(str) + '-T' + trimestres['Trimestre'].astype(str)
-                    
-                    fig_trimestral = px.bar(
-                        trimestres,
-                        x='Año-Trim',
-                        y='Cantidad',
-                        title='Licitaciones por Trimestre',
-                        color='Año',
-                        color_discrete_sequence=px.colors.qualitative.Bold
-                    )
-                    fig_trimestral.update_xaxes(title_text="Año-Trimestre")
-                    fig_trimestral.update_yaxes(title_text="Cantidad")
-                    st.plotly_chart(fig_trimestral, use_container_width=True)
+                    with col2:
+                        # Distribución por trimestre
+                        trimestres = seleccion.trimestres()
+                        if not trimestres.empty:
+                            def construir_fig_trimestral():
+                                fig_trimestral = px.bar(
+                                    trimestres,
+                                    x='Año-Trim',
+                                    y='Cantidad',
+                                    title='Licitaciones por Trimestre',
+                                    color='Año',
+                                    color_discrete_sequence=px.colors.qualitative.Bold
+                                )
+                                fig_trimestral.update_xaxes(title_text="Año-Trimestre")
+                                fig_trimestral.update_yaxes(title_text="Cantidad")
+                                return fig_trimestral
+                            fig_trimestral = figura('trimestres', construir_fig_trimestral)
+                            mostrar_figura(fig_trimestral)
             
-            # Análisis de estacionalidad
-            st.subheader("Patrón Estacional por Mes")
+                    # Análisis de estacionalidad
+                    st.subheader("Patrón Estacional por Mes")
             
-            estacionalidad = df_filtrado.groupby('MesNombre').size().reset_index(name='Cantidad')
-            meses_orden = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+                    estacionalidad = seleccion.estacionalidad()
+                    meses_orden = MESES_ABREVIADOS
             
-            if not estacionalidad.empty:
-                fig_estacional = px.bar(
-                    estacionalidad,
-                    x='MesNombre',
-                    y='Cantidad',
-                    title='Distribución de Licitaciones por Mes',
-                    color='Cantidad',
-                    color_continuous_scale='Blues',
-                    category_orders={"MesNombre": meses_orden}
-                )
-                fig_estacional.update_layout(xaxis_title="Mes", yaxis_title="Cantidad")
-                st.plotly_chart(fig_estacional, use_container_width=True)
+                    if not estacionalidad.empty:
+                        def construir_fig_estacional():
+                            fig_estacional = px.bar(
+                                estacionalidad,
+                                x='MesNombre',
+                                y='Cantidad',
+                                title='Distribución de Licitaciones por Mes',
+                                color='Cantidad',
+                                color_continuous_scale='Blues',
+                                category_orders={"MesNombre": meses_orden}
+                            )
+                            fig_estacional.update_layout(xaxis_title="Mes", yaxis_title="Cantidad")
+                            return fig_estacional
+                        fig_estacional = figura('estacionalidad', construir_fig_estacional)
+                        mostrar_figura(fig_estacional)
             
-            # Análisis YoY (Year over Year)
-            st.subheader("Crecimiento Interanual")
+                    # Análisis YoY (Year over Year)
+                    st.subheader("Crecimiento Interanual")
             
-            yoy = df_filtrado.groupby('Año').size().reset_index(name='Cantidad')
-            yoy['Crecimiento %'] = yoy['Cantidad'].pct_change() * 100
+                    def construir_fig_yoy():
+                        yoy = seleccion.crecimiento_interanual()
             
-            fig_yoy = go.Figure()
-            fig_yoy.add_trace(go.Bar(
-                x=yoy['Año'],
-                y=yoy['Cantidad'],
-                name='Cantidad',
-                marker_color='#2ecc71'
-            ))
-            fig_yoy.add_trace(go.Scatter(
-                x=yoy['Año'],
-                y=yoy['Crecimiento %'],
-                name='Crecimiento %',
-                yaxis='y2',
-                marker_color='#e67e22',
-                line=dict(width=3)
-            ))
+                        fig_yoy = go.Figure()
+                        fig_yoy.add_trace(go.Bar(
+                            x=yoy['Año'],
+                            y=yoy['Cantidad'],
+                            name='Cantidad',
+                            marker_color='#2ecc71'
+                        ))
+                        fig_yoy.add_trace(go.Scatter(
+                            x=yoy['Año'],
+                            y=yoy['Crecimiento %'],
+                            name='Crecimiento %',
+                            yaxis='y2',
+                            marker_color='#e67e22',
+                            line=dict(width=3)
+                        ))
             
-            fig_yoy.update_layout(
-                title='Crecimiento Interanual de Licitaciones',
-                xaxis=dict(title='Año'),
-                yaxis=dict(title='Cantidad', side='left'),
-                yaxis2=dict(title='Crecimiento %', side='right', overlaying='y', tickformat='.1f'),
-                hovermode='x unified'
-            )
+                        fig_yoy.update_layout(
+                            title='Crecimiento Interanual de Licitaciones',
+                            xaxis=dict(title='Año'),
+                            yaxis=dict(title='Cantidad', side='left'),
+                            yaxis2=dict(title='Crecimiento %', side='right', overlaying='y', tickformat='.1f'),
+                            hovermode='x unified'
+                        )
+                        return fig_yoy
+                    fig_yoy = figura('crecimiento_interanual', construir_fig_yoy)
             
-            st.plotly_chart(fig_yoy, use_container_width=True)
-        else:
-            st.info("No hay datos suficientes para el análisis temporal")
+                    mostrar_figura(fig_yoy)
+                else:
+                    st.info("No hay datos suficientes para el análisis temporal")
 
     with tab5:
-        st.header("Datos Detallados")
+        if tab5.open:
+            with medir_pestaña("Datos Detallados"):
+                st.header("Datos Detallados")
+                total_filas = seleccion.cantidad_filas
         
-        if not df_filtrado.empty:
-            # Selector de columnas a mostrar
-            columnas_disponibles = ['IDLicitacion', 'NombreLicitacion', 'Tipo', 'Estado', 'FechaPublicacion',
-                                   'Organismo', 'Region', 'CategoriaOrganismo', 'MontoLicitacion', 
-                                   'Monto_CLP_Millones', 'Tipo_Monto_Categoria']
+                if total_filas:
+                    # Selector de columnas a mostrar
+                    columnas_disponibles = ['IDLicitacion', 'NombreLicitacion', 'Tipo', 'Estado', 'FechaPublicacion',
+                                           'Organismo', 'Region', 'CategoriaOrganismo', 'MontoLicitacion', 
+                                           'Monto_CLP_Millones', 'Tipo_Monto_Categoria']
             
-            columnas_mostrar = st.multiselect(
-                "Selecciona columnas a mostrar",
-                options=columnas_disponibles,
-                default=['IDLicitacion', 'NombreLicitacion', 'Organismo', 'Region', 
-                        'FechaPublicacion', 'MontoLicitacion']
-            )
+                    columnas_mostrar = st.multiselect(
+                        "Selecciona columnas a mostrar",
+                        options=columnas_disponibles,
+                        default=['IDLicitacion', 'NombreLicitacion', 'Organismo', 'Region', 
+                                'FechaPublicacion', 'MontoLicitacion']
+                    )
             
-            if columnas_mostrar:
-                df_display = df_filtrado[columnas_mostrar].copy()
+                    if columnas_mostrar:
+                        # Orden y paginación en el servidor: al navegador solo viaja la página visible
+                        col1, col2, col3 = st.columns([3, 1, 1])
+                        with col1:
+                            orden_por = st.selectbox("Ordenar por", options=['(sin orden)'] + columnas_disponibles)
+                        with col2:
+                            descendente = st.toggle("Descendente")
+                        with col3:
+                            filas_por_pagina = st.selectbox(
+                                "Filas por página",
+                                options=OPCIONES_FILAS_POR_PAGINA,
+                                index=OPCIONES_FILAS_POR_PAGINA.index(FILAS_POR_PAGINA)
+                            )
+                        
+                        paginas = max(1, -(-total_filas // filas_por_pagina))
+                        # El valor inicial va en session_state: junto con value= Streamlit avisa al ajustarlo
+                        st.session_state.setdefault('pagina_tabla', 1)
+                        if st.session_state['pagina_tabla'] > paginas:
+                            st.session_state['pagina_tabla'] = paginas
+                        pagina = st.number_input("Página", min_value=1, max_value=paginas, key='pagina_tabla')
+                        
+                        df_display = seleccion.pagina(
+                            columnas_mostrar,
+                            numero=pagina,
+                            tamano=filas_por_pagina,
+                            orden_por=None if orden_por == '(sin orden)' else orden_por,
+                            ascendente=not descendente
+                        )
                 
-                # Formatear fecha para mejor visualización
-                if 'FechaPublicacion' in df_display.columns:
-                    df_display['FechaPublicacion'] = df_display['FechaPublicacion'].dt.strftime('%d/%m/%Y')
+                        # Formatear fecha para mejor visualización (solo la página visible)
+                        if 'FechaPublicacion' in df_display.columns:
+                            df_display['FechaPublicacion'] = df_display['FechaPublicacion'].dt.strftime('%d/%m/%Y')
                 
-                # Mostrar tabla con formato mejorado
-                st.dataframe(
-                    df_display,
-                    use_container_width=True,
-                    hide_index=True,
-                    column_config={
-                        "Monto_CLP_Millones": st.column_config.NumberColumn(
-                            "Monto (MM CLP)",
-                            format="$ %.2fM"
-                        ),
-                        "MontoLicitacion": st.column_config.TextColumn(
-                            "Monto Original"
-                        )
-                    }
-                )
+                        # Mostrar tabla con formato mejorado
+                        with etapa("envío tabla", len(df_display)):
+                            st.dataframe(
+                                df_display,
+                                use_container_width=True,
+                                hide_index=True,
+                                column_config={
+                                    "Monto_CLP_Millones": st.column_config.NumberColumn(
+                                        "Monto (MM CLP)",
+                                        format="$ %.2fM"
+                                    ),
+                                    "MontoLicitacion": st.column_config.TextColumn(
+                                        "Monto Original"
+                                    )
+                                }
+                            )
+                        primera = (pagina - 1) * filas_por_pagina + 1
+                        st.caption(f"Página {pagina} de {paginas} · filas {primera}–{primera + len(df_display) - 1} de {total_filas}")
                 
-                # Estadísticas y descargas
-                col1, col2 = st.columns(2)
+                        # Estadísticas y descargas
+                        col1, col2 = st.columns(2)
                 
-                with col1:
-                    st.info(f"**Total registros:** {len(df_display)}")
-                    if not df_filtrado['FechaPublicacion'].empty:
-                        fecha_min = df_filtrado['FechaPublicacion'].min().strftime('%d/%m/%Y')
-                        fecha_max = df_filtrado['FechaPublicacion'].max().strftime('%d/%m/%Y')
-                        st.info(f"**Rango de fechas:** {fecha_min} a {fecha_max}")
+                        with col1:
+                            st.info(f"**Total registros:** {total_filas}")
+                            fecha_min, fecha_max = seleccion.rango_fechas()
+                            if pd.notna(fecha_min):
+                                st.info(f"**Rango de fechas:** {fecha_min.strftime('%d/%m/%Y')} a {fecha_max.strftime('%d/%m/%Y')}")
                 
-                with col2:
-                    # Botón de descarga
-                    csv = df_display.to_csv(index=False, encoding='utf-8-sig')
-                    st.download_button(
-                        label="📥 Descargar datos como CSV",
-                        data=csv,
-                        file_name=f"licitaciones_filtradas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        type="primary"
-                    )
-            else:
-                st.warning("Selecciona al menos una columna para mostrar")
-        else:
-            st.info("No hay datos para mostrar")
+                        with col2:
+                            # La exportación se genera por bloques solo al hacer clic, con el orden de la tabla
+                            formato = st.selectbox("Formato de descarga", options=formatos_disponibles(total_filas))
+                            extension, mime, _ = FORMATOS[formato]
+                            st.download_button(
+                                label=f"📥 Descargar datos ({formato})",
+                                data=lambda: exportar(
+                                    seleccion,
+                                    columnas_mostrar,
+                                    formato,
+                                    orden_por=None if orden_por == '(sin orden)' else orden_por,
+                                    ascendente=not descendente
+                                ),
+                                file_name=f"licitaciones_filtradas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                                mime=mime,
+                                type="primary",
+                                on_click="ignore"
+                            )
+                    else:
+                        st.warning("Selecciona al menos una columna para mostrar")
+                
+                    # Licitaciones parecidas a una dada (índice MinHash del dataset completo)
+                    with st.expander("🔁 Licitaciones similares"):
+                        id_similar = st.text_input("IDLicitacion", key="id_similar",
+                                                   help="Muestra las licitaciones con nombre y descripción más parecidos, de cualquier organismo.")
+                        if id_similar.strip():
+                            similares = tablero.similares(id_similar.strip())
+                            if similares.empty:
+                                st.info("No se encontraron licitaciones similares")
+                            else:
+                                st.dataframe(
+                                    similares[['Similitud', 'IDLicitacion', 'NombreLicitacion', 'Organismo', 'FechaPublicacion', 'Estado']],
+                                    use_container_width=True,
+                                    hide_index=True,
+                                    column_config={"Similitud": st.column_config.ProgressColumn(format="%.2f", min_value=0, max_value=1)}
+                                )
+                else:
+                    st.info("No hay datos para mostrar")
 
     # Footer
     st.markdown("---")
@@ -716,3 +820,32 @@ if not df.empty:
 
 else:
     st.warning("👆 Por favor, sube un archivo CSV válido usando el botón en la barra lateral izquierda.")
+
+# --- DIAGNÓSTICO ---
+
+with st.sidebar:
+    st.markdown("---")
+    st.toggle(
+        "🩺 Diagnóstico de rendimiento",
+        value=TRAZAS_POR_DEFECTO,
+        key="diagnostico",
+        help="Mide cada etapa de la ejecución (tiempo, filas y memoria) y permite exportarlas."
+    )
+    if traza is not None:
+        activar(None)
+        st.dataframe(
+            traza.tabla(),
+            hide_index=True,
+            column_config={
+                "ms": st.column_config.NumberColumn(format="%.1f"),
+                "memoria_MB": st.column_config.NumberColumn("Δ memoria MB", format="%+.1f"),
+            }
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", traza.a_json(), file_name="traza.json",
+                               mime="application/json", on_click="ignore")
+        with col2:
+            st.download_button("Chrome trace", traza.a_chrome_trace(), file_name="traza_chrome.json",
+                               mime="application/json", on_click="ignore",
+                               help="Se abre en chrome://tracing o en ui.perfetto.dev")
@@ -0,0 +1,20 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+ARCHIVO_BASE = 'ListaLicitaciones_filtrado_residuos_peligrosos_retiro_traslado.csv'
+
+
+def medir(funcion, *args):
+    """Ejecuta la función y devuelve (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def muestrear_columna(columna, filas, semilla=0):
+    """Repite al azar los valores de una columna del CSV base hasta alcanzar las filas pedidas"""
+    valores = pd.read_csv(ARCHIVO_BASE, sep=';', encoding='utf-8', usecols=[columna])[columna]
+    rng = np.random.default_rng(semilla)
+    return valores.iloc[rng.integers(0, len(valores), filas)].reset_index(drop=True)
@@ -0,0 +1,63 @@
+"""
+Compara el buscador por escaneo lineal (str.contains sobre cada columna) con
+el índice de trigramas de busqueda.IndiceBusqueda, y comprueba que ambos encuentren
+las mismas filas
+
+Uso: python -m benchmarks.busqueda --filas 1000000
+"""
+import argparse
+import re
+import resource
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import ARCHIVO_BASE, medir
+from busqueda import COLUMNAS_BUSQUEDA, IndiceBusqueda, normalizar
+from procesamiento import procesar_csv
+
+# Las dos últimas no tienen términos: deben devolver todas las filas
+CONSULTAS = ['hospital', 'residuos clinicos', 'municipalidad de maipu', 'retir*', 'DGAC', ' ', '*']
+
+
+def escaneo_lineal(df, consulta):
+    """Fuerza bruta: cada término en alguna columna; con * al final, como inicio de palabra"""
+    coincide = np.ones(len(df), dtype=bool)
+    for termino in normalizar(pd.Series(consulta.split(), dtype=str)):
+        palabra = termino.rstrip('*')
+        if not palabra:
+            continue
+        en_alguna = np.zeros(len(df), dtype=bool)
+        for columna in COLUMNAS_BUSQUEDA:
+            textos = normalizar(df[columna])
+            if termino.endswith('*'):
+                en_alguna |= textos.str.contains(r'(?:^|\W)' + re.escape(palabra), regex=True).to_numpy()
+            else:
+                en_alguna |= textos.str.contains(palabra, regex=False).to_numpy()
+        coincide &= en_alguna
+    return np.flatnonzero(coincide)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    base = procesar_csv(ARCHIVO_BASE)
+    rng = np.random.default_rng(0)
+    df = base.iloc[rng.integers(0, len(base), args.filas)].reset_index(drop=True)
+    indice, t_construccion = medir(IndiceBusqueda, df)
+    print(f"Filas: {len(df):,} | construcción del índice: {t_construccion:.1f}s | "
+          f"pares trigrama-fila: {sum(len(bloque.filas) for bloque in indice.bloques):,} | "
+          f"memoria máxima: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024:,} MB")
+
+    for consulta in CONSULTAS:
+        encontrados, t_indice = medir(indice.buscar, consulta)
+        esperados, t_escaneo = medir(escaneo_lineal, df, consulta)
+        assert np.array_equal(encontrados, esperados), f"Resultados distintos para {consulta!r}"
+        print(f"{consulta!r:<28} filas: {len(encontrados):>9,} | escaneo: {t_escaneo * 1000:9.1f} ms | "
+              f"índice: {t_indice * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
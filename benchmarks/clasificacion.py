@@ -0,0 +1,33 @@
+"""
+Compara la clasificación de región y categoría fila a fila (.apply) con el
+clasificador compilado aplicado a toda la columna
+
+Uso: python -m benchmarks.clasificacion --filas 1000000
+"""
+import argparse
+
+from benchmarks import medir, muestrear_columna
+from procesamiento import (asignar_categoria, asignar_region, categorizar_organismo,
+                           extraer_region)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    serie = muestrear_columna('Organismo', args.filas)
+
+    print(f"Filas: {len(serie):,} | Organismos distintos: {serie.nunique():,}")
+    for nombre, por_fila, por_columna in [
+        ('Region', extraer_region, asignar_region),
+        ('CategoriaOrganismo', categorizar_organismo, asignar_categoria),
+    ]:
+        esperado, t_fila = medir(serie.apply, por_fila)
+        obtenido, t_columna = medir(por_columna, serie)
+        assert esperado.equals(obtenido), f"Resultados distintos en {nombre}"
+        print(f"{nombre:<20} apply: {t_fila:8.3f}s | compilado: {t_columna:8.3f}s | x{t_fila / t_columna:,.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Grilla de concentración (Año × Region × CategoriaOrganismo y sus totales) en una pasada
+frente a calcularla segmento por segmento
+
+Ambas variantes parten del mismo cubo; la de segmentos filtra el cubo, agrupa por
+organismo y ordena una vez por cada segmento, como lo haría la pestaña con cada cambio.
+
+Uso: python -m benchmarks.concentracion --filas 100000 1000000
+"""
+import argparse
+from itertools import combinations
+
+import procesamiento
+from benchmarks import medir
+from benchmarks.sintetico import generar
+from concentracion import DIMENSIONES_GRILLA, grilla, metricas
+from cubo import agregar, construir_cubo
+
+
+def por_segmento(celdas):
+    resultados = 0
+    for k in range(len(DIMENSIONES_GRILLA) + 1):
+        for por in combinations(DIMENSIONES_GRILLA, k):
+            segmentos = celdas.groupby(list(por), observed=True) if por else [((), celdas)]
+            for _, segmento in segmentos:
+                resultados += len(metricas(agregar(segmento, ['Organismo'], ['Licitaciones'])))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for filas in args.filas:
+        celdas = construir_cubo(procesamiento.enriquecer(generar(filas)))
+        resultado, t_grilla = medir(grilla, celdas)
+        segmentos, t_segmentos = medir(por_segmento, celdas)
+        print(f"{filas:>11,} filas | {len(celdas):,} celdas | {len(resultado):,} segmentos | "
+              f"una pasada {t_grilla:6.3f}s | por segmento {t_segmentos:6.2f}s ({segmentos:,})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Suite de rendimiento por etapas del pipeline (lectura, enriquecimiento, índices,
+filtrado y agregaciones) sobre datos sintéticos de distintos tamaños
+
+Reporta tiempo, filas por segundo y memoria máxima adicional de cada etapa.
+
+Uso: python -m benchmarks.etapas --filas 1000 100000 1000000 10000000 [--json resultados.json]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import procesamiento
+from benchmarks.sintetico import escribir_csv
+from tablero import Tablero
+from trazas import memoria_residente
+
+
+class MedidorMemoria:
+    """Muestrea la memoria residente en segundo plano y guarda el máximo"""
+
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo
+        self.maximo = 0
+        self._activo = False
+
+    def _muestrear(self):
+        while self._activo:
+            self.maximo = max(self.maximo, memoria_residente())
+            time.sleep(self.intervalo)
+
+    def __enter__(self):
+        self.inicial = memoria_residente()
+        self.maximo = self.inicial
+        self._activo = True
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._activo = False
+        self._hilo.join()
+        self.maximo = max(self.maximo, memoria_residente())
+
+    @property
+    def pico(self):
+        return self.maximo - self.inicial
+
+
+def medir_etapa(resultados, nombre, filas, funcion, *args):
+    """Ejecuta una etapa, registra sus métricas y devuelve su resultado"""
+    with MedidorMemoria() as memoria:
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        segundos = time.perf_counter() - inicio
+    resultados.append({
+        'etapa': nombre,
+        'filas': filas,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos else float('inf'),
+        'memoria_pico_mb': memoria.pico / 1024 / 1024,
+    })
+    r = resultados[-1]
+    print(f"  {nombre:<28} {segundos:9.3f}s {r['filas_por_segundo']:>14,.0f} filas/s "
+          f"{r['memoria_pico_mb']:>9.1f} MB")
+    return resultado
+
+
+def consultas_graficos(seleccion):
+    """Todas las agregaciones que pide el dashboard para una selección"""
+    seleccion.total_licitaciones()
+    seleccion.monto_promedio()
+    seleccion.organismos()
+    seleccion.distribucion_regiones()
+    seleccion.licitaciones_por_categoria()
+    seleccion.evolucion_anual()
+    region = seleccion.por_region(seleccion.valores('Region')[0])
+    region.top_organismos_por_cantidad(10)
+    region.licitaciones_por_año()
+    region.mapa_calor_mensual()
+    seleccion.top_organismos(20)
+    seleccion.tendencia_mensual()
+    seleccion.trimestres()
+    seleccion.estacionalidad()
+    seleccion.crecimiento_interanual()
+
+
+def ejecutar(filas, directorio, con_busqueda=True):
+    """Corre todas las etapas para un tamaño de dataset"""
+    resultados = []
+    ruta = os.path.join(directorio, f'licitaciones_{filas}.csv')
+    print(f"\n{filas:,} filas")
+    medir_etapa(resultados, 'generación CSV sintético', filas, escribir_csv, filas, ruta)
+
+    df = medir_etapa(resultados, 'lectura CSV', filas, procesamiento.leer_csv, ruta)
+    medir_etapa(resultados, 'fechas', filas, procesamiento.parsear_fechas, df['FechaPublicacion'])
+    df = medir_etapa(resultados, 'enriquecimiento completo', filas, procesamiento.enriquecer, df)
+    medir_etapa(resultados, 'región', filas, procesamiento.asignar_region, df['Organismo'])
+    medir_etapa(resultados, 'categoría', filas, procesamiento.asignar_categoria, df['Organismo'])
+    medir_etapa(resultados, 'montos', filas, procesamiento.parsear_montos, df['MontoLicitacion'])
+
+    tablero = Tablero(df)
+    medir_etapa(resultados, 'índice de filtros', filas, lambda: tablero.indice_filtros)
+    medir_etapa(resultados, 'cubo', filas, lambda: tablero.cubo)
+    if con_busqueda:
+        medir_etapa(resultados, 'índice de búsqueda', filas, lambda: tablero.indice_busqueda)
+
+    años = sorted(df['Año'].dropna().unique())
+    selecciones = {'Año': años[-2:], 'Region': [], 'CategoriaOrganismo': []}
+    seleccion = medir_etapa(resultados, 'filtrado', filas, tablero.filtrar, selecciones)
+    medir_etapa(resultados, 'agregaciones de gráficos', filas, consultas_graficos, seleccion)
+    medir_etapa(resultados, 'filas filtradas', filas, lambda: seleccion.filas)
+    if con_busqueda:
+        seleccion = medir_etapa(resultados, 'filtrado + búsqueda', filas,
+                                tablero.filtrar, selecciones, 'residuos peligrosos')
+        medir_etapa(resultados, 'agregaciones con búsqueda', filas, consultas_graficos, seleccion)
+
+    os.remove(ruta)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--sin-busqueda', action='store_true', help='Omite el índice de trigramas')
+    parser.add_argument('--json', help='Guarda los resultados en este archivo')
+    parser.add_argument('--directorio', default=tempfile.gettempdir(), help='Dónde escribir los CSV sintéticos')
+    args = parser.parse_args()
+
+    resultados = []
+    for filas in args.filas:
+        resultados.extend(ejecutar(filas, args.directorio, con_busqueda=not args.sin_busqueda))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Compara la etapa de calendario anterior (pd.to_datetime y cinco columnas derivadas,
+con month_name y to_period) con parsear_fechas más Año y Mes como enteros
+
+Uso: python -m benchmarks.fechas --filas 100000 1000000 10000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import medir
+from benchmarks.sintetico import FECHA_FINAL, FECHA_INICIAL
+from procesamiento import FORMATO_FECHA, parsear_fechas
+
+
+def fechas_sinteticas(filas, semilla=0):
+    """Columna FechaPublicacion como texto, igual que al leer el CSV"""
+    rng = np.random.default_rng(semilla)
+    segundos = int((FECHA_FINAL - FECHA_INICIAL).total_seconds())
+    fechas = FECHA_INICIAL + pd.to_timedelta(rng.integers(0, segundos, filas), unit='s')
+    return pd.Series(fechas.strftime(FORMATO_FECHA), dtype=str)
+
+
+def calendario_anterior(texto):
+    fechas = pd.to_datetime(texto, format=FORMATO_FECHA, errors='coerce')
+    return pd.DataFrame({
+        'FechaPublicacion': fechas,
+        'Año': fechas.dt.year,
+        'Mes': fechas.dt.month,
+        'MesNombre': fechas.dt.month_name().str[:3],
+        'Trimestre': fechas.dt.quarter,
+        'Año-Mes': fechas.dt.to_period('M').astype(str),
+    })
+
+
+def calendario_nuevo(texto):
+    fechas = parsear_fechas(texto)
+    return pd.DataFrame({
+        'FechaPublicacion': fechas,
+        'Año': fechas.dt.year.astype('Int16'),
+        'Mes': fechas.dt.month.astype('Int8'),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    for filas in args.filas:
+        texto = fechas_sinteticas(filas)
+        esperado, t_antes = medir(calendario_anterior, texto)
+        obtenido, t_nuevo = medir(calendario_nuevo, texto)
+        assert esperado['FechaPublicacion'].equals(obtenido['FechaPublicacion'])
+        assert (esperado['Año'] == obtenido['Año']).all() and (esperado['Mes'] == obtenido['Mes']).all()
+        print(f"{filas:>11,} filas | antes {t_antes:7.2f}s | nuevo {t_nuevo:6.2f}s | {t_antes / t_nuevo:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Tamaño del JSON de la figura de tendencia según el largo de la serie, con y sin LTTB
+
+La serie simula una tendencia con estacionalidad y ruido; sin reducción el JSON crece con
+la cantidad de puntos, con reducción queda acotado por MAX_PUNTOS_SERIE.
+
+Uso: python -m benchmarks.figuras --puntos 1000 10000 100000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from benchmarks import medir
+from muestreo import MAX_PUNTOS_SERIE, modo_render, reducir_serie
+
+
+def serie_sintetica(puntos, semilla=0):
+    rng = np.random.default_rng(semilla)
+    t = np.arange(puntos)
+    cantidad = 50 + 0.01 * t + 10 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 3, puntos)
+    return pd.DataFrame({'Fecha': t, 'Cantidad': cantidad.round()})
+
+
+def figura(serie):
+    fig = px.line(serie, x='Fecha', y='Cantidad', markers=True, render_mode=modo_render(len(serie)))
+    return len(pio.to_json(fig, validate=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--puntos', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"MAX_PUNTOS_SERIE = {MAX_PUNTOS_SERIE}")
+    for puntos in args.puntos:
+        serie = serie_sintetica(puntos)
+        bytes_antes, t_antes = medir(figura, serie)
+        bytes_nuevo, t_nuevo = medir(lambda s: figura(reducir_serie(s, 'Cantidad')), serie)
+        print(f"{puntos:>9,} puntos | sin reducir {bytes_antes / 1024:8.1f} KB {t_antes:5.2f}s | "
+              f"LTTB {bytes_nuevo / 1024:6.1f} KB {t_nuevo:5.2f}s")
+
+
+if __name__ == '__main__':
+    main()
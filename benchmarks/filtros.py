@@ -0,0 +1,59 @@
+"""
+Compara los filtros encadenados con isin (copia + tres máscaras) con el
+índice de bitmaps de filtros.IndiceFiltros
+
+Uso: python -m benchmarks.filtros --filas 1000000
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks import ARCHIVO_BASE, medir
+from filtros import IndiceFiltros
+from procesamiento import procesar_csv
+
+
+def filtrar_encadenado(df, años, regiones, categorias):
+    df_filtrado = df.copy()
+    if años:
+        df_filtrado = df_filtrado[df_filtrado['Año'].isin(años)]
+    if regiones:
+        df_filtrado = df_filtrado[df_filtrado['Region'].isin(regiones)]
+    if categorias:
+        df_filtrado = df_filtrado[df_filtrado['CategoriaOrganismo'].isin(categorias)]
+    return df_filtrado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    base = procesar_csv(ARCHIVO_BASE)
+    rng = np.random.default_rng(0)
+    df = base.iloc[rng.integers(0, len(base), args.filas)].reset_index(drop=True)
+    indice, t_construccion = medir(IndiceFiltros, df)
+    print(f"Filas: {len(df):,} | construcción del índice: {t_construccion * 1000:.1f} ms")
+
+    años = sorted(df['Año'].dropna().unique())
+    regiones = sorted(df['Region'].unique())
+    categorias = sorted(df['CategoriaOrganismo'].unique())
+    casos = {
+        'todo seleccionado': (años, regiones, categorias),
+        'un año': (años[-1:], regiones, categorias),
+        'dos años, tres regiones': (años[-2:], regiones[:3], categorias),
+        'selección estrecha': (años[-1:], regiones[:1], categorias[:1]),
+    }
+    for nombre, (a, r, c) in casos.items():
+        selecciones = {'Año': a, 'Region': r, 'CategoriaOrganismo': c}
+        esperado, t_encadenado = medir(filtrar_encadenado, df, a, r, c)
+        assert indice.filtrar(df, selecciones).equals(esperado), nombre
+        t_bitmap = min(medir(indice.seleccionar, selecciones)[1] for _ in range(args.repeticiones))
+        t_take = min(medir(indice.filtrar, df, selecciones)[1] for _ in range(args.repeticiones))
+        print(f"{nombre:<25} filas: {len(esperado):>9,} | isin: {t_encadenado * 1000:8.2f} ms | "
+              f"bitmap: {t_bitmap * 1000:6.3f} ms | bitmap + take: {t_take * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
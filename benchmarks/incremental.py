@@ -0,0 +1,85 @@
+"""
+Costo de una actualización diaria con el almacén incremental frente a reprocesar todo
+
+Para cada tamaño de histórico se inicializa un almacén y se aplica una actualización de
+--delta filas (la mitad cambia el Estado de licitaciones existentes, la otra mitad son nuevas).
+El costo de la actualización depende del delta; del histórico solo crecen la búsqueda
+de IDs y la suma sobre el cubo, que son vectoriales. Al final se comprueba que el dataset
+y el cubo del almacén coincidan con los de reprocesar histórico + actualización completos.
+
+Uso: python -m benchmarks.incremental --historico 100000 1000000 --delta 5000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import procesamiento
+from almacen import Almacen
+from benchmarks import medir
+from benchmarks.sintetico import escribir_csv, generar
+from cubo import DIMENSIONES, MEDIDAS, construir_cubo
+from ingesta import deduplicar
+
+
+def escribir_delta(historico, filas, destino):
+    """Mitad filas existentes con otro Estado, mitad licitaciones nuevas"""
+    existentes = historico.sample(filas // 2, random_state=0)
+    existentes = existentes.assign(Estado='Revocada')
+    nuevas = generar(filas - len(existentes), semilla=999)
+    nuevas['IDLicitacion'] = nuevas['IDLicitacion'] + '-N'
+    pd.concat([existentes, nuevas]).to_csv(destino, sep=procesamiento.SEPARADOR_CSV,
+                                          encoding=procesamiento.CODIFICACION_CSV, index=False)
+    return destino
+
+
+def comprobar(almacen, completo):
+    """
+    El almacén debe quedar igual que reprocesar todo: mismas filas y mismo cubo
+    - Se compara por IDLicitacion: una fila sin cambios conserva su lugar en el almacén
+      y al reprocesar pasa al de la actualización
+    """
+    obtenido, esperado = (df.sort_values('IDLicitacion', kind='stable').reset_index(drop=True)
+                          for df in (almacen.df, completo))
+    assert list(obtenido.columns) == list(esperado.columns), "Columnas distintas"
+    for columna in esperado.columns:
+        a, b = obtenido[columna].astype(object), esperado[columna].astype(object)
+        assert (a.isna() == b.isna()).all() and a.dropna().equals(b.dropna()), f"Columna {columna} distinta"
+    cubos = [cubo.astype({dimension: object for dimension in DIMENSIONES}).sort_values(DIMENSIONES).reset_index(drop=True)
+             for cubo in (almacen.cubo, construir_cubo(esperado))]
+    assert cubos[0][DIMENSIONES].equals(cubos[1][DIMENSIONES]), "Celdas del cubo distintas"
+    for medida in MEDIDAS:
+        assert np.allclose(cubos[0][medida].astype(float), cubos[1][medida].astype(float)), f"Medida {medida} distinta"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--historico', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--delta', type=int, default=5_000)
+    args = parser.parse_args()
+
+    for filas in args.historico:
+        directorio = tempfile.mkdtemp(prefix='licitaciones_incremental_')
+        try:
+            historico = escribir_csv(filas, os.path.join(directorio, 'historico.csv'))
+            delta = escribir_delta(procesamiento.leer_csv(historico), args.delta,
+                                   os.path.join(directorio, 'delta.csv'))
+            almacen = Almacen(os.path.join(directorio, 'almacen'))
+            _, t_inicial = medir(almacen.aplicar_delta, historico)
+            resumen, t_delta = medir(almacen.aplicar_delta, delta)
+            _, t_completo = medir(procesamiento.procesar_csv, historico)
+            completo = pd.concat([procesamiento.leer_csv(ruta, dtype=str) for ruta in (historico, delta)],
+                                 ignore_index=True)
+            comprobar(almacen, procesamiento.enriquecer(deduplicar(completo)))
+            print(f"{filas:>11,} filas | carga inicial {t_inicial:6.2f}s | actualización {t_delta:5.2f}s "
+                  f"({resumen['nuevas']:,} nuevas, {resumen['actualizadas']:,} actualizadas) | "
+                  f"reprocesar todo {t_completo:6.2f}s | {t_completo / t_delta:5.1f}x")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Escalamiento de la ingesta de varios CSV con el número de procesos
+
+Genera N archivos sintéticos (uno por año) y los carga con cargar_varios usando un
+cache en disco vacío en cada corrida.
+
+Uso: python -m benchmarks.ingesta --archivos 10 --filas 200000 --procesos 1 2 4 8
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarks import medir
+from benchmarks.sintetico import escribir_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archivos', type=int, default=10)
+    parser.add_argument('--filas', type=int, default=200_000, help='Filas por archivo')
+    parser.add_argument('--procesos', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix='licitaciones_ingesta_')
+    # El cache en disco se configura al importar: se apunta a un directorio temporal antes
+    os.environ['LICITACIONES_CACHE_DIR'] = os.path.join(directorio, 'cache')
+    import cache_disco
+    import ingesta
+
+    try:
+        archivos = [escribir_csv(args.filas, os.path.join(directorio, f'licitaciones_{2015 + i}.csv'), semilla=i)
+                    for i in range(args.archivos)]
+        base = None
+        for procesos in sorted(set(args.procesos)):
+            shutil.rmtree(cache_disco.DIRECTORIO_CACHE, ignore_errors=True)
+            (df, reporte), segundos = medir(ingesta.cargar_varios, archivos, procesos)
+            base = base or segundos
+            print(f"{procesos:>3} procesos | {segundos:7.2f}s | {len(df) / segundos:>12,.0f} filas/s | "
+                  f"{base / segundos:4.1f}x | por archivo {reporte['filas_por_segundo'].mean():>10,.0f} filas/s")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Memoria del DataFrame enriquecido antes y después del esquema compacto
+
+Antes: textos como objetos de Python y partes de fecha en float64 (como quedan con NaT).
+Después: lo que el Tablero mantiene residente, es decir su DataFrame de trabajo (categorías,
+enteros pequeños) más los textos fríos (Descripcion), que siguen en memoria aparte. Se informa
+además la copia normalizada de los textos que guarda el índice del buscador una vez construido.
+
+Uso: python -m benchmarks.memoria [--filas 1000000]
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+import procesamiento
+from benchmarks import ARCHIVO_BASE
+from benchmarks.sintetico import escribir_csv
+from tablero import Tablero
+
+
+def representacion_original(df):
+    """Reconstruye los tipos que tenía el DataFrame antes del esquema compacto"""
+    tipos = {columna: object for columna in df.columns if df[columna].dtype.kind in 'OUT' or
+             str(df[columna].dtype) in ('category', 'str', 'string')}
+    tipos.update({columna: 'float64' for columna in procesamiento.COLUMNAS_ENTERAS if columna in df.columns})
+    return df.astype(tipos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, help='Usa un CSV sintético de este tamaño en vez del archivo base')
+    args = parser.parse_args()
+
+    if args.filas:
+        ruta = os.path.join(tempfile.gettempdir(), f'licitaciones_memoria_{args.filas}.csv')
+        escribir_csv(args.filas, ruta)
+    else:
+        ruta = ARCHIVO_BASE
+    df = procesamiento.procesar_csv(ruta)
+    if args.filas:
+        os.remove(ruta)
+
+    antes = procesamiento.memoria_por_columna(representacion_original(df))
+    tablero = Tablero(df)
+    despues = (pd.concat([procesamiento.memoria_por_columna(tablero.df),
+                          procesamiento.memoria_por_columna(tablero.textos_frios)])
+               .reindex(antes.index, fill_value=0))
+    indice = tablero.indice_busqueda.textos.memory_usage(deep=True, index=False)
+
+    print(f"{len(df):,} filas\n")
+    print(f"{'columna':<24} {'antes MB':>10} {'después MB':>11}")
+    for columna in antes.index:
+        print(f"{columna:<24} {antes[columna] / 1e6:>10.2f} {despues[columna] / 1e6:>11.2f}")
+    print(f"\n{'total':<24} {antes.sum() / 1e6:>10.2f} {despues.sum() / 1e6:>11.2f}  "
+          f"({antes.sum() / despues.sum():.1f}x menos)")
+    print(f"{'+ textos del buscador':<24} {'':>10} {indice / 1e6:>11.2f}  "
+          f"(residente con el índice: {antes.sum() / (despues.sum() + indice):.1f}x menos)")
+
+
+if __name__ == '__main__':
+    main()
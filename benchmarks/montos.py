@@ -0,0 +1,69 @@
+"""
+Compara la interpretación y valoración de MontoLicitacion fila a fila (tres .apply y la
+búsqueda de la UTM de cada mes) con parsear_montos + valorar_montos, y mide cómo escala
+con el número de filas
+
+Uso: python -m benchmarks.montos --filas 10000 100000 1000000
+"""
+import argparse
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import medir, muestrear_columna
+from procesamiento import (MES_PESOS_CONSTANTES, clasificar_tipo_monto, extraer_monto_numerico, extraer_utm,
+                           parsear_fechas, parsear_montos, tabla_utm, valorar_montos)
+
+
+def utm_del_mes(fecha, meses, valores):
+    """Valor de la UTM del mes de la fecha, buscado en la tabla (versión fila a fila)"""
+    if pd.isna(fecha):
+        return valores[-1]
+    posicion = bisect.bisect_right(meses, np.datetime64(fecha, 'M')) - 1
+    return valores[min(max(posicion, 0), len(valores) - 1)]
+
+
+def por_fila(serie, fechas):
+    meses, valores = tabla_utm()
+    meses = list(meses)
+    base = utm_del_mes(pd.Timestamp(MES_PESOS_CONSTANTES), meses, valores) if MES_PESOS_CONSTANTES else None
+    pesos = []
+    for monto, fecha in zip(serie, fechas):
+        utm = utm_del_mes(fecha, meses, valores)
+        valor = extraer_monto_numerico(monto, utm)
+        pesos.append(valor * (base / utm) if base is not None else valor)
+    return pd.DataFrame({
+        'Monto_Numérico_CLP': pesos,
+        'Tipo_Monto_Categoria': serie.apply(clasificar_tipo_monto),
+        'Monto_UTM_Estimado': serie.apply(extraer_utm),
+    })
+
+
+def vectorizado(serie, fechas):
+    montos = parsear_montos(serie)
+    return pd.DataFrame({
+        'Monto_Numérico_CLP': valorar_montos(montos, fechas),
+        'Tipo_Monto_Categoria': montos['Tipo_Monto_Categoria'],
+        'Monto_UTM_Estimado': montos['Monto_UTM_Estimado'],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for filas in args.filas:
+        serie = muestrear_columna('MontoLicitacion', filas)
+        # Misma semilla: cada monto conserva la fecha de su licitación
+        fechas = parsear_fechas(muestrear_columna('FechaPublicacion', filas))
+        esperado, t_fila = medir(por_fila, serie, fechas)
+        obtenido, t_columna = medir(vectorizado, serie, fechas)
+        assert esperado.equals(obtenido), "Resultados distintos"
+        print(f"{filas:>12,} filas | apply: {t_fila:8.3f}s | vectorizado: {t_columna:8.3f}s "
+              f"({filas / t_columna:,.0f} filas/s) | x{t_fila / t_columna:,.1f}")
+
+
+if __name__ == '__main__':
+    main()
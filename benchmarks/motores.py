@@ -0,0 +1,115 @@
+"""
+Motor pandas (cubo en memoria) frente a DuckDB para las consultas del dashboard
+
+Para cada tamaño mide la construcción (cubo o carga en DuckDB) y una ronda de consultas
+como la de un cambio de filtros: métricas, evolución anual, top 20, mapa de calor y YoY.
+Antes de medir comprueba, sobre el CSV base, que ambos motores den los mismos resultados
+en todas las consultas de Seleccion para varias combinaciones de filtros y búsqueda.
+
+Uso: python -m benchmarks.motores --filas 100000 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import procesamiento
+from benchmarks import ARCHIVO_BASE, medir
+from benchmarks.sintetico import generar
+from motor_duckdb import TableroDuckDB
+from tablero import Tablero
+
+
+CONSULTAS = ['total_licitaciones', 'monto_total', 'monto_promedio', 'organismos', 'distribucion_regiones',
+             'licitaciones_por_categoria', 'evolucion_anual', 'top_organismos_por_cantidad', 'licitaciones_por_año',
+             'mapa_calor_mensual', 'top_organismos', 'tendencia_mensual', 'trimestres', 'estacionalidad',
+             'crecimiento_interanual']
+# Solo para la selección principal: las derivadas por región o categoría no llevan las filas
+CONSULTAS_FILAS = ['cantidad_filas', 'rango_fechas']
+CASOS = [({}, ''), ({'Año': [2020, 2021]}, ''),
+         ({'Region': ['Maule', 'Metropolitana'], 'CategoriaOrganismo': ['Salud']}, ''), ({}, 'hospital'),
+         ({'Año': [2022]}, 'retiro residuos'), ({'Año': [1990]}, ''), ({}, 'zzzqqq'),
+         ({}, ' '), ({}, '*'), ({'Año': [2022]}, '*')]
+
+
+def iguales(a, b):
+    """Mismo resultado salvo el tipo exacto de las columnas y redondeos de punto flotante"""
+    if isinstance(a, pd.Series):
+        return iguales(a.reset_index(), b.reset_index())
+    if isinstance(a, pd.DataFrame):
+        a, b = a.reset_index(drop=True).astype(object), b.reset_index(drop=True).astype(object)
+        if list(a.columns) != list(b.columns) or a.shape != b.shape:
+            return False
+        for columna in a.columns:
+            try:
+                igual = np.allclose(a[columna].astype(float), b[columna].astype(float), equal_nan=True)
+            except (TypeError, ValueError):
+                igual = (a[columna].astype(str) == b[columna].astype(str)).all()
+            if not igual:
+                return False
+        return True
+    if isinstance(a, tuple):
+        return len(a) == len(b) and all(iguales(x, y) for x, y in zip(a, b))
+    if isinstance(a, float):
+        return bool(np.isclose(a, b, equal_nan=True))
+    return a == b
+
+
+def comprobar_paridad(df):
+    """Ambos motores devuelven lo mismo en cada consulta, también por región y por categoría"""
+    pandas_, duckdb_ = Tablero(df), TableroDuckDB(df)
+    for selecciones, busqueda in CASOS:
+        a, b = pandas_.filtrar(selecciones, busqueda), duckdb_.filtrar(selecciones, busqueda)
+        assert a.vacia == b.vacia, (selecciones, busqueda)
+        if a.vacia:
+            continue
+        region, categoria = a.valores('Region')[0], a.valores('CategoriaOrganismo')[-1]
+        for nombre, x, y, consultas in [('todo', a, b, CONSULTAS + CONSULTAS_FILAS),
+                                        (region, a.por_region(region), b.por_region(region), CONSULTAS),
+                                        (categoria, a.por_categoria(categoria), b.por_categoria(categoria), CONSULTAS)]:
+            for consulta in consultas:
+                resultado_a, resultado_b = getattr(x, consulta), getattr(y, consulta)
+                if callable(resultado_a):
+                    resultado_a, resultado_b = resultado_a(), resultado_b()
+                assert iguales(resultado_a, resultado_b), \
+                    f"{consulta} distinto en {selecciones} {busqueda!r} ({nombre})"
+        pagina = (['IDLicitacion'], 2, 10, 'FechaPublicacion', False)
+        assert a.pagina(*pagina).equals(b.pagina(*pagina)), (selecciones, busqueda)
+
+
+def construir(clase, df):
+    tablero = clase(df)
+    if clase is Tablero:
+        tablero.cubo  # el cubo es perezoso: se cuenta en la construcción
+    return tablero
+
+
+def ronda(tablero):
+    seleccion = tablero.filtrar({'Año': [2021, 2022, 2023], 'Region': ['Metropolitana', 'Biobío', 'Maule']})
+    seleccion.total_licitaciones()
+    seleccion.monto_promedio()
+    seleccion.evolucion_anual()
+    seleccion.top_organismos(20)
+    seleccion.por_region('Maule').mapa_calor_mensual()
+    return seleccion.crecimiento_interanual()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    comprobar_paridad(procesamiento.procesar_csv(ARCHIVO_BASE))
+    print("Mismos resultados en ambos motores sobre el CSV base")
+    for filas in args.filas:
+        df = procesamiento.enriquecer(generar(filas))
+        for clase in (Tablero, TableroDuckDB):
+            tablero, t_construir = medir(construir, clase, df)
+            ronda(tablero)
+            yoy, t_ronda = medir(ronda, tablero)
+            print(f"{filas:>11,} filas | {clase.__name__:<13} | construcción {t_construir:6.2f}s | "
+                  f"consultas {t_ronda:6.3f}s | {int(yoy['Cantidad'].sum()):,} licitaciones")
+
+
+if __name__ == '__main__':
+    main()
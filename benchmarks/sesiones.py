@@ -0,0 +1,44 @@
+"""
+Memoria residente del servidor según la cantidad de sesiones abiertas sobre el mismo dataset
+
+Escribe un CSV sintético como directorio de datos y abre --sesiones sesiones del dashboard
+con el runner de pruebas de Streamlit, en el mismo proceso y sin cerrarlas. El dataset y su
+tablero se comparten: después de la primera sesión la memoria debería crecer poco.
+
+Uso: python -m benchmarks.sesiones --filas 200000 --sesiones 10
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.sintetico import escribir_csv
+from trazas import memoria_residente
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=200_000)
+    parser.add_argument('--sesiones', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        datos = os.path.join(directorio, 'datos')
+        os.makedirs(datos)
+        escribir_csv(args.filas, os.path.join(datos, 'sintetico.csv'))
+        os.environ['LICITACIONES_DIRECTORIO_DATOS'] = datos
+        os.environ['LICITACIONES_CACHE_DIR'] = os.path.join(directorio, 'cache')
+        from streamlit.testing.v1 import AppTest
+
+        base = memoria_residente()
+        sesiones, anterior = [], base
+        for numero in range(1, args.sesiones + 1):
+            sesion = AppTest.from_file(os.path.abspath('app.py'), default_timeout=600).run()
+            sesiones.append(sesion)
+            actual = memoria_residente()
+            print(f"sesión {numero:>3} | residente {actual / 1024 / 1024:8.1f} MB | "
+                  f"{(actual - anterior) / 1024 / 1024:+7.1f} MB | total {(actual - base) / 1024 / 1024:+7.1f} MB")
+            anterior = actual
+
+
+if __name__ == '__main__':
+    main()
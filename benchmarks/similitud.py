@@ -0,0 +1,32 @@
+"""
+Construcción del índice de re-licitaciones (MinHash + LSH) y búsqueda de similares
+
+Los datos sintéticos repiten los textos del CSV base, así que casi todas las filas
+tienen gemelas: es el peor caso para el tamaño de los buckets. La construcción debería
+crecer de forma casi lineal con las filas.
+
+Uso: python -m benchmarks.similitud --filas 100000 400000
+"""
+import argparse
+
+import procesamiento
+from benchmarks import medir
+from benchmarks.sintetico import generar
+from similitud import IndiceSimilitud
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[100_000, 400_000])
+    args = parser.parse_args()
+
+    for filas in args.filas:
+        df = procesamiento.enriquecer(generar(filas))
+        indice, t_construir = medir(IndiceSimilitud, df)
+        _, t_similares = medir(indice.similares, filas // 2)
+        print(f"{filas:>11,} filas | construcción {t_construir:6.2f}s ({filas / t_construir:9,.0f} filas/s) | "
+              f"similares {t_similares * 1000:7.1f} ms | {indice.colapsadas:,} colapsadas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Generador de CSV sintéticos con el mismo esquema que las exportaciones de ChileCompra
+
+Uso: python -m benchmarks.sintetico --filas 1000000 --destino /tmp/licitaciones_1M.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from procesamiento import CODIFICACION_CSV, REGIONES, SEPARADOR_CSV
+
+COLUMNAS = ['IDLicitacion', 'NombreLicitacion', 'Tipo', 'Estado', 'FechaPublicacion', 'Descripcion',
+            'Moneda', 'TipoPresupuesto', 'TipoMonto', 'MontoLicitacion', 'Organismo']
+
+PLANTILLAS_ORGANISMO = [
+    'I MUNICIPALIDAD DE {}', 'Ilustre Municipalidad de {}', 'HOSPITAL DE {}',
+    'Servicio de Salud {}', 'CESFAM {}', 'Corporación Municipal de {}',
+]
+ORGANISMOS_NACIONALES = [
+    'DIRECCION GENERAL DE AERONAUTICA CIVIL', 'EJERCITO DE CHILE', 'ARMADA DE CHILE',
+    'FUERZA AEREA DE CHILE COMANDO LOGISTICO', 'UNIVERSIDAD DE CHILE', 'MINISTERIO DE OBRAS PUBLICAS',
+    'Comisión Chilena de Energía Nuclear', 'SUBSECRETARIA DE SALUD PUBLICA', 'SERVICIO AGRICOLA Y GANADERO',
+]
+NOMBRES = [
+    'SERVICIO DE RETIRO DE RESIDUOS CLÍNICOS', 'Servicio de retiro traslado y disposición final de residuos peligrosos',
+    'RETIRO Y DISPOSICION FINAL DE RESIDUOS PELIGROSOS', 'Servicio de Retiro de Residuos Especiales',
+    'TRASLADO Y ELIMINACIÓN DE RESIDUOS PELIGROSOS', 'Retiro de residuos REAS',
+]
+DESCRIPCIONES = [
+    'Contratación del servicio de retiro, transporte y disposición final de residuos peligrosos.',
+    'Se requiere el servicio de retiro de residuos especiales y peligrosos generados en el establecimiento.',
+    'Licitación para el retiro y eliminación de residuos clínicos por un periodo de 24 meses.',
+    'Servicio de traslado de residuos peligrosos a destino final autorizado por la autoridad sanitaria.',
+]
+MONTOS_UTM = ['Menor a 100 UTM', 'Entre 100 y 1000 UTM', 'Igual o superior a 1.000 UTM e inferior a 2.000 UTM',
+              'Igual o superior a 2.000 UTM e inferior a 5.000 UTM', 'Igual o superior a 5.000 UTM']
+TIPOS = ['LE', 'L1', 'LP', 'LQ', 'LR']
+ESTADOS = ['Adjudicada a uno o varios proveedores', 'Desierta (o art. 3 ó 9 Ley 19.886)', 'Cerrada', 'Revocada']
+FECHA_INICIAL = pd.Timestamp('2019-06-01')
+FECHA_FINAL = pd.Timestamp('2026-02-24')
+
+
+def _organismos():
+    """Catálogo de organismos repartido por todas las regiones, más organismos nacionales"""
+    comunas = [comuna.title() for palabras in REGIONES.values() for comuna in palabras]
+    nombres = [plantilla.format(comuna) for comuna in comunas for plantilla in PLANTILLAS_ORGANISMO]
+    return np.array(nombres + ORGANISMOS_NACIONALES, dtype=object)
+
+
+def _montos_clp(rng, filas):
+    """Montos en pesos con punto como separador de miles"""
+    catalogo = np.arange(5, 2_000) * 100_000
+    formateados = np.array([f"{monto:,}".replace(',', '.') for monto in catalogo], dtype=object)
+    return formateados[rng.integers(0, len(catalogo), filas)]
+
+
+def generar(filas, semilla=0):
+    """DataFrame sintético con el esquema del CSV original"""
+    rng = np.random.default_rng(semilla)
+    organismos = _organismos()
+    # Pocos organismos concentran muchas licitaciones, como en los datos reales
+    pesos = 1 / np.arange(1, len(organismos) + 1)
+    pesos = pesos[rng.permutation(len(organismos))]
+    organismo = organismos[rng.choice(len(organismos), filas, p=pesos / pesos.sum())]
+
+    segundos = int((FECHA_FINAL - FECHA_INICIAL).total_seconds())
+    fechas = FECHA_INICIAL + pd.to_timedelta(rng.integers(0, segundos, filas), unit='s')
+    tipo = np.array(TIPOS, dtype=object)[rng.integers(0, len(TIPOS), filas)]
+
+    es_utm = rng.random(filas) < 0.55
+    monto = np.where(es_utm,
+                     np.array(MONTOS_UTM, dtype=object)[rng.integers(0, len(MONTOS_UTM), filas)],
+                     _montos_clp(rng, filas))
+
+    id_licitacion = (pd.Series(rng.integers(1000, 9999, filas)).astype(str) + '-' +
+                     pd.Series(rng.integers(1, 999, filas)).astype(str) + '-' +
+                     pd.Series(tipo) + pd.Series(fechas.strftime('%y')))
+    return pd.DataFrame({
+        'IDLicitacion': id_licitacion,
+        'NombreLicitacion': np.array(NOMBRES, dtype=object)[rng.integers(0, len(NOMBRES), filas)],
+        'Tipo': tipo,
+        'Estado': np.array(ESTADOS, dtype=object)[rng.choice(len(ESTADOS), filas, p=[0.85, 0.1, 0.03, 0.02])],
+        'FechaPublicacion': fechas.strftime('%d/%m/%Y %H:%M:%S'),
+        'Descripcion': np.array(DESCRIPCIONES, dtype=object)[rng.integers(0, len(DESCRIPCIONES), filas)],
+        'Moneda': 'CLP',
+        'TipoPresupuesto': np.where(es_utm, 'NO PUBLICADO', 'PUBLICADO'),
+        'TipoMonto': np.where(es_utm, 'ESTIMADO', 'DISPONIBLE'),
+        'MontoLicitacion': monto,
+        'Organismo': organismo,
+    }, columns=COLUMNAS)
+
+
+def escribir_csv(filas, destino, filas_por_bloque=1_000_000, semilla=0):
+    """Escribe un CSV sintético por bloques para no tener todo en memoria"""
+    for i, inicio in enumerate(range(0, filas, filas_por_bloque)):
+        bloque = generar(min(filas_por_bloque, filas - inicio), semilla=semilla + i)
+        bloque.to_csv(destino, sep=SEPARADOR_CSV, encoding=CODIFICACION_CSV, index=False,
+                      mode='w' if i == 0 else 'a', header=i == 0)
+    return destino
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--destino', required=True)
+    args = parser.parse_args()
+    escribir_csv(args.filas, args.destino)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Procesamiento por bloques (CSV grandes) frente al procesamiento en memoria
+
+Procesa el mismo CSV con procesar_csv y con procesar_csv_por_bloques, lee el Parquet de
+vuelta como lo hace el cache en disco y comprueba que ambos DataFrames sean idénticos
+(columnas, tipos y valores): el dashboard no debe cambiar según el tamaño del archivo.
+
+Uso: python -m benchmarks.streaming [--filas 200000] [--memoria-mb 8]
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+import procesamiento
+from benchmarks import ARCHIVO_BASE, medir
+from benchmarks.sintetico import escribir_csv
+
+
+def por_bloques(ruta, memoria_mb):
+    """DataFrame procesado por bloques, leído del Parquet como en cache_disco.leer"""
+    destino = os.path.join(tempfile.gettempdir(), f'licitaciones_streaming_{os.getpid()}.parquet')
+    try:
+        procesamiento.procesar_csv_por_bloques(ruta, destino, memoria_mb=memoria_mb)
+        return procesamiento.compactar(pd.read_parquet(destino))
+    finally:
+        os.remove(destino)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, help='Usa un CSV sintético de este tamaño en vez del archivo base')
+    parser.add_argument('--memoria-mb', type=float, default=8, help='Memoria por bloque; baja para forzar varios')
+    args = parser.parse_args()
+
+    if args.filas:
+        ruta = os.path.join(tempfile.gettempdir(), f'licitaciones_streaming_{args.filas}.csv')
+        escribir_csv(args.filas, ruta)
+    else:
+        ruta = ARCHIVO_BASE
+    try:
+        memoria, t_memoria = medir(procesamiento.procesar_csv, ruta)
+        bloques, t_bloques = medir(por_bloques, ruta, args.memoria_mb)
+    finally:
+        if args.filas:
+            os.remove(ruta)
+
+    print(f"{len(memoria):,} filas")
+    print(f"en memoria:  {t_memoria:.2f} s")
+    print(f"por bloques: {t_bloques:.2f} s ({args.memoria_mb:g} MB por bloque)")
+    pd.testing.assert_frame_equal(bloques, memoria)
+    print("Mismo DataFrame por ambos caminos")
+
+
+if __name__ == '__main__':
+    main()
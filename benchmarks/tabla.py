@@ -0,0 +1,49 @@
+"""
+Tabla de detalle: preparar todas las filas filtradas (antes) frente a una página ordenada
+
+Antes: copia de las columnas visibles y strftime de FechaPublicacion en todas las filas,
+que luego viajaban completas al navegador. Ahora: orden precalculado y formato solo de la página.
+
+Uso: python -m benchmarks.tabla --filas 1000000 --pagina 100
+"""
+import argparse
+
+import procesamiento
+from benchmarks import medir
+from benchmarks.sintetico import generar
+from tablero import Tablero
+
+COLUMNAS = ['IDLicitacion', 'NombreLicitacion', 'Organismo', 'Region', 'FechaPublicacion', 'MontoLicitacion']
+
+
+def tabla_anterior(filas):
+    tabla = filas[COLUMNAS].copy()
+    tabla['FechaPublicacion'] = tabla['FechaPublicacion'].dt.strftime('%d/%m/%Y')
+    return tabla
+
+
+def pagina_ordenada(seleccion, tamano):
+    pagina = seleccion.pagina(COLUMNAS, numero=2, tamano=tamano, orden_por='FechaPublicacion', ascendente=False)
+    pagina['FechaPublicacion'] = pagina['FechaPublicacion'].dt.strftime('%d/%m/%Y')
+    return pagina
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--pagina', type=int, default=100, help='Filas por página')
+    args = parser.parse_args()
+
+    tablero = Tablero(procesamiento.enriquecer(generar(args.filas)))
+    seleccion = tablero.filtrar({})
+    anterior, t_anterior = medir(tabla_anterior, seleccion.filas)
+    _, t_primera = medir(pagina_ordenada, seleccion, args.pagina)
+    pagina, t_pagina = medir(pagina_ordenada, seleccion, args.pagina)
+    print(f"{args.filas:,} filas")
+    print(f"antes:  {t_anterior:6.2f}s | {anterior.memory_usage(deep=True).sum() / 1e6:8.1f} MB hacia el navegador")
+    print(f"página: {t_pagina:6.3f}s (primera vez, con el índice de orden: {t_primera:.2f}s) | "
+          f"{pagina.memory_usage(deep=True).sum() / 1e6:8.3f} MB")
+
+
+if __name__ == '__main__':
+    main()
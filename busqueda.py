@@ -0,0 +1,141 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columnas de texto indexadas para el buscador
+COLUMNAS_BUSQUEDA = ('NombreLicitacion', 'Organismo', 'Descripcion')
+# Bloques de filas con su propio índice; dentro de un bloque las filas caben en uint16
+FILAS_POR_BLOQUE = 16_384
+_SEPARADOR = '\n'
+
+
+def normalizar(serie):
+    """Minúsculas y sin tildes, para comparar sin distinguir acentos ni mayúsculas"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se normaliza cada categoría una vez y se expande con los códigos
+        categorias = normalizar(pd.Series(serie.cat.categories, dtype=object)).to_numpy()
+        codigos = serie.cat.codes.to_numpy()
+        textos = np.where(codigos >= 0, categorias[codigos] if len(categorias) else '', '')
+        return pd.Series(textos, index=serie.index, dtype=str)
+    return (serie.fillna('').astype(str)
+            .str.normalize('NFKD')
+            .str.replace('[\u0300-\u036f]', '', regex=True)
+            .str.lower())
+
+
+def _trigramas(datos):
+    """Códigos enteros de todos los trigramas consecutivos de un arreglo de bytes"""
+    datos = datos.astype(np.int32)
+    return (datos[:-2] << 16) | (datos[1:-1] << 8) | datos[2:]
+
+
+def _bytes(texto):
+    """Un byte por carácter; lo que no es ASCII pasa a '?' de forma consistente en índice y consulta"""
+    return np.frombuffer(texto.encode('ascii', 'replace'), dtype=np.uint8)
+
+
+class _BloqueIndice:
+    """Listas de filas por trigrama (formato CSR) para un bloque de filas consecutivas"""
+
+    def __init__(self, textos, inicio):
+        self.inicio = inicio
+        datos = _bytes(''.join(textos))
+        largos = textos.str.len().to_numpy()
+        if len(datos) < 3:
+            self.trigramas = np.empty(0, dtype=np.int32)
+            self.limites = np.zeros(1, dtype=np.int64)
+            self.filas = np.empty(0, dtype=np.uint16)
+            return
+        filas = np.repeat(np.arange(len(textos), dtype=np.int64), largos)[:-2]
+        separador = datos == ord(_SEPARADOR)
+        validos = ~(separador[:-2] | separador[1:-1] | separador[2:])
+        # Clave trigrama-fila; ordenar y quitar repetidos deja las listas agrupadas por trigrama
+        claves = np.sort((_trigramas(datos)[validos].astype(np.int64) << 16) | filas[validos])
+        claves = claves[np.concatenate(([True], claves[1:] != claves[:-1]))]
+        trigramas = (claves >> 16).astype(np.int32)
+        nuevos = np.flatnonzero(np.concatenate(([True], trigramas[1:] != trigramas[:-1])))
+        self.trigramas = trigramas[nuevos]
+        self.limites = np.append(nuevos, len(claves))
+        self.filas = (claves & 0xFFFF).astype(np.uint16)
+
+    def filas_con(self, trigrama):
+        i = np.searchsorted(self.trigramas, trigrama)
+        if i == len(self.trigramas) or self.trigramas[i] != trigrama:
+            return self.filas[:0]
+        return self.filas[self.limites[i]:self.limites[i + 1]]
+
+    def candidatos(self, codigos):
+        """Filas del bloque que contienen todos los trigramas, en posiciones globales"""
+        # Se parte por la lista más corta para que las intersecciones sean baratas
+        listas = sorted((self.filas_con(codigo) for codigo in codigos), key=len)
+        resultado = listas[0]
+        for lista in listas[1:]:
+            if len(resultado) == 0:
+                break
+            resultado = np.intersect1d(resultado, lista, assume_unique=True)
+        return resultado.astype(np.int64) + self.inicio
+
+
+class IndiceBusqueda:
+    """
+    Índice invertido de trigramas para el buscador de texto
+    - Se construye una vez por dataset sobre NombreLicitacion, Organismo y Descripcion
+    - Los trigramas solo reducen los candidatos; la coincidencia exacta se verifica después
+    - Varios términos se combinan con AND; un término terminado en * busca prefijos de palabra
+    """
+
+    def __init__(self, df, columnas=COLUMNAS_BUSQUEDA):
+        columnas = [columna for columna in columnas if columna in df.columns]
+        self.filas = len(df)
+        # Cada campo termina en salto de línea para que ningún trigrama cruce campos
+        textos = pd.Series([''] * self.filas, index=df.index, dtype=str)
+        for columna in columnas:
+            textos = textos + normalizar(df[columna]) + _SEPARADOR
+        self.textos = textos.reset_index(drop=True)
+        self.bloques = [
+            _BloqueIndice(self.textos.iloc[inicio:inicio + FILAS_POR_BLOQUE], inicio)
+            for inicio in range(0, self.filas, FILAS_POR_BLOQUE)
+        ]
+
+    def _candidatos(self, terminos):
+        """Filas que contienen todos los trigramas de los términos; None si no hay trigramas"""
+        codigos = set()
+        for termino in terminos:
+            datos = _bytes(termino)
+            if len(datos) >= 3:
+                codigos.update(_trigramas(datos).tolist())
+        if not codigos:
+            return None
+        if not self.bloques:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([bloque.candidatos(codigos) for bloque in self.bloques])
+
+    def buscar(self, consulta, candidatos=None):
+        """
+        Posiciones ordenadas de las filas que contienen todos los términos de la consulta
+        - candidatos restringe la búsqueda a esas posiciones (por ejemplo, las de los filtros)
+        - Una consulta sin términos (p. ej. ' ' o '*') devuelve los candidatos sin cambios, o
+          todas las posiciones si no hay candidatos: siempre devuelve un arreglo
+        """
+        terminos = normalizar(pd.Series(consulta.split(), dtype=str)).tolist()
+        terminos = [termino for termino in terminos if termino.rstrip('*')]
+        if not terminos:
+            return np.arange(self.filas) if candidatos is None else np.asarray(candidatos)
+        palabras = [termino.rstrip('*') for termino in terminos]
+
+        posiciones = self._candidatos(palabras)
+        if posiciones is None:
+            posiciones = np.arange(self.filas) if candidatos is None else candidatos
+        elif candidatos is not None:
+            posiciones = np.intersect1d(posiciones, candidatos, assume_unique=True)
+
+        # Verificación exacta sobre los candidatos
+        textos = self.textos.iloc[posiciones]
+        coincide = np.ones(len(textos), dtype=bool)
+        for termino, palabra in zip(terminos, palabras):
+            if termino.endswith('*'):
+                coincide &= textos.str.contains(r'(?:^|\W)' + re.escape(palabra), regex=True).to_numpy()
+            else:
+                coincide &= textos.str.contains(palabra, regex=False).to_numpy()
+        return np.asarray(posiciones)[coincide]
@@ -0,0 +1,196 @@
+"""
+Cache en memoria de los datasets procesados, compartido por todas las sesiones
+
+La clave es el contenido de los archivos (SHA-256 por bloques), no el objeto subido: el
+mismo CSV subido por dos usuarios se procesa una vez. El cache tiene un límite de bytes
+con desalojo LRU; lo desalojado queda como snapshot Parquet en cache_disco y vuelve
+a leerse de ahí (memory map) sin reprocesar el CSV. El tablero (índices y cubo) de cada
+dataset vive en su entrada: al desalojar un dataset no queda retenido por su tablero.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import cache_disco
+from procesamiento import congelar
+from trazas import etapa
+
+# Presupuesto de memoria de los datasets en cache y derrame a disco de los desalojados
+LIMITE_DATOS_BYTES = int(float(os.environ.get('LICITACIONES_CACHE_DATOS_MB', '1024')) * 1024 * 1024)
+DERRAME_A_DISCO = os.environ.get('LICITACIONES_CACHE_DATOS_DISCO', '1') not in ('', '0')
+
+
+def huella_origen(origen):
+    """
+    Huella de un archivo subido (contenido) o de una ruta del servidor
+    - Las rutas usan tamaño y fecha de modificación: no se releen en cada ejecución
+    """
+    if isinstance(origen, (str, os.PathLike)):
+        estado = os.stat(origen)
+        texto = f"{os.path.abspath(origen)}:{estado.st_size}:{estado.st_mtime_ns}"
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+    return cache_disco.huella_archivo(origen)
+
+
+def clave_datos(huellas):
+    """Clave de un dataset a partir de las huellas de sus archivos, en orden (el posterior gana)"""
+    if len(huellas) == 1:
+        return huellas[0]
+    return hashlib.sha256('\n'.join(huellas).encode('utf-8')).hexdigest()
+
+
+def tamano_datos(df):
+    """Bytes que ocupa el DataFrame en memoria"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class CacheDatos:
+    """
+    Cache LRU de datasets procesados con límite de memoria
+    - Cada entrada guarda el DataFrame, su reporte y el tablero construido sobre él: al
+      desalojar el dataset se va también el tablero, que es quien mantiene vivos sus datos
+    - El tamaño de una entrada es el del DataFrame más el de su tablero; el del tablero se vuelve
+      a medir cada vez que se pide, porque sus índices se construyen a medida que se usan
+    - Las cargas concurrentes de una misma clave esperan a la primera en lugar de repetirla
+    - El dataset usado más recientemente siempre queda en memoria, aunque supere el límite
+      por sí solo; así no se relee del disco en cada ejecución
+    - Los DataFrames se comparten entre sesiones y quedan de solo lectura (congelar)
+    """
+
+    def __init__(self, limite_bytes=LIMITE_DATOS_BYTES, derrame=DERRAME_A_DISCO):
+        self.limite_bytes = limite_bytes
+        self.derrame = derrame
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self._cargas = {}
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _buscar(self, clave):
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+            return entrada
+
+    def _candado_carga(self, clave):
+        with self._candado:
+            return self._cargas.setdefault(clave, threading.Lock())
+
+    def _soltar_carga(self, clave):
+        with self._candado:
+            self._cargas.pop(clave, None)
+
+    def obtener(self, clave, cargar, en_disco=True):
+        """
+        Devuelve (df, reporte) para la clave
+        - Busca en memoria, luego en el snapshot en disco y si no, llama a cargar()
+        - Un dataset recuperado del disco vuelve sin reporte
+        - en_disco=False: datasets que ya viven en otro lado (p. ej. el almacén) no se leen
+          ni se derraman al cache en disco
+        """
+        entrada = self._buscar(clave)
+        if entrada is not None:
+            return entrada['df'], entrada['reporte']
+        try:
+            with self._candado_carga(clave):
+                entrada = self._buscar(clave)
+                if entrada is not None:
+                    return entrada['df'], entrada['reporte']
+                with self._candado:
+                    self.fallos += 1
+                en_disco = en_disco and self.derrame
+                with etapa('cache de datos en disco') as registro:
+                    df = cache_disco.leer(clave) if en_disco else None
+                    registro.filas = None if df is None else len(df)
+                df, reporte = (df, None) if df is not None else cargar()
+                self._guardar(clave, df, reporte, en_disco)
+                return df, reporte
+        finally:
+            self._soltar_carga(clave)
+
+    def tablero(self, clave, construir):
+        """
+        Tablero del dataset de la clave, construido con construir() la primera vez
+        - Vive en la entrada del dataset: se comparte entre sesiones y se desaloja con ella
+        - Si el dataset ya no está en el cache, el tablero se construye sin guardarse
+        """
+        entrada = self._buscar(clave)
+        if entrada is not None and entrada['tablero'] is not None:
+            tablero = entrada['tablero']
+        else:
+            try:
+                with self._candado_carga(('tablero', clave)):
+                    entrada = self._buscar(clave)
+                    if entrada is None:
+                        return construir()
+                    if entrada['tablero'] is None:
+                        entrada['tablero'] = construir()
+                    tablero = entrada['tablero']
+            finally:
+                self._soltar_carga(('tablero', clave))
+        self._medir_tablero(clave, tablero)
+        return tablero
+
+    def _medir_tablero(self, clave, tablero):
+        """Suma a la entrada el tamaño actual de su tablero y desaloja si se pasó del límite"""
+        tamano = tablero.tamano()
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada['tablero'] is not tablero:
+                return
+            self.bytes += tamano - entrada['bytes_tablero']
+            entrada['bytes'] += tamano - entrada['bytes_tablero']
+            entrada['bytes_tablero'] = tamano
+            desalojadas = self._desalojar()
+        for antigua, anterior in desalojadas:
+            self._derramar(antigua, anterior)
+
+    def _guardar(self, clave, df, reporte, en_disco=True):
+        congelar(df)
+        tamano = tamano_datos(df)
+        with self._candado:
+            if clave not in self._entradas:
+                self._entradas[clave] = {'df': df, 'reporte': reporte, 'bytes': tamano,
+                                         'en_disco': en_disco, 'tablero': None, 'bytes_tablero': 0}
+                self.bytes += tamano
+            desalojadas = self._desalojar()
+        for antigua, anterior in desalojadas:
+            self._derramar(antigua, anterior)
+
+    def _desalojar(self):
+        """Saca entradas desde la más antigua hasta volver al límite, nunca la recién usada (con el candado)"""
+        desalojadas = []
+        while self.bytes > self.limite_bytes and len(self._entradas) > 1:
+            antigua, anterior = self._entradas.popitem(last=False)
+            self.bytes -= anterior['bytes']
+            desalojadas.append((antigua, anterior))
+        return desalojadas
+
+    def _derramar(self, clave, entrada):
+        """Deja el dataset desalojado como snapshot en disco si aún no está ahí"""
+        df = entrada['df']
+        if entrada['en_disco'] and not df.empty and cache_disco.filas_en_cache(clave) is None:
+            cache_disco.guardar(clave, df)
+
+    def descartar(self, clave):
+        """Quita una entrada (p. ej. la versión anterior del almacén) sin derramarla a disco"""
+        with self._candado:
+            entrada = self._entradas.pop(clave, None)
+            if entrada is not None:
+                self.bytes -= entrada['bytes']
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.bytes = 0
+
+
+# Instancia del proceso: el módulo se importa una vez y la comparten todas las sesiones
+DATOS = CacheDatos()
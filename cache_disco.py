@@ -0,0 +1,168 @@
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import procesamiento
+from trazas import etapa
+
+# Configurable por variables de entorno
+DIRECTORIO_CACHE = os.environ.get('LICITACIONES_CACHE_DIR', '.cache_licitaciones')
+LIMITE_CACHE_BYTES = int(float(os.environ.get('LICITACIONES_CACHE_MB', '2048')) * 1024 * 1024)
+TAMANO_BLOQUE = 1024 * 1024
+# Archivos sobre este tamaño se procesan por bloques, con el pico de memoria indicado
+UMBRAL_STREAMING_BYTES = int(float(os.environ.get('LICITACIONES_STREAMING_MB', '256')) * 1024 * 1024)
+MEMORIA_BLOQUE_MB = float(os.environ.get('LICITACIONES_MEMORIA_BLOQUE_MB', '64'))
+
+
+def _calcular_version_procesamiento():
+    """
+    Huella del procesamiento: si cambia, las entradas antiguas dejan de servir
+    - Cubre el código, la tabla de la UTM y el mes base de los pesos constantes
+    """
+    sha = hashlib.sha256()
+    for ruta in (procesamiento.__file__, procesamiento.ARCHIVO_UTM):
+        with open(ruta, 'rb') as f:
+            sha.update(f.read())
+    sha.update(procesamiento.MES_PESOS_CONSTANTES.encode())
+    return sha.hexdigest()[:16]
+
+
+VERSION_PROCESAMIENTO = _calcular_version_procesamiento()
+
+
+def huella_archivo(origen):
+    """SHA-256 del contenido de una ruta o de un archivo subido, leído por bloques"""
+    sha = hashlib.sha256()
+    if isinstance(origen, (str, os.PathLike)):
+        with open(origen, 'rb') as f:
+            for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b''):
+                sha.update(bloque)
+    else:
+        posicion = origen.tell()
+        origen.seek(0)
+        for bloque in iter(lambda: origen.read(TAMANO_BLOQUE), b''):
+            sha.update(bloque)
+        origen.seek(posicion)
+    return sha.hexdigest()
+
+
+def tamano_origen(origen):
+    """Tamaño en bytes de una ruta o de un archivo subido"""
+    if isinstance(origen, (str, os.PathLike)):
+        return os.path.getsize(origen)
+    posicion = origen.tell()
+    tamano = origen.seek(0, os.SEEK_END)
+    origen.seek(posicion)
+    return tamano
+
+
+def ruta_entrada(huella):
+    """Ruta del snapshot Parquet para una huella de archivo y la versión actual del código"""
+    return os.path.join(DIRECTORIO_CACHE, f"{huella}-{VERSION_PROCESAMIENTO}.parquet")
+
+
+def _eliminar(ruta):
+    """Borra un archivo del cache si existe"""
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def leer(huella):
+    """Devuelve el DataFrame procesado guardado en disco, o None si no existe o está dañado"""
+    ruta = ruta_entrada(huella)
+    try:
+        df = pd.read_parquet(ruta, memory_map=True)
+    except FileNotFoundError:
+        return None
+    except (OSError, pa.ArrowException):
+        # Snapshot truncado o corrupto: se descarta y el llamador vuelve a procesar
+        _eliminar(ruta)
+        return None
+    # Marca la entrada como recién usada para el desalojo LRU
+    os.utime(ruta)
+    return procesamiento.compactar(df)
+
+
+def filas_en_cache(huella):
+    """Filas del snapshot en disco según sus metadatos, sin cargarlo; None si no existe o está dañado"""
+    ruta = ruta_entrada(huella)
+    try:
+        return pq.ParquetFile(ruta).metadata.num_rows
+    except FileNotFoundError:
+        return None
+    except (OSError, pa.ArrowException):
+        _eliminar(ruta)
+        return None
+
+
+def guardar(huella, df):
+    """Guarda el DataFrame procesado y aplica el límite de tamaño del directorio"""
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    ruta = ruta_entrada(huella)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+    finally:
+        _eliminar(temporal)
+    desalojar(LIMITE_CACHE_BYTES)
+
+
+def procesar_por_bloques(origen, huella):
+    """Procesa el CSV por bloques hacia la entrada de cache y la lee de vuelta"""
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    ruta = ruta_entrada(huella)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        procesamiento.procesar_csv_por_bloques(origen, temporal, memoria_mb=MEMORIA_BLOQUE_MB)
+        os.replace(temporal, ruta)
+    finally:
+        _eliminar(temporal)
+    df = leer(huella)
+    desalojar(LIMITE_CACHE_BYTES)
+    return df
+
+
+def desalojar(limite_bytes):
+    """Elimina las entradas menos usadas recientemente hasta quedar bajo el límite"""
+    if not os.path.isdir(DIRECTORIO_CACHE):
+        return
+    entradas = []
+    for nombre in os.listdir(DIRECTORIO_CACHE):
+        if nombre.endswith('.parquet'):
+            estado = os.stat(os.path.join(DIRECTORIO_CACHE, nombre))
+            entradas.append((estado.st_mtime, estado.st_size, nombre))
+    total = sum(tamano for _, tamano, _ in entradas)
+    for _, tamano, nombre in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        _eliminar(os.path.join(DIRECTORIO_CACHE, nombre))
+        total -= tamano
+
+
+def cargar_con_cache(origen, huella=None):
+    """
+    Procesa un CSV reutilizando el snapshot en disco si existe
+    - La clave combina el SHA-256 del archivo y la versión del código de procesamiento
+    - Un archivo sin filas no se guarda
+    - Los archivos grandes se procesan por bloques directo a disco y solo se
+      conservan las columnas del dashboard
+    """
+    with etapa('huella del archivo'):
+        huella = huella or huella_archivo(origen)
+    with etapa('lectura cache en disco') as registro:
+        df = leer(huella)
+        registro.filas = None if df is None else len(df)
+    if df is not None:
+        return df
+    if tamano_origen(origen) > UMBRAL_STREAMING_BYTES:
+        return procesar_por_bloques(origen, huella)
+    df = procesamiento.procesar_csv(origen)
+    if not df.empty:
+        guardar(huella, df)
+    return df
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from trazas import etapa
+
+# Presupuesto de memoria del cache de figuras, compartido por todas las sesiones
+LIMITE_FIGURAS_BYTES = int(float(os.environ.get('LICITACIONES_CACHE_FIGURAS_MB', '64')) * 1024 * 1024)
+
+
+def clave_figura(version, selecciones, busqueda, nombre, **selector):
+    """
+    Hash canónico del estado que determina una figura
+    - El orden de los valores seleccionados no cambia la clave
+    - La búsqueda se compara sin espacios sobrantes
+    - selector recoge los controles propios de la pestaña (región, categoría...)
+    """
+    estado = {
+        'version': version,
+        'selecciones': {columna: sorted(map(str, valores)) for columna, valores in selecciones.items()},
+        'busqueda': ' '.join(busqueda.split()),
+        'figura': nombre,
+        'selector': selector,
+    }
+    texto = json.dumps(estado, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class CacheFiguras:
+    """
+    Cache LRU de figuras Plotly con límite de memoria
+    - El tamaño de cada entrada es el de su JSON serializado, medido al guardarla
+    - Un acierto devuelve la figura ya construida, sin recalcular sus datos
+    - Es seguro entre hilos: Streamlit atiende cada sesión en su propio hilo
+    """
+
+    def __init__(self, limite_bytes=LIMITE_FIGURAS_BYTES):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, clave, construir):
+        """
+        Devuelve (figura, bytes de su JSON) para la clave
+        - Si no está, la construye con construir()
+        """
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+        with etapa('construcción'):
+            figura = construir()
+        with etapa('serialización JSON'):
+            tamano = len(pio.to_json(figura, validate=False))
+        with self._candado:
+            if clave not in self._entradas and tamano <= self.limite_bytes:
+                self._entradas[clave] = (figura, tamano)
+                self.bytes += tamano
+                self._desalojar()
+        return figura, tamano
+
+    def _desalojar(self):
+        """Quita las figuras menos usadas recientemente hasta quedar bajo el límite"""
+        while self.bytes > self.limite_bytes:
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self.bytes -= tamano
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.bytes = 0
+
+
+# Instancia del proceso: el módulo se importa una vez y la comparten todas las sesiones
+FIGURAS = CacheFiguras()
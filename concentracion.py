@@ -0,0 +1,101 @@
+"""
+Concentración del mercado de organismos licitantes: HHI, Gini, curva de Lorenz y Top-N
+
+Todas las métricas salen de una misma pasada vectorizada sobre el agregado por organismo:
+se ordena cada segmento (p. ej. un año) por la medida y se acumula con cumsum, así un
+año, todos los años o la grilla completa Año × Region × CategoriaOrganismo cuestan un
+orden y unas sumas, sin recorrer los segmentos uno a uno.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from cubo import agregar
+
+DIMENSIONES_GRILLA = ('Año', 'Region', 'CategoriaOrganismo')
+TOPS = (5, 10, 20)
+
+
+def _segmentos(agregado, por):
+    """Código de segmento de cada fila del agregado (0 si no se segmenta)"""
+    if not por:
+        return np.zeros(len(agregado), dtype=np.int64)
+    return agregado.groupby(list(por), observed=True, sort=False).ngroup().to_numpy()
+
+
+def _ordenar(agregado, por, medida):
+    """
+    Valores de la medida ordenados de mayor a menor dentro de cada segmento
+    - Devuelve (orden, valores, inicios, tamaños, totales, acumulado)
+    """
+    valores = agregado[medida].to_numpy(dtype=float, na_value=0.0)
+    segmentos = _segmentos(agregado, por)
+    orden = np.lexsort((-valores, segmentos))
+    valores, segmentos = valores[orden], segmentos[orden]
+    inicios = np.flatnonzero(np.concatenate(([True], segmentos[1:] != segmentos[:-1])))
+    tamanos = np.diff(np.append(inicios, len(valores)))
+    acumulado = np.cumsum(valores)
+    acumulado -= np.repeat(acumulado[inicios] - valores[inicios], tamanos)
+    totales = acumulado[inicios + tamanos - 1]
+    return orden, valores, inicios, tamanos, totales, acumulado
+
+
+def metricas(agregado, por=(), medida='Licitaciones'):
+    """
+    Métricas de concentración por segmento, a partir del agregado por organismo
+    - agregado: una fila por segmento y Organismo con la medida (p. ej. de Seleccion._agregar)
+    - HHI en escala 0–10.000; Gini entre 0 (reparto parejo) y 1; Top N en % del total
+    """
+    por = list(por)
+    columnas = [*por, 'Organismos', 'Total', 'HHI', 'Gini', *(f'Top{n}' for n in TOPS)]
+    agregado = agregado[agregado[medida] > 0]
+    if agregado.empty:
+        return pd.DataFrame(columns=columnas)
+    orden, valores, inicios, tamanos, totales, acumulado = _ordenar(agregado, por, medida)
+    total_fila = np.repeat(totales, tamanos)
+    # Posición ascendente (1..n) de cada organismo en su segmento, para el Gini
+    ascendente = np.repeat(inicios + tamanos, tamanos) - np.arange(len(valores))
+    resultado = agregado.iloc[orden[inicios]][por].reset_index(drop=True)
+    resultado['Organismos'] = tamanos
+    resultado['Total'] = totales
+    resultado['HHI'] = np.add.reduceat((valores / total_fila) ** 2, inicios) * 10_000
+    resultado['Gini'] = (2 * np.add.reduceat(ascendente * valores, inicios) / (tamanos * totales)
+                         - (tamanos + 1) / tamanos)
+    for n in TOPS:
+        resultado[f'Top{n}'] = acumulado[inicios + np.minimum(n, tamanos) - 1] / totales * 100
+    return resultado[columnas]
+
+
+def lorenz(agregado, por=(), medida='Licitaciones'):
+    """
+    Curva de Lorenz de cada segmento: % acumulado de organismos (de menor a mayor) vs % de la medida
+    - Cada segmento parte en (0, 0) y termina en (100, 100)
+    """
+    por = list(por)
+    agregado = agregado[agregado[medida] > 0]
+    if agregado.empty:
+        return pd.DataFrame(columns=[*por, 'Organismos_%', 'Acumulado_%'])
+    orden, valores, inicios, tamanos, totales, acumulado = _ordenar(agregado, por, medida)
+    # De mayor a menor, lo acumulado de los menores es el total menos lo acumulado antes de cada fila
+    menores = np.repeat(totales, tamanos) - (acumulado - valores)
+    posicion = np.repeat(inicios + tamanos, tamanos) - np.arange(len(valores))
+    curva = agregado.iloc[orden][por].reset_index(drop=True)
+    curva['Organismos_%'] = posicion / np.repeat(tamanos, tamanos) * 100
+    curva['Acumulado_%'] = menores / np.repeat(totales, tamanos) * 100
+    origen = agregado.iloc[orden[inicios]][por].reset_index(drop=True).assign(**{'Organismos_%': 0.0, 'Acumulado_%': 0.0})
+    curva = pd.concat([origen, curva], ignore_index=True)
+    return curva.sort_values([*por, 'Organismos_%'], kind='stable').reset_index(drop=True)
+
+
+def grilla(celdas, medida='Licitaciones', dimensiones=DIMENSIONES_GRILLA):
+    """
+    Métricas de todos los segmentos de Año × Region × CategoriaOrganismo y sus totales
+    - Un valor nulo en una dimensión significa "todos" (el cubo descarta las claves nulas al agregar)
+    """
+    partes = []
+    for k in range(len(dimensiones) + 1):
+        for por in combinations(dimensiones, k):
+            partes.append(metricas(agregar(celdas, [*por, 'Organismo'], [medida]), por, medida))
+    resultado = pd.concat([parte for parte in partes if not parte.empty], ignore_index=True)
+    return resultado[[*dimensiones, *(c for c in resultado.columns if c not in dimensiones)]]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from procesamiento import concatenar
+
+# Dimensiones y medidas del cubo precalculado
+DIMENSIONES = ['Año', 'Mes', 'Region', 'CategoriaOrganismo', 'Organismo']
+MEDIDAS = ['Filas', 'Licitaciones', 'Monto', 'Montos']
+MESES_ABREVIADOS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def construir_cubo(df):
+    """
+    Agrega las filas por Año × Mes × Region × CategoriaOrganismo × Organismo
+    - Filas: licitaciones en la celda
+    - Licitaciones: filas con IDLicitacion (equivale a count('IDLicitacion'))
+    - Monto / Montos: suma y cantidad de valores de Monto_CLP_Millones disponibles
+    - Conserva las celdas con dimensiones nulas para que los totales cuadren con las filas
+    """
+    return df.groupby(DIMENSIONES, dropna=False, sort=False, observed=True).agg(
+        Filas=('Region', 'size'),
+        Licitaciones=('IDLicitacion', 'count'),
+        Monto=('Monto_CLP_Millones', 'sum'),
+        Montos=('Monto_CLP_Millones', 'count'),
+    ).reset_index()
+
+
+def actualizar_cubo(celdas, nuevas=None, retiradas=None):
+    """
+    Actualiza el cubo sin recorrer el dataset completo
+    - Suma la contribución de las filas nuevas y resta la de las retiradas
+    - Las celdas que quedan sin filas se eliminan
+    """
+    partes = [celdas]
+    if nuevas is not None and not nuevas.empty:
+        partes.append(construir_cubo(nuevas))
+    if retiradas is not None and not retiradas.empty:
+        resta = construir_cubo(retiradas)
+        resta[MEDIDAS] = -resta[MEDIDAS]
+        partes.append(resta)
+    if len(partes) == 1:
+        return celdas
+    suma = concatenar(partes).groupby(DIMENSIONES, dropna=False, sort=False, observed=True)[MEDIDAS].sum()
+    return suma[suma['Filas'] > 0].reset_index()
+
+
+def agregar(celdas, por, medidas=('Filas',)):
+    """Suma las medidas del cubo agrupando por las columnas indicadas (descarta claves nulas)"""
+    return celdas.groupby(por, observed=True)[list(medidas)].sum().reset_index()
+
+
+def con_calendario(celdas):
+    """Agrega MesNombre y Trimestre derivados de Mes"""
+    celdas = celdas.copy()
+    meses = np.array([None] + MESES_ABREVIADOS, dtype=object)
+    mes = celdas['Mes'].to_numpy(dtype=float, na_value=np.nan)
+    celdas['MesNombre'] = meses[np.nan_to_num(mes, nan=0).astype(int)]
+    celdas['Trimestre'] = (celdas['Mes'] - 1) // 3 + 1
+    return celdas
+
@@ -0,0 +1,107 @@
+"""
+Exportación de la selección en CSV, CSV comprimido, Parquet y Excel
+
+Las filas se escriben por bloques a un archivo temporal en disco, así la memoria usada
+no depende del tamaño de la exportación. Solo se genera cuando se pide la descarga.
+"""
+import gzip
+import io
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+# Filas por bloque al exportar; acota la memoria adicional de una exportación
+FILAS_POR_BLOQUE = int(os.environ.get('LICITACIONES_EXPORTACION_BLOQUE', '50000'))
+# Filas de datos que admite una hoja de Excel (la primera es el encabezado)
+LIMITE_FILAS_XLSX = 1_048_575
+# En CSV las fechas van como en la tabla; Parquet y Excel conservan el tipo fecha
+FORMATO_FECHA_CSV = '%d/%m/%Y'
+
+
+def _fechas_como_texto(bloque):
+    fechas = bloque.select_dtypes('datetime').columns
+    if len(fechas):
+        bloque = bloque.assign(**{columna: bloque[columna].dt.strftime(FORMATO_FECHA_CSV) for columna in fechas})
+    return bloque
+
+
+def escribir_csv(bloques, destino):
+    """CSV en UTF-8 con BOM (lo abre bien Excel); el encabezado va solo en el primer bloque"""
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    for i, bloque in enumerate(bloques):
+        _fechas_como_texto(bloque).to_csv(texto, index=False, header=i == 0)
+    texto.flush()
+    texto.detach()
+
+
+def escribir_csv_gzip(bloques, destino):
+    with gzip.GzipFile(fileobj=destino, mode='wb') as comprimido:
+        escribir_csv(bloques, comprimido)
+
+
+def _esquema_parquet(bloque):
+    """
+    Esquema Arrow de la exportación a partir de los tipos de las columnas
+    - Las columnas de objetos van como texto: inferido de un primer bloque todo nulo
+      quedarían de tipo null y los bloques siguientes no podrían convertirse
+    """
+    esquema = pa.Schema.from_pandas(bloque, preserve_index=False)
+    campos = [campo.with_type(pa.string()) if bloque[campo.name].dtype == object or pa.types.is_null(campo.type)
+              else campo for campo in esquema]
+    return pa.schema(campos, metadata=esquema.metadata)
+
+
+def escribir_parquet(bloques, destino):
+    escritor = None
+    try:
+        for bloque in bloques:
+            tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(destino, _esquema_parquet(bloque))
+            escritor.write_table(tabla.cast(escritor.schema))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def escribir_xlsx(bloques, destino):
+    """Excel en modo de solo escritura: openpyxl no guarda las celdas en memoria"""
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet('Licitaciones')
+    for i, bloque in enumerate(bloques):
+        if i == 0:
+            hoja.append(list(bloque.columns))
+        valores = bloque.astype(object)
+        for fila in valores.where(bloque.notna(), None).itertuples(index=False, name=None):
+            hoja.append(fila)
+    libro.save(destino)
+
+
+# Nombre visible -> (extensión, MIME, escritor)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv', escribir_csv),
+    'CSV comprimido (gzip)': ('csv.gz', 'application/gzip', escribir_csv_gzip),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', escribir_parquet),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', escribir_xlsx),
+}
+
+
+def formatos_disponibles(filas):
+    """Formatos que admiten esa cantidad de filas"""
+    return [nombre for nombre in FORMATOS if nombre != 'Excel' or filas <= LIMITE_FILAS_XLSX]
+
+
+def exportar(seleccion, columnas, formato, orden_por=None, ascendente=True, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Escribe la selección en el formato pedido
+    - Respeta el orden de la tabla
+    - Devuelve un archivo temporal abierto al inicio; se borra al cerrarlo
+    """
+    escribir = FORMATOS[formato][2]
+    destino = tempfile.TemporaryFile()
+    escribir(seleccion.bloques(columnas, filas_por_bloque, orden_por, ascendente), destino)
+    destino.seek(0)
+    return destino
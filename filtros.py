@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# Dimensiones de los filtros de la barra lateral
+COLUMNAS_FILTRO = ('Año', 'Region', 'CategoriaOrganismo')
+
+_BITS = np.arange(8)
+
+
+class IndiceFiltros:
+    """
+    Bitmaps por valor para los filtros de la barra lateral
+    - Se construye una vez por dataset
+    - Una selección es un OR de bitmaps dentro de cada columna y un AND entre columnas
+    - Devuelve posiciones de fila, sin copiar el DataFrame
+    """
+
+    def __init__(self, df, columnas=COLUMNAS_FILTRO):
+        self.filas = len(df)
+        # Bitmaps rellenos hasta múltiplo de 8 bytes para recorrerlos como palabras de 64 bits
+        self.bytes = -(-self.filas // 64) * 8
+        self.bitmaps = {}
+        self.sin_nulos = {}
+        for columna in columnas:
+            codigos, valores = pd.factorize(df[columna], sort=True)
+            self.bitmaps[columna] = {
+                valor: self._empaquetar(codigos == codigo) for codigo, valor in enumerate(valores)
+            }
+            self.sin_nulos[columna] = not (codigos < 0).any()
+
+    def _empaquetar(self, mascara):
+        bitmap = np.zeros(self.bytes, dtype=np.uint8)
+        empaquetado = np.packbits(mascara)
+        bitmap[:len(empaquetado)] = empaquetado
+        return bitmap
+
+    def _posiciones(self, bitmap):
+        """Convierte un bitmap en posiciones de fila ordenadas"""
+        if np.count_nonzero(bitmap) > len(bitmap) // 8:
+            return np.flatnonzero(np.unpackbits(bitmap, count=self.filas))
+        # Selección dispersa: solo se desempaquetan las palabras con algún bit activo
+        palabras = np.flatnonzero(bitmap.view(np.uint64))
+        indices = (palabras[:, None] * 8 + _BITS).ravel()
+        bytes_activos = bitmap[indices]
+        activos = bytes_activos != 0
+        indices = indices[activos]
+        bits = np.unpackbits(bytes_activos[activos]).reshape(-1, 8).astype(bool)
+        return (indices[:, None] * 8 + _BITS)[bits]
+
+    def _union(self, columna, valores):
+        """OR de los bitmaps de los valores elegidos; None si la columna no restringe nada"""
+        bitmaps = self.bitmaps[columna]
+        elegidos = [bitmaps[valor] for valor in set(valores) if valor in bitmaps]
+        # Con todos los valores elegidos y sin nulos, la columna no descarta filas
+        if self.sin_nulos[columna] and len(elegidos) == len(bitmaps):
+            return None
+        union = np.zeros(self.bytes, dtype=np.uint8)
+        for bitmap in elegidos:
+            np.bitwise_or(union, bitmap, out=union)
+        return union
+
+    def seleccionar(self, selecciones):
+        """
+        Posiciones de las filas que cumplen todas las selecciones {columna: valores}
+        - Una lista vacía no filtra esa columna, como en la barra lateral
+        - Devuelve None si ninguna selección restringe filas
+        """
+        resultado = None
+        for columna, valores in selecciones.items():
+            if not valores:
+                continue
+            union = self._union(columna, valores)
+            if union is None:
+                continue
+            if resultado is None:
+                resultado = union
+            else:
+                np.bitwise_and(resultado, union, out=resultado)
+        if resultado is None:
+            return None
+        return self._posiciones(resultado)
+
+    def filtrar(self, df, selecciones):
+        """Aplica las selecciones con un único take; sin restricciones devuelve el mismo DataFrame"""
+        posiciones = self.seleccionar(selecciones)
+        if posiciones is None:
+            return df
+        return df.take(posiciones)
@@ -0,0 +1,102 @@
+"""
+Figuras de los análisis por región y por tipo de organismo
+
+Reciben los datos ya agregados (de una Seleccion) y devuelven la figura Plotly; las usan
+el dashboard y el generador de reportes por lotes (reportes.py).
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from cubo import MESES_ABREVIADOS
+from muestreo import modo_render, reducir_serie
+
+
+def top_region(top_organismos_region, region):
+    """Top 10 organismos de la región por cantidad de licitaciones"""
+    fig_top_region = px.bar(
+        x=top_organismos_region.values,
+        y=top_organismos_region.index,
+        title=f'Top 10 Organismos en {region}',
+        orientation='h',
+        color=top_organismos_region.values,
+        color_continuous_scale='Viridis'
+    )
+    fig_top_region.update_layout(xaxis_title="Cantidad de Licitaciones", yaxis_title="")
+    return fig_top_region
+
+
+def evolucion_region(evolucion, region):
+    """Licitaciones por año en la región"""
+    serie = reducir_serie(evolucion, 'Cantidad')
+    fig_evol_region = px.line(
+        serie,
+        x='Año',
+        y='Cantidad',
+        title=f'Evolución en {region}',
+        markers=True,
+        render_mode=modo_render(len(serie))
+    )
+    fig_evol_region.update_layout(xaxis_title="Año", yaxis_title="Licitaciones")
+    return fig_evol_region
+
+
+def mapa_calor(heatmap_data, region):
+    """Licitaciones por año y mes en la región"""
+    return px.density_heatmap(
+        heatmap_data,
+        x='Año',
+        y='MesNombre',
+        z='Cantidad',
+        title=f'Estacionalidad de Licitaciones en {region}',
+        color_continuous_scale='Reds',
+        category_orders={"MesNombre": MESES_ABREVIADOS}
+    )
+
+
+def top_organismos(top_20):
+    """Ranking de organismos por cantidad de licitaciones, coloreado por monto"""
+    fig_top = px.bar(
+        top_20,
+        x='Cantidad',
+        y='Organismo',
+        title='Por Cantidad de Licitaciones',
+        orientation='h',
+        color='Monto_Total_MM',
+        color_continuous_scale='Viridis',
+        text='Cantidad'
+    )
+    fig_top.update_layout(yaxis={'categoryorder':'total ascending'})
+    return fig_top
+
+
+def curva_lorenz(curva, medida):
+    """Curva de Lorenz de los organismos frente a la línea de reparto parejo"""
+    fig_lorenz = px.area(
+        reducir_serie(curva, 'Acumulado_%'),
+        x='Organismos_%',
+        y='Acumulado_%',
+        title='Curva de Lorenz'
+    )
+    fig_lorenz.add_trace(go.Scatter(x=[0, 100], y=[0, 100], mode='lines', name='Reparto parejo',
+                                    line=dict(dash='dash', color='gray')))
+    fig_lorenz.update_layout(xaxis_title="% acumulado de organismos", yaxis_title=f"% acumulado de {medida.lower()}")
+    return fig_lorenz
+
+
+def tendencia_concentracion(anual):
+    """HHI y Gini por año"""
+    fig_concentracion = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_concentracion.add_trace(
+        go.Bar(x=anual['Año'], y=anual['HHI'], name="HHI", marker_color='#3498db'),
+        secondary_y=False,
+    )
+    fig_concentracion.add_trace(
+        go.Scatter(x=anual['Año'], y=anual['Gini'], name="Gini", marker_color='#e74c3c', line=dict(width=3)),
+        secondary_y=True,
+    )
+    fig_concentracion.update_layout(title_text="Concentración por Año", hovermode='x unified')
+    fig_concentracion.update_xaxes(title_text="Año")
+    fig_concentracion.update_yaxes(title_text="HHI (0–10.000)", secondary_y=False)
+    fig_concentracion.update_yaxes(title_text="Gini", range=[0, 1], secondary_y=True)
+    return fig_concentracion
@@ -0,0 +1,97 @@
+"""
+Ingesta de varios CSV (uno por año o por mes) en un solo dataset
+
+Cada archivo se procesa en un proceso del pool y queda como snapshot Parquet en el
+cache en disco; el proceso principal solo lee los snapshots (memory map) y los une.
+Así no viajan DataFrames grandes entre procesos.
+"""
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import cache_disco
+import procesamiento
+
+# Procesos para la ingesta en paralelo; por defecto uno por núcleo
+PROCESOS_INGESTA = int(os.environ.get('LICITACIONES_PROCESOS', '0')) or os.cpu_count() or 1
+# Directorio opcional con los CSV a cargar cuando no se sube ningún archivo
+DIRECTORIO_DATOS = os.environ.get('LICITACIONES_DIRECTORIO_DATOS', '')
+
+
+def archivos_de_directorio(directorio):
+    """CSV de un directorio, ordenados por nombre (cronológico si se nombran por periodo)"""
+    return sorted(glob.glob(os.path.join(directorio, '*.csv')))
+
+
+def _nombre(origen):
+    return os.path.basename(origen) if isinstance(origen, (str, os.PathLike)) else getattr(origen, 'name', 'archivo')
+
+
+def _abrir(contenido):
+    """Los archivos subidos viajan al pool como bytes; las rutas, tal cual"""
+    return io.BytesIO(contenido) if isinstance(contenido, bytes) else contenido
+
+
+def _procesar_archivo(nombre, origen):
+    """
+    Trabajo de cada proceso: deja el archivo procesado en el cache en disco
+    - origen es una ruta o los bytes de un archivo subido
+    - Devuelve la huella del snapshot y las métricas del archivo
+    """
+    inicio = time.perf_counter()
+    origen = _abrir(origen)
+    tamano = cache_disco.tamano_origen(origen)
+    huella = cache_disco.huella_archivo(origen)
+    filas = cache_disco.filas_en_cache(huella)
+    desde_cache = filas is not None
+    if not desde_cache:
+        filas = len(cache_disco.cargar_con_cache(origen, huella))
+    segundos = time.perf_counter() - inicio
+    return huella, {
+        'archivo': nombre,
+        'filas': filas,
+        'MB': tamano / 1024 / 1024,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos else 0.0,
+        'desde_cache': desde_cache,
+    }
+
+
+def deduplicar(df):
+    """Deja la última aparición de cada IDLicitacion; las filas sin ID se conservan todas"""
+    if 'IDLicitacion' not in df.columns:
+        return df
+    repetidas = df['IDLicitacion'].duplicated(keep='last') & df['IDLicitacion'].notna()
+    return df[~repetidas].reset_index(drop=True)
+
+
+def cargar_varios(origenes, procesos=PROCESOS_INGESTA):
+    """
+    Procesa varios CSV en paralelo y los une en un único dataset
+    - origenes: rutas o archivos subidos; ante IDLicitacion repetidos gana el archivo posterior
+    - Devuelve (df, reporte) con una fila de métricas por archivo
+    """
+    trabajos = []
+    for origen in origenes:
+        contenido = origen if isinstance(origen, (str, os.PathLike)) else origen.getvalue()
+        trabajos.append((_nombre(origen), contenido))
+
+    if procesos > 1 and len(trabajos) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(trabajos))) as pool:
+            resultados = list(pool.map(_procesar_archivo, *zip(*trabajos)))
+    else:
+        resultados = [_procesar_archivo(nombre, contenido) for nombre, contenido in trabajos]
+
+    frames = []
+    for (huella, _), (_, contenido) in zip(resultados, trabajos):
+        df = cache_disco.leer(huella)
+        if df is None:
+            # Archivo sin filas (no se guarda) o entrada ya desalojada del cache
+            df = cache_disco.cargar_con_cache(_abrir(contenido), huella)
+        frames.append(df)
+    df = deduplicar(procesamiento.compactar(procesamiento.concatenar(frames)))
+    return df, pd.DataFrame([metricas for _, metricas in resultados])
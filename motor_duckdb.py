@@ -0,0 +1,186 @@
+"""
+Motor de consultas DuckDB para el dashboard (LICITACIONES_MOTOR=duckdb)
+
+Las filas procesadas se cargan en una base DuckDB embebida y cada filtro o agregación
+del dashboard se resuelve con SQL: ejecución vectorizada en varios hilos y, con la base en
+disco (LICITACIONES_DUCKDB), derrame a disco cuando los datos no caben en memoria.
+La búsqueda de texto sigue usando el índice en memoria; sus resultados entran a la
+consulta como una tabla de posiciones.
+"""
+import itertools
+import os
+import threading
+import weakref
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from cubo import DIMENSIONES, MESES_ABREVIADOS
+from tablero import Seleccion, Tablero
+from trazas import etapa
+
+# Ruta de la base DuckDB; vacía la mantiene en memoria
+RUTA_DUCKDB = os.environ.get('LICITACIONES_DUCKDB', '')
+
+COLUMNAS_MOTOR = ['IDLicitacion', *DIMENSIONES, 'Monto_CLP_Millones']
+
+# Medidas del cubo calculadas sobre las filas (mismas definiciones que construir_cubo)
+_MEDIDAS_SQL = {
+    'Filas': 'count(*)',
+    'Licitaciones': 'count("IDLicitacion")',
+    'Monto': 'coalesce(sum("Monto_CLP_Millones"), 0)',
+    'Montos': 'count("Monto_CLP_Millones")',
+}
+# Columnas derivadas de Mes, como cubo.con_calendario
+_DERIVADAS_SQL = {
+    'MesNombre': 'CASE "Mes" ' + ' '.join(f"WHEN {i} THEN '{mes}'" for i, mes in enumerate(MESES_ABREVIADOS, 1)) + ' END',
+    'Trimestre': '("Mes" - 1) // 3 + 1',
+}
+
+
+def _expresion(columna):
+    return _DERIVADAS_SQL.get(columna, f'"{columna}"')
+
+
+def _parametro(valor):
+    """Los escalares de numpy (p. ej. Año como int16) se pasan a DuckDB como tipos de Python"""
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+# Sufijo de las tablas del proceso y bases en disco ya abiertas (y limpiadas) por el proceso
+_TABLAS = itertools.count()
+_RUTAS_ABIERTAS = set()
+_CANDADO_RUTAS = threading.Lock()
+
+
+def _conectar(ruta):
+    """
+    Conexión a la base; la primera vez que el proceso abre una base en disco borra las tablas
+    de tableros que quedaron de ejecuciones anteriores (DuckDB no deja que otro proceso la use)
+    """
+    conexion = duckdb.connect(ruta or ':memory:')
+    with _CANDADO_RUTAS:
+        if ruta and ruta not in _RUTAS_ABIERTAS:
+            _RUTAS_ABIERTAS.add(ruta)
+            huerfanas = conexion.execute("SELECT table_name FROM duckdb_tables() "
+                                         "WHERE table_name LIKE 'licitaciones%'").fetchall()
+            for (tabla,) in huerfanas:
+                conexion.execute(f'DROP TABLE IF EXISTS "{tabla}"')
+    return conexion
+
+
+def _borrar_tabla(conexion, tabla):
+    try:
+        conexion.execute(f'DROP TABLE IF EXISTS "{tabla}"')
+        conexion.close()
+    except duckdb.Error:
+        pass
+
+
+class TableroDuckDB(Tablero):
+    """
+    Tablero cuyas agregaciones corren en DuckDB
+    - La tabla, el orden y la exportación siguen leyendo las filas de df
+    - Cada tablero tiene su propia tabla (licitaciones_<version>_<n>): varios tableros pueden
+      compartir la base en disco sin pisarse
+    - La tabla se borra cuando el tablero deja de usarse (p. ej. al desalojarlo de DATOS), así
+      la base en disco no crece con cada dataset
+    """
+
+    def __init__(self, df, ruta=RUTA_DUCKDB):
+        super().__init__(df)
+        self.conexion = _conectar(ruta)
+        self.tabla = f'licitaciones_{self.version}_{next(_TABLAS)}'
+        origen = self.df[COLUMNAS_MOTOR].assign(fila=np.arange(len(self.df)))
+        self.conexion.register('origen', origen)
+        self.conexion.execute(f'CREATE TABLE "{self.tabla}" AS SELECT * FROM origen')
+        self.conexion.unregister('origen')
+        weakref.finalize(self, _borrar_tabla, self.conexion, self.tabla)
+        # Con la base en memoria, la tabla es una copia más de las columnas del motor
+        self._bytes_tabla = 0 if ruta else int(origen.memory_usage(index=True, deep=True).sum())
+
+    def tamano(self):
+        return super().tamano() + self._bytes_tabla
+
+    def filtrar(self, selecciones, busqueda='', colapsar=False):
+        """Misma semántica que Tablero.filtrar: una lista vacía no filtra y los nulos quedan fuera"""
+        condiciones, parametros = [], []
+        for columna, valores in selecciones.items():
+            if valores:
+                condiciones.append(f'"{columna}" IN ({", ".join("?" * len(valores))})')
+                parametros.extend(_parametro(valor) for valor in valores)
+        encontradas = self.indice_similitud.representantes if colapsar else None
+        if busqueda:
+            with etapa('búsqueda') as registro:
+                encontradas = self.indice_busqueda.buscar(busqueda, candidatos=encontradas)
+                registro.filas = len(encontradas)
+        return SeleccionDuckDB(self.conexion, self.tabla, condiciones, parametros, encontradas, self.df,
+                               self.indice_orden)
+
+
+class SeleccionDuckDB(Seleccion):
+    """Selección expresada como condiciones SQL; cada consulta usa su propio cursor"""
+
+    def __init__(self, conexion, tabla, condiciones, parametros, encontradas=None, df=None, indice_orden=None):
+        super().__init__(None, df, None, indice_orden)
+        self._conexion = conexion
+        self._tabla = tabla
+        self._condiciones = condiciones
+        self._parametros = parametros
+        self._encontradas = encontradas
+        self._posiciones_sql = None
+
+    def _derivar(self, condicion, valor):
+        return SeleccionDuckDB(self._conexion, self._tabla, self._condiciones + [condicion], self._parametros + [valor],
+                               self._encontradas, self._df, self._indice_orden)
+
+    def _consultar(self, select, condiciones=(), sufijo=''):
+        condiciones = [*self._condiciones, *condiciones]
+        if self._encontradas is not None:
+            condiciones.append('fila IN (SELECT fila FROM encontradas)')
+        where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ''
+        with etapa('consulta DuckDB') as registro, self._conexion.cursor() as cursor:
+            if self._encontradas is not None:
+                cursor.register('encontradas', pd.DataFrame({'fila': self._encontradas}))
+            resultado = cursor.execute(f'SELECT {select} FROM "{self._tabla}"{where}{sufijo}', self._parametros).df()
+            registro.filas = len(resultado)
+            return resultado
+
+    @property
+    def vacia(self):
+        return self._total('Filas') == 0
+
+    @property
+    def posiciones(self):
+        if not self._condiciones and self._encontradas is None:
+            return None
+        if self._posiciones_sql is None:
+            self._posiciones_sql = self._consultar('fila', sufijo=' ORDER BY fila')['fila'].to_numpy()
+        return self._posiciones_sql
+
+    def por_region(self, region):
+        return self._derivar('"Region" = ?', region)
+
+    def por_categoria(self, categoria):
+        if categoria == 'Todos':
+            return self
+        return self._derivar('"CategoriaOrganismo" = ?', categoria)
+
+    # --- Consultas base ---
+
+    def _agregar(self, por, medidas=('Filas',)):
+        columnas = [por] if isinstance(por, str) else list(por)
+        claves = ', '.join(f'{_expresion(columna)} AS "{columna}"' for columna in columnas)
+        valores = ', '.join(f'{_MEDIDAS_SQL[medida]} AS "{medida}"' for medida in medidas)
+        orden = ', '.join(f'"{columna}"' for columna in columnas)
+        return self._consultar(f'{claves}, {valores}',
+                               [f'{_expresion(columna)} IS NOT NULL' for columna in columnas],
+                               f' GROUP BY ALL ORDER BY {orden}')
+
+    def _total(self, medida):
+        return self._consultar(_MEDIDAS_SQL[medida]).iat[0, 0]
+
+    def _distintos(self, columna):
+        distintos = self._consultar(f'DISTINCT "{columna}"', [f'"{columna}" IS NOT NULL'], f' ORDER BY "{columna}"')
+        return distintos[columna].tolist()
@@ -0,0 +1,54 @@
+"""
+Reducción de series para los gráficos de línea
+
+Los gráficos reciben datos ya agregados desde el cubo; las series temporales además se
+reducen con LTTB (Largest-Triangle-Three-Buckets) cuando superan MAX_PUNTOS_SERIE, así el
+JSON de la figura queda acotado sin importar cuántos meses o años cubran los datos.
+"""
+import os
+
+import numpy as np
+
+# Puntos máximos por serie de línea; sobre UMBRAL_WEBGL las trazas se dibujan con WebGL
+MAX_PUNTOS_SERIE = int(os.environ.get('LICITACIONES_MAX_PUNTOS_SERIE', '1000'))
+UMBRAL_WEBGL = int(os.environ.get('LICITACIONES_UMBRAL_WEBGL', '500'))
+# Tamaño de referencia del JSON de una figura; sobre él se marca en el reporte de la pestaña
+PRESUPUESTO_FIGURA_BYTES = int(float(os.environ.get('LICITACIONES_PRESUPUESTO_FIGURA_KB', '256')) * 1024)
+
+
+def lttb(x, y, puntos):
+    """
+    Posiciones de los puntos que conserva LTTB
+    - Mantiene el primero y el último; de cada tramo intermedio, el que forma el
+      triángulo más grande con el punto elegido antes y el promedio del tramo siguiente
+    """
+    n = len(y)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(int)
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        siguiente = slice(fin, bordes[i + 2] if i + 2 < len(bordes) else n)
+        x_medio, y_medio = x[siguiente].mean(), y[siguiente].mean()
+        areas = np.abs((x[anterior] - x_medio) * (y[inicio:fin] - y[anterior]) -
+                       (x[anterior] - x[inicio:fin]) * (y_medio - y[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+def reducir_serie(df, y, max_puntos=MAX_PUNTOS_SERIE):
+    """Filas de la serie (ya ordenada) que conserva LTTB sobre la columna y; el eje x es la posición"""
+    if len(df) <= max_puntos:
+        return df
+    return df.iloc[lttb(np.arange(len(df)), df[y].to_numpy(dtype=float, na_value=np.nan), max_puntos)]
+
+
+def modo_render(puntos):
+    """render_mode de plotly express: WebGL para series largas, SVG para las cortas"""
+    return 'webgl' if puntos > UMBRAL_WEBGL else 'svg'
@@ -0,0 +1,40 @@
+import threading
+
+import numpy as np
+
+
+class IndiceOrden:
+    """
+    Órdenes precalculados por columna para la tabla paginada
+    - El orden de cada columna se calcula una vez por dataset, la primera vez que se pide
+    - Ordenar una selección es filtrar el orden completo con una máscara: O(n), sin volver a ordenar
+    - Los nulos quedan al final en ambos sentidos
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._ordenes = {}
+        self._lock = threading.Lock()
+
+    def _orden(self, columna):
+        """Posiciones de fila en orden ascendente (estable) y cantidad de valores no nulos"""
+        with self._lock:
+            if columna not in self._ordenes:
+                serie = self.df[columna].reset_index(drop=True)
+                orden = serie.sort_values(kind='stable', na_position='last').index.to_numpy()
+                self._ordenes[columna] = orden, int(serie.notna().sum())
+            return self._ordenes[columna]
+
+    def ordenar(self, posiciones, columna, ascendente=True):
+        """
+        Posiciones de la selección ordenadas por la columna
+        - posiciones None equivale a todas las filas
+        """
+        orden, validos = self._orden(columna)
+        if not ascendente:
+            orden = np.concatenate([orden[:validos][::-1], orden[validos:]])
+        if posiciones is None:
+            return orden
+        mascara = np.zeros(len(self.df), dtype=bool)
+        mascara[posiciones] = True
+        return orden[mascara[orden]]
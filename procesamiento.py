@@ -0,0 +1,530 @@
+import functools
+import os
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from trazas import etapa
+
+SEPARADOR_CSV = ';'
+CODIFICACION_CSV = 'utf-8'
+
+# Columnas del CSV y derivadas, con su tipo en disco: las mismas y en el mismo orden que
+# deja procesar_csv, así el Parquet por bloques se lee igual que el procesamiento en memoria
+COLUMNAS_CSV_DASHBOARD = ['IDLicitacion', 'NombreLicitacion', 'Tipo', 'Estado', 'FechaPublicacion', 'Descripcion',
+                          'Moneda', 'TipoPresupuesto', 'TipoMonto', 'MontoLicitacion', 'Organismo']
+_CATEGORIA = pa.dictionary(pa.int32(), pa.string())
+ESQUEMA_DASHBOARD = pa.schema([
+    ('IDLicitacion', pa.string()),
+    ('NombreLicitacion', pa.string()),
+    ('Tipo', _CATEGORIA),
+    ('Estado', _CATEGORIA),
+    ('FechaPublicacion', pa.timestamp('us')),
+    ('Descripcion', pa.string()),
+    ('Moneda', _CATEGORIA),
+    ('TipoPresupuesto', _CATEGORIA),
+    ('TipoMonto', _CATEGORIA),
+    ('MontoLicitacion', pa.string()),
+    ('Organismo', _CATEGORIA),
+    ('Año', pa.int16()),
+    ('Mes', pa.int8()),
+    ('Region', _CATEGORIA),
+    ('CategoriaOrganismo', _CATEGORIA),
+    ('Monto_Numérico_CLP', pa.float64()),
+    ('Monto_CLP_Millones', pa.float64()),
+    ('Tipo_Monto_Categoria', _CATEGORIA),
+    ('Monto_UTM_Estimado', _CATEGORIA),
+])
+
+# Esquema compacto en memoria: textos con pocos valores distintos como categorías
+# y partes de fecha como enteros pequeños que admiten nulos (NaT). Nombre del mes,
+# trimestre y año-mes no se guardan: se derivan de Mes al agregar (cubo.con_calendario)
+COLUMNAS_CATEGORICAS = ['Tipo', 'Estado', 'Moneda', 'TipoPresupuesto', 'TipoMonto', 'Organismo',
+                        'Region', 'CategoriaOrganismo', 'Tipo_Monto_Categoria', 'Monto_UTM_Estimado']
+COLUMNAS_ENTERAS = {'Año': 'Int16', 'Mes': 'Int8'}
+# Texto largo que no participa en filtros ni gráficos; solo lo usa el buscador
+COLUMNAS_FRIAS = ['Descripcion']
+
+# Memoria aproximada que ocupa en pandas cada byte del CSV una vez enriquecido
+FACTOR_MEMORIA_CSV = 8
+
+# --- TABLAS DE CLASIFICACIÓN ---
+# El orden importa: gana la primera región / categoría que coincida
+
+REGIONES = {
+    'Metropolitana': ['METROPOLITANA', 'SANTIAGO', 'MAIPU', 'SAN RAMON', 'RENCA', 'PROVIDENCIA',
+                     'LAS CONDES', 'NUNOA', 'LA CISTERNA', 'VITACURA', 'LO ESPEJO', 'CERRO NAVIA',
+                     'CONCHALI', 'MACUL', 'LA REINA', 'PEÑAFLOR', 'EL MONTE', 'PAINE'],
+    'Valparaíso': ['VALPARAISO', 'SAN FELIPE', 'VIÑA DEL MAR', 'QUILPUE', 'CARTAGENA', 'SAN ANTONIO',
+                  'LOS ANDES', 'QUILLOTA', 'ZAPALLAR', 'NOGALES', 'LA LIGUA', 'PUCHUNCAVI',
+                  'SAN ESTEBAN', 'CALLE LARGA', 'QUINTA DE TILCOCO', 'LIMACHE', 'SANTA MARIA'],
+    'Biobío': ['BIO BIO', 'CONCEPCIÓN', 'TALCAHUANO', 'LOS ANGELES', 'CHIGUAYANTE', 'SAN PEDRO DE LA PAZ',
+              'CORONEL', 'LOTA', 'CURANILAHUE', 'MULCHEN', 'NACIMIENTO', 'YUNGAY', 'CABRERO'],
+    'La Araucanía': ['ARAUCANIA', 'TEMUCO', 'ANGOL', 'VICTORIA', 'LAUTARO', 'NUEVA IMPERIAL',
+                    'VILCUN', 'CUNCO', 'GORBEA', 'CURACAUTIN', 'LUMACO', 'CHOLCHOL'],
+    'Los Lagos': ['LOS LAGOS', 'PUERTO MONTT', 'OSORNO', 'CASTRO', 'ANCUD', 'PUERTO VARAS',
+                  'LLANQUIHUE', 'PALENA', 'CHILOE', 'CALBUCO', 'MAULLIN'],
+    'Magallanes': ['MAGALLANES', 'PUNTA ARENAS', 'PORVENIR', 'PUERTO NATALES', 'PORVENIR'],
+    'Coquimbo': ['COQUIMBO', 'LA SERENA', 'OVALLE', 'ILLAPEL', 'COMBARBALA', 'ANDACOLLO'],
+    'Aysén': ['AYSEN', 'COYHAIQUE', 'PUERTO AYSEN', 'COCHRANE'],
+    "O'Higgins": ['OHIGGINS', 'RANCAGUA', 'SAN FERNANDO', 'SAN VICENTE', 'PICHIDEGUA',
+                  'LAS CABRAS', 'PEUMO', 'COLTAUCO', 'DOÑIHUE', 'CODEGUA', 'MOSTAZAL', 'OLIVAR'],
+    'Maule': ['MAULE', 'CURICO', 'TALCA', 'LINARES', 'CAUQUENES', 'CONSTITUCION',
+              'PARRAL', 'SAN JAVIER', 'MOLINA', 'SAGRADA FAMILIA', 'PELARCO'],
+    'Ñuble': ['ÑUBLE', 'CHILLAN', 'SAN CARLOS', 'BULNES', 'COBQUECURA', 'QUIRIHUE', 'COIHUECO'],
+    'Arica y Parinacota': ['ARICA', 'PARINACOTA'],
+    'Tarapacá': ['TARAPACA', 'IQUIQUE', 'ALTO HOSPICIO', 'POZO ALMONTE'],
+    'Los Ríos': ['LOS RIOS', 'VALDIVIA', 'LA UNION', 'RIO BUENO', 'PANGUIPULLI'],
+    'Atacama': ['ATACAMA', 'COPIAPO', 'VALLENAR', 'HUASCO', 'ALTO DEL CARMEN'],
+    'Antofagasta': ['ANTOFAGASTA', 'CALAMA', 'TOCOPILLA', 'MARIA ELENA', 'OLLAGUE']
+}
+REGION_POR_DEFECTO = 'Otra / Nacional'
+
+CATEGORIAS = {
+    'Municipalidad / Corporación': ['MUNICIPALIDAD', 'ILUSTRE', 'I.', 'CORP MUNICIPAL', 'CORPORACION MUNICIPAL'],
+    'Salud': ['SERVICIO DE SALUD', 'HOSPITAL', 'SUBSECRETARIA DE SALUD', 'SEREMI DE SALUD',
+              'CESFAM', 'CENTRO DE SALUD', 'CLINICA', 'COMPLEJO ASISTENCIAL'],
+    'Universidad': ['UNIVERSIDAD'],
+    'DGAC': ['DIRECCION GENERAL DE AERONAUTICA CIVIL', 'DGAC'],
+    'Fuerzas Armadas': ['FUERZA AEREA', 'EJERCITO', 'ARMADA', 'COMANDO'],
+    'MOP': ['MINISTERIO DE OBRAS PUBLICAS', 'VIALIDAD', 'MOP'],
+}
+CATEGORIA_POR_DEFECTO = 'Otro Servicio Público'
+
+
+class ClasificadorPalabrasClave:
+    """
+    Busca muchas palabras clave a la vez con una sola expresión regular compilada
+    - Respeta el orden de la tabla: gana la primera etiqueta con alguna coincidencia
+    - Clasifica cada valor distinto una sola vez y luego expande a toda la columna
+    """
+
+    def __init__(self, tabla, por_defecto):
+        self.etiquetas = list(tabla) + [por_defecto]
+        self.prioridad = {}
+        for i, palabras in enumerate(tabla.values()):
+            for palabra in palabras:
+                self.prioridad.setdefault(palabra, i)
+        # Alternativas ordenadas por prioridad dentro de un lookahead: en cada
+        # posición se captura la palabra de mayor prioridad, incluso si se solapa
+        # con otra coincidencia
+        alternativas = sorted(self.prioridad, key=self.prioridad.get)
+        self.patron = re.compile('(?=(' + '|'.join(map(re.escape, alternativas)) + '))')
+        self.por_defecto = len(self.etiquetas) - 1
+
+    def indice(self, texto):
+        """Devuelve el índice de la etiqueta para un texto"""
+        texto = str(texto).upper()
+        mejor = self.por_defecto
+        for coincidencia in self.patron.finditer(texto):
+            mejor = min(mejor, self.prioridad[coincidencia.group(1)])
+            if mejor == 0:
+                break
+        return mejor
+
+    def clasificar(self, texto):
+        """Clasifica un único texto"""
+        return self.etiquetas[self.indice(texto)]
+
+    def clasificar_serie(self, serie):
+        """Clasifica una columna completa"""
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+        indices = np.fromiter((self.indice(valor) for valor in unicos), dtype=np.intp, count=len(unicos))
+        etiquetas = np.array(self.etiquetas, dtype=object)
+        return pd.Series(etiquetas[indices[codigos]], index=serie.index, name=serie.name)
+
+
+CLASIFICADOR_REGION = ClasificadorPalabrasClave(REGIONES, REGION_POR_DEFECTO)
+CLASIFICADOR_CATEGORIA = ClasificadorPalabrasClave(CATEGORIAS, CATEGORIA_POR_DEFECTO)
+
+
+def asignar_region(organismos):
+    """Asigna la región a toda la columna Organismo"""
+    return CLASIFICADOR_REGION.clasificar_serie(organismos)
+
+
+def asignar_categoria(organismos):
+    """Asigna la categoría a toda la columna Organismo"""
+    return CLASIFICADOR_CATEGORIA.clasificar_serie(organismos)
+
+
+def extraer_region(organismo):
+    """Extrae la región del nombre del organismo (versión fila a fila)"""
+    organismo_str = str(organismo).upper()
+
+    for region, keywords in REGIONES.items():
+        if any(keyword in organismo_str for keyword in keywords):
+            return region
+
+    return REGION_POR_DEFECTO
+
+
+def categorizar_organismo(nombre):
+    """Categoriza el tipo de organismo (versión fila a fila)"""
+    nombre = str(nombre).upper()
+
+    for categoria, palabras in CATEGORIAS.items():
+        if any(word in nombre for word in palabras):
+            return categoria
+
+    return CATEGORIA_POR_DEFECTO
+
+
+# --- MONTOS ---
+
+# Tabla mensual de la UTM (Mes;UTM); LICITACIONES_TABLA_UTM apunta a otra versión
+ARCHIVO_UTM = os.environ.get('LICITACIONES_TABLA_UTM',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), 'utm_mensual.csv'))
+# Mes base (AAAA-MM) para expresar los montos en pesos constantes; vacío: pesos nominales
+MES_PESOS_CONSTANTES = os.environ.get('LICITACIONES_PESOS_CONSTANTES', '')
+
+
+@functools.lru_cache(maxsize=None)
+def tabla_utm(ruta=ARCHIVO_UTM):
+    """Meses (datetime64[M], ordenados) y valor en pesos de la UTM de la tabla mensual"""
+    tabla = pd.read_csv(ruta, sep=SEPARADOR_CSV, comment='#', dtype={'Mes': str})
+    meses = pd.to_datetime(tabla['Mes'], format='%Y-%m').to_numpy().astype('datetime64[M]')
+    orden = np.argsort(meses, kind='stable')
+    meses, valores = meses[orden], tabla['UTM'].to_numpy(dtype=float)[orden]
+    meses.flags.writeable = valores.flags.writeable = False
+    return meses, valores
+
+
+def valor_utm(fechas, ruta=ARCHIVO_UTM):
+    """
+    Valor en pesos de la UTM en el mes de cada fecha (unión as-of con la tabla mensual)
+    - Los meses posteriores a la tabla usan el último valor y los anteriores el primero;
+      fuera_de_tabla_utm marca esas fechas para avisar que el valor es aproximado
+    - Sin fecha (NaT) se usa el último valor, el vigente
+    """
+    meses, valores = tabla_utm(ruta)
+    mes = np.asarray(fechas, dtype='datetime64[us]').astype('datetime64[M]')
+    posicion = np.searchsorted(meses, mes, side='right') - 1
+    posicion[np.isnat(mes)] = len(meses) - 1
+    return valores[np.clip(posicion, 0, len(meses) - 1)]
+
+
+def fuera_de_tabla_utm(fechas, ruta=ARCHIVO_UTM):
+    """Fechas cuyo mes no está cubierto por la tabla de la UTM (anterior al primero o posterior al último)"""
+    meses, _ = tabla_utm(ruta)
+    mes = np.asarray(fechas, dtype='datetime64[us]').astype('datetime64[M]')
+    return ~np.isnat(mes) & ((mes < meses[0]) | (mes > meses[-1]))
+
+
+def montos_fuera_de_tabla_utm(df, ruta=ARCHIVO_UTM):
+    """
+    Licitaciones cuyo monto en pesos depende de un mes sin valor de UTM en la tabla
+    - Son las expresadas en UTM y, con pesos constantes, todas las que tienen monto
+    - Devuelve (filas, último mes de la tabla como 'AAAA-MM')
+    """
+    meses, _ = tabla_utm(ruta)
+    afectadas = fuera_de_tabla_utm(df['FechaPublicacion'], ruta)
+    if not MES_PESOS_CONSTANTES:
+        afectadas &= (df['Tipo_Monto_Categoria'] == 'Expresado en UTM').to_numpy(dtype=bool, na_value=False)
+    afectadas &= df['Monto_CLP_Millones'].notna().to_numpy()
+    return int(afectadas.sum()), str(meses[-1])
+
+
+def extraer_monto_numerico(monto_str, clp_por_utm):
+    """Extrae un valor numérico en pesos del campo MontoLicitacion (versión fila a fila)"""
+    if pd.isna(monto_str) or monto_str in ['', 'nan']:
+        return np.nan
+
+    monto_str = str(monto_str).replace('.', '').replace(',', '').strip()
+
+    # Si es un número puro
+    if monto_str.isdigit():
+        try:
+            return float(monto_str)
+        except:
+            return np.nan
+
+    # Si tiene UTM, extraer número y convertir al valor de la UTM indicado
+    if 'UTM' in monto_str.upper():
+        numeros = re.findall(r'[\d.]+', monto_str)
+        if numeros:
+            try:
+                valor_utm = float(numeros[0].replace('.', ''))
+                # Si hay un segundo número (ej: "Entre 100 y 1000 UTM"), usar el promedio
+                if len(numeros) > 1:
+                    valor_utm2 = float(numeros[1].replace('.', ''))
+                    valor_utm = (valor_utm + valor_utm2) / 2
+                return valor_utm * clp_por_utm
+            except:
+                return np.nan
+
+    return np.nan
+
+
+def extraer_utm(monto_str):
+    """Extrae el valor en UTM si está presente (versión fila a fila)"""
+    monto_str = str(monto_str)
+    if 'UTM' in monto_str.upper():
+        numeros = re.findall(r'[\d.]+', monto_str)
+        if numeros:
+            try:
+                valor_utm = float(numeros[0].replace('.', ''))
+                # Si hay un segundo número, devolver el rango
+                if len(numeros) > 1:
+                    return f"{numeros[0]}-{numeros[1]} UTM"
+                return f"{valor_utm} UTM"
+            except:
+                return np.nan
+    return np.nan
+
+
+def clasificar_tipo_monto(monto_str):
+    """Clasifica el tipo de monto (versión fila a fila)"""
+    monto_str = str(monto_str)
+    if 'UTM' in monto_str.upper():
+        return 'Expresado en UTM'
+    elif monto_str.replace('.', '').replace(',', '').isdigit():
+        return 'Monto fijo en CLP'
+    else:
+        return 'Sin especificar'
+
+
+def parsear_montos(montos):
+    """
+    Interpreta MontoLicitacion en una sola pasada vectorizada
+    - Devuelve Monto_CLP (montos fijos), Monto_UTM (montos en UTM, a valorar con valorar_montos),
+      Tipo_Monto_Categoria y Monto_UTM_Estimado
+    - Mismos resultados que extraer_monto_numerico, clasificar_tipo_monto y extraer_utm
+    - Cada valor distinto se interpreta una sola vez
+    """
+    codigos, unicos = pd.factorize(montos, use_na_sentinel=False)
+    unicos = pd.Series(unicos, dtype=object)
+    texto = unicos.astype(str)
+    crudo_utm = texto.str.upper().str.contains('UTM', regex=False).to_numpy()
+
+    # Monto en CLP: se eliminan separadores antes de interpretar
+    sin_separadores = texto.str.replace('.', '', regex=False).str.replace(',', '', regex=False)
+    limpio = sin_separadores.str.strip()
+    es_numero = limpio.str.isdigit().to_numpy()
+    es_utm = ~es_numero & limpio.str.upper().str.contains('UTM', regex=False).to_numpy()
+    rango = limpio.str.extract(r'(\d+)(?:\D+(\d+))?')
+    utm_desde = pd.to_numeric(rango[0], errors='coerce').to_numpy(dtype=float)
+    utm_hasta = pd.to_numeric(rango[1], errors='coerce').to_numpy(dtype=float)
+    # "Entre 100 y 1000 UTM" se valora al punto medio del rango
+    valor_utm = np.where(np.isnan(utm_hasta), utm_desde, (utm_desde + utm_hasta) / 2)
+    monto = np.full(len(unicos), np.nan)
+    monto[es_numero] = pd.to_numeric(limpio[es_numero], errors='coerce').to_numpy(dtype=float)
+    monto_utm = np.where(es_utm, valor_utm, np.nan)
+
+    # Tipo de monto
+    tipo = np.where(crudo_utm, 'Expresado en UTM',
+                    np.where(sin_separadores.str.isdigit().to_numpy(), 'Monto fijo en CLP', 'Sin especificar'))
+
+    # Valor en UTM tal como viene escrito (con puntos de miles)
+    numeros = texto.str.extract(r'([\d.]+)(?:[^\d.]+([\d.]+))?')
+    primero = numeros[0].str.replace('.', '', regex=False)
+    valido = crudo_utm & primero.str.len().gt(0).to_numpy()
+    valor_simple = pd.to_numeric(primero.where(valido), errors='coerce').astype(float).astype(str) + ' UTM'
+    valor_rango = numeros[0] + '-' + numeros[1] + ' UTM'
+    utm = valor_rango.where(numeros[1].notna(), valor_simple).where(valido)
+
+    resultado = pd.DataFrame({
+        'Monto_CLP': monto,
+        'Monto_UTM': monto_utm,
+        'Tipo_Monto_Categoria': tipo,
+        'Monto_UTM_Estimado': utm,
+    }).take(codigos)
+    resultado.index = montos.index
+    # Monto_UTM_Estimado no se convierte con astype(str): en pandas 2 los nulos pasarían a 'nan'
+    return resultado.astype({'Tipo_Monto_Categoria': str})
+
+
+def valorar_montos(montos, fechas, mes_base=MES_PESOS_CONSTANTES):
+    """
+    Monto en pesos de cada licitación en una pasada: los fijos tal cual y los en UTM al valor de su mes
+    - montos: resultado de parsear_montos; fechas: FechaPublicacion ya interpretada
+    - Con mes_base ('AAAA-MM') queda en pesos constantes de ese mes: la UTM se reajusta por IPC,
+      así UTM(mes_base) / UTM(mes) actualiza por igual los montos fijos y los en UTM
+    - Avisa (UserWarning) cuando hay montos de meses fuera de la tabla de la UTM
+    """
+    utm_mes = valor_utm(fechas)
+    utm = montos['Monto_UTM'].to_numpy(dtype=float)
+    pesos = np.where(np.isnan(utm), montos['Monto_CLP'].to_numpy(dtype=float), utm * utm_mes)
+    if mes_base:
+        pesos = pesos * (valor_utm([np.datetime64(mes_base, 'M')]) / utm_mes)
+    afectadas = fuera_de_tabla_utm(fechas) & ~np.isnan(pesos) & (bool(mes_base) | ~np.isnan(utm))
+    if mes_base and fuera_de_tabla_utm([np.datetime64(mes_base, 'M')]).any():
+        warnings.warn(f"El mes base de los pesos constantes ({mes_base}) no está en la tabla de la UTM ({ARCHIVO_UTM})")
+    if afectadas.any():
+        warnings.warn(f"{afectadas.sum():,} montos son de meses sin valor en la tabla de la UTM "
+                      f"({ARCHIVO_UTM}); se valoran con el mes más cercano de la tabla")
+    return pd.Series(pesos, index=montos.index)
+
+
+# --- FECHAS ---
+
+FORMATO_FECHA = '%d/%m/%Y %H:%M:%S'
+_PATRON_FECHA = '^[0-9]{2}/[0-9]{2}/[1-9][0-9]{3} [0-9]{2}:[0-9]{2}:[0-9]{2}$'
+_FECHA_NEUTRA = '01/01/2000 00:00:00'
+# Posición de cada campo en el formato canónico y la función de Arrow que lo extrae
+_CAMPOS_FECHA = [(0, 2, pc.day), (3, 5, pc.month), (6, 10, pc.year),
+                 (11, 13, pc.hour), (14, 16, pc.minute), (17, 19, pc.second)]
+
+
+def parsear_fechas(fechas):
+    """
+    Convierte FechaPublicacion a datetime con FORMATO_FECHA; lo inválido queda NaT
+    - Cada valor distinto se interpreta una sola vez
+    - Los valores con el formato canónico los interpreta Arrow, y se comprueba campo a campo
+      que ninguno se haya desbordado (31/02 no pasa a marzo)
+    - El resto (sin ceros a la izquierda, inválidos) pasa por pd.to_datetime, así el
+      resultado es idéntico al de pandas
+    """
+    codificado = pa.array(fechas, type=pa.string(), from_pandas=True).dictionary_encode(null_encoding='encode')
+    unicos = codificado.dictionary
+    valores = pc.strptime(unicos, format=FORMATO_FECHA, unit='us', error_is_null=True)
+    canonicas = pc.fill_null(pc.match_substring_regex(unicos, _PATRON_FECHA), False)
+    textos = pc.if_else(canonicas, unicos, _FECHA_NEUTRA)
+    for inicio, fin, campo in _CAMPOS_FECHA:
+        esperado = pc.cast(pc.utf8_slice_codeunits(textos, inicio, fin), pa.int64())
+        canonicas = pc.and_(canonicas, pc.fill_null(pc.equal(campo(valores), esperado), False))
+
+    resultado = valores.to_numpy(zero_copy_only=False).copy()
+    dudosas = ~canonicas.to_numpy(zero_copy_only=False)
+    if dudosas.any():
+        otras = unicos.filter(pa.array(dudosas)).to_pandas()
+        resultado[dudosas] = pd.to_datetime(otras, format=FORMATO_FECHA, errors='coerce').to_numpy(resultado.dtype)
+    indices = codificado.indices.to_numpy(zero_copy_only=False)
+    return pd.Series(resultado[indices], index=fechas.index, name=fechas.name)
+
+
+# --- PIPELINE COMPLETO ---
+
+def leer_csv(origen, dtype=None):
+    """Lee el CSV de licitaciones desde una ruta o un archivo subido; dtype=str conserva el texto tal cual"""
+    return pd.read_csv(origen, sep=SEPARADOR_CSV, encoding=CODIFICACION_CSV, dtype=dtype)
+
+
+def enriquecer(df):
+    """Agrega fechas derivadas, región, categoría y montos interpretados"""
+    # Limpieza y procesamiento
+    with etapa('fechas', len(df)):
+        df['FechaPublicacion'] = parsear_fechas(df['FechaPublicacion'])
+        df['Año'] = df['FechaPublicacion'].dt.year
+        df['Mes'] = df['FechaPublicacion'].dt.month
+
+    # Extraer región y categorizar organismo
+    with etapa('región y categoría', len(df)):
+        df['Region'] = asignar_region(df['Organismo'])
+        df['CategoriaOrganismo'] = asignar_categoria(df['Organismo'])
+
+    # Procesar montos
+    with etapa('montos', len(df)):
+        montos = parsear_montos(df['MontoLicitacion'])
+        df['Monto_Numérico_CLP'] = valorar_montos(montos, df['FechaPublicacion'])
+        df['Monto_CLP_Millones'] = df['Monto_Numérico_CLP'] / 1_000_000
+        df['Tipo_Monto_Categoria'] = montos['Tipo_Monto_Categoria']
+        df['Monto_UTM_Estimado'] = montos['Monto_UTM_Estimado']
+    with etapa('esquema compacto', len(df)):
+        return compactar(df)
+
+
+def compactar(df):
+    """
+    Convierte las columnas presentes al esquema compacto; es idempotente
+    - Las categorías quedan ordenadas, así agrupar y ordenar da lo mismo que con texto
+      (al leer un Parquet escrito por bloques vienen en orden de aparición)
+    """
+    for columna in COLUMNAS_CATEGORICAS:
+        if columna not in df.columns:
+            continue
+        if not isinstance(df[columna].dtype, pd.CategoricalDtype):
+            df[columna] = df[columna].astype('category')
+        elif not df[columna].cat.categories.is_monotonic_increasing:
+            df[columna] = df[columna].cat.reorder_categories(sorted(df[columna].cat.categories))
+    for columna, tipo in COLUMNAS_ENTERAS.items():
+        if columna in df.columns:
+            df[columna] = df[columna].astype(tipo)
+    return df
+
+
+def congelar(df):
+    """
+    Marca de solo lectura los arreglos numpy del DataFrame y lo devuelve
+    - Para los datasets compartidos entre sesiones: una escritura en el lugar falla en vez
+      de cambiar los datos de las demás; las selecciones son vistas o posiciones
+    - Las columnas Arrow ya son inmutables; las categóricas se protegen por convención
+    """
+    for bloque in df._mgr.blocks:
+        valores = bloque.values
+        if isinstance(valores, np.ndarray):
+            valores.flags.writeable = False
+    return df
+
+
+def concatenar(frames):
+    """Une DataFrames procesados conservando las columnas categóricas (con categorías unificadas)"""
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    for columna in COLUMNAS_CATEGORICAS:
+        if all(columna in df.columns for df in frames):
+            categorias = sorted(set().union(*(df[columna].cat.categories for df in frames)))
+            frames = [df.assign(**{columna: df[columna].cat.set_categories(categorias)}) for df in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def memoria_por_columna(df):
+    """Bytes que ocupa cada columna, contando el contenido de los textos"""
+    return df.memory_usage(deep=True, index=False)
+
+
+def procesar_csv(origen):
+    """Lee y enriquece un CSV; un archivo sin filas se devuelve tal cual"""
+    with etapa('lectura CSV') as registro:
+        df = leer_csv(origen)
+        registro.filas = len(df)
+    if df.empty:
+        return df
+    return enriquecer(df)
+
+
+def _bytes_por_fila(origen, muestra=1024 * 1024):
+    """Estima el tamaño medio de una fila del CSV a partir del primer MB"""
+    if isinstance(origen, (str, os.PathLike)):
+        with open(origen, 'rb') as f:
+            inicio = f.read(muestra)
+    else:
+        posicion = origen.tell()
+        origen.seek(0)
+        inicio = origen.read(muestra)
+        origen.seek(posicion)
+    return max(1, len(inicio) // max(1, inicio.count(b'\n')))
+
+
+def procesar_csv_por_bloques(origen, destino, memoria_mb=64):
+    """
+    Lee el CSV por bloques, enriquece cada uno y lo agrega a un Parquet
+    - Deja las mismas columnas y tipos que procesar_csv (ESQUEMA_DASHBOARD)
+    - El tamaño del bloque se deriva de memoria_mb, así el pico de memoria no depende del archivo
+    - Devuelve el número de filas escritas
+    """
+    filas_por_bloque = max(1_000, int(memoria_mb * 1024 * 1024 / (_bytes_por_fila(origen) * FACTOR_MEMORIA_CSV)))
+    lector = pd.read_csv(origen, sep=SEPARADOR_CSV, encoding=CODIFICACION_CSV,
+                         usecols=COLUMNAS_CSV_DASHBOARD, dtype=str, chunksize=filas_por_bloque)
+    filas = 0
+    escritor = None
+    try:
+        for bloque in lector:
+            tabla = pa.Table.from_pandas(enriquecer(bloque), schema=ESQUEMA_DASHBOARD, preserve_index=False)
+            if escritor is None:
+                # El esquema de la primera tabla lleva los metadatos de pandas (categorías, enteros con nulos)
+                escritor = pq.ParquetWriter(destino, tabla.schema)
+            escritor.write_table(tabla)
+            filas += len(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    if escritor is None:
+        pq.write_table(ESQUEMA_DASHBOARD.empty_table(), destino)
+    return filas
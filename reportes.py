@@ -0,0 +1,222 @@
+"""
+Reportes estáticos por región y por tipo de organismo, sin abrir el dashboard
+
+Genera un HTML por región (el "Análisis Regional Detallado": métricas, top 10 organismos,
+evolución anual y mapa de calor mensual) y uno por tipo de organismo (top 20 organismos,
+tabla y concentración por año), más un índice. Usa el mismo procesamiento y las mismas figuras
+que el dashboard:
+- El dataset se carga (o se lee del cache en disco) y se agrega en el cubo una sola vez
+- Los datos de cada reporte salen del cubo en el proceso principal; a los procesos del
+  pool solo viajan esos agregados, y ahí se construyen y escriben las figuras
+- plotly.js se escribe una vez junto a los reportes, no dentro de cada HTML
+- --png además exporta cada figura como imagen (requiere el paquete kaleido)
+
+Uso desde la línea de comandos (p. ej. en un cron):
+    python -m reportes --salida reportes [--años 2023 2024] [--png] [archivos.csv ...]
+"""
+import argparse
+import html
+import importlib.util
+import os
+import re
+import sys
+import time
+import unicodedata
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+import graficos
+from cache_disco import cargar_con_cache
+from concentracion import TOPS
+from ingesta import DIRECTORIO_DATOS, PROCESOS_INGESTA, archivos_de_directorio, cargar_varios
+from procesamiento import montos_fuera_de_tabla_utm
+from tablero import Tablero
+
+ARCHIVO_POR_DEFECTO = 'ListaLicitaciones_filtrado_residuos_peligrosos_retiro_traslado.csv'
+ARCHIVO_PLOTLY = 'plotly.min.js'
+
+
+def nombre_archivo(prefijo, nombre):
+    """Nombre de archivo sin tildes ni espacios: ('region', 'Biobío') -> 'region-biobio'"""
+    texto = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode('ascii')
+    return f"{prefijo}-{re.sub(r'[^a-z0-9]+', '-', texto.lower()).strip('-')}"
+
+
+def cargar(archivos):
+    """Dataset procesado de uno o varios CSV (con el cache en disco del dashboard)"""
+    if len(archivos) == 1:
+        return cargar_con_cache(archivos[0])
+    df, _ = cargar_varios(archivos)
+    return df
+
+
+def _monto(valor):
+    return f"${valor:,.0f}M" if not pd.isna(valor) else "N/A"
+
+
+def datos_region(seleccion, region):
+    """Agregados del análisis regional detallado, o None si la región no tiene datos"""
+    seleccion_region = seleccion.por_region(region)
+    if seleccion_region.vacia:
+        return None
+    return {
+        'archivo': nombre_archivo('region', region),
+        'titulo': f"Análisis Regional Detallado: {region}",
+        'region': region,
+        'metricas': {
+            'Licitaciones en región': f"{seleccion_region.total_licitaciones():,}",
+            'Monto total (MM CLP)': _monto(seleccion_region.monto_total()),
+            'Organismos en región': f"{seleccion_region.organismos():,}",
+        },
+        'top': seleccion_region.top_organismos_por_cantidad(10),
+        'evolucion': seleccion_region.licitaciones_por_año(),
+        'mapa_calor': seleccion_region.mapa_calor_mensual(),
+    }
+
+
+def datos_categoria(seleccion, categoria):
+    """Agregados del análisis por organismo para una categoría, o None si no tiene datos"""
+    seleccion_categoria = seleccion.por_categoria(categoria)
+    top_20 = seleccion_categoria.top_organismos(20)
+    if seleccion_categoria.vacia or top_20.empty:
+        return None
+    concentracion = seleccion_categoria.concentracion().iloc[0]
+    return {
+        'archivo': nombre_archivo('categoria', categoria),
+        'titulo': f"Top 20 Organismos Licitantes: {categoria}",
+        'metricas': {
+            **{f"Concentración Top {n}": f"{concentracion[f'Top{n}']:.1f}%" for n in TOPS},
+            'HHI': f"{concentracion['HHI']:,.0f}",
+            'Gini': f"{concentracion['Gini']:.2f}",
+        },
+        'top_20': top_20,
+        'anual': seleccion_categoria.concentracion_anual(),
+    }
+
+
+def figuras_reporte(reporte):
+    """(nombre, figura) del reporte, construidas con las mismas funciones que el dashboard"""
+    if 'region' in reporte:
+        region = reporte['region']
+        candidatas = [
+            ('top_region', reporte['top'], lambda datos: graficos.top_region(datos, region)),
+            ('evolucion_region', reporte['evolucion'], lambda datos: graficos.evolucion_region(datos, region)),
+            ('mapa_calor', reporte['mapa_calor'], lambda datos: graficos.mapa_calor(datos, region)),
+        ]
+    else:
+        candidatas = [('top_organismos', reporte['top_20'], graficos.top_organismos),
+                      ('concentracion', reporte['anual'], graficos.tendencia_concentracion)]
+    return [(nombre, construir(datos)) for nombre, datos, construir in candidatas if not datos.empty]
+
+
+def pagina(titulo, cuerpo):
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(titulo)}</title>
+<script src="{ARCHIVO_PLOTLY}"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+.metricas {{ display: flex; gap: 3em; margin-bottom: 1em; }}
+.metrica b {{ display: block; font-size: 1.6em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ padding: 0.2em 0.8em; border-bottom: 1px solid #ddd; text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(titulo)}</h1>
+{cuerpo}
+</body>
+</html>
+"""
+
+
+def renderizar(reporte, salida, png=False):
+    """
+    Trabajo de cada proceso: construye las figuras del reporte y escribe su HTML (y PNG)
+    - Devuelve (archivo, título, segundos)
+    """
+    inicio = time.perf_counter()
+    partes = ['<div class="metricas">'] + [
+        f'<div class="metrica">{html.escape(nombre)}<b>{html.escape(valor)}</b></div>'
+        for nombre, valor in reporte['metricas'].items()
+    ] + ['</div>']
+    for nombre, fig in figuras_reporte(reporte):
+        partes.append(pio.to_html(fig, full_html=False, include_plotlyjs=False, validate=False))
+        if png:
+            pio.write_image(fig, os.path.join(salida, f"{reporte['archivo']}-{nombre}.png"))
+    if 'top_20' in reporte:
+        tabla = reporte['top_20'][['Organismo', 'Cantidad', 'Monto_Total_MM']].rename(
+            columns={'Monto_Total_MM': 'Monto Total (MM CLP)'})
+        partes.append(tabla.to_html(index=False, float_format=lambda valor: f"$ {valor:,.0f}M"))
+    archivo = f"{reporte['archivo']}.html"
+    with open(os.path.join(salida, archivo), 'w', encoding='utf-8') as f:
+        f.write(pagina(reporte['titulo'], '\n'.join(partes)))
+    return archivo, reporte['titulo'], time.perf_counter() - inicio
+
+
+def generar(df, salida, años=None, png=False, procesos=PROCESOS_INGESTA):
+    """
+    Escribe en salida los reportes de todas las regiones y categorías y un index.html
+    - años restringe el dataset como el filtro de la barra lateral (None: todos)
+    - Devuelve (archivo, título, segundos) por reporte
+    """
+    os.makedirs(salida, exist_ok=True)
+    seleccion = Tablero(df).filtrar({'Año': list(años or [])})
+    reportes = [datos_region(seleccion, region) for region in seleccion.valores('Region')]
+    reportes += [datos_categoria(seleccion, categoria) for categoria in seleccion.valores('CategoriaOrganismo')]
+    reportes = [reporte for reporte in reportes if reporte is not None]
+
+    with open(os.path.join(salida, ARCHIVO_PLOTLY), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+    if procesos > 1 and len(reportes) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(reportes))) as pool:
+            resultados = list(pool.map(renderizar, reportes, repeat(salida), repeat(png)))
+    else:
+        resultados = [renderizar(reporte, salida, png) for reporte in reportes]
+
+    enlaces = '\n'.join(f'<li><a href="{archivo}">{html.escape(titulo)}</a></li>' for archivo, titulo, _ in resultados)
+    with open(os.path.join(salida, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(pagina('Reportes de licitaciones de residuos peligrosos', f'<ul>\n{enlaces}\n</ul>'))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archivos', nargs='*',
+                        help='CSV de licitaciones; por defecto los de LICITACIONES_DIRECTORIO_DATOS o el archivo base')
+    parser.add_argument('--salida', default='reportes')
+    parser.add_argument('--años', type=int, nargs='+')
+    parser.add_argument('--png', action='store_true', help='exporta además cada figura como PNG (requiere kaleido)')
+    parser.add_argument('--procesos', type=int, default=PROCESOS_INGESTA)
+    args = parser.parse_args()
+    if args.png and importlib.util.find_spec('kaleido') is None:
+        parser.error('--png requiere el paquete kaleido (pip install kaleido)')
+
+    archivos = args.archivos or (archivos_de_directorio(DIRECTORIO_DATOS) if DIRECTORIO_DATOS else []) or [ARCHIVO_POR_DEFECTO]
+    faltantes = [archivo for archivo in archivos if not os.path.isfile(archivo)]
+    if faltantes:
+        parser.error(f"no existe el archivo: {', '.join(faltantes)}")
+
+    # El aviso de montos fuera de la tabla de la UTM se da una vez, abajo, también con datos del cache
+    warnings.filterwarnings('ignore', message=r'.* montos son de meses sin valor en la tabla de la UTM')
+    inicio = time.perf_counter()
+    df = cargar(archivos)
+    t_carga = time.perf_counter() - inicio
+    filas_sin_utm, ultimo_mes_utm = montos_fuera_de_tabla_utm(df)
+    if filas_sin_utm:
+        print(f"Aviso: {filas_sin_utm:,} montos son de meses sin valor en la tabla de la UTM (cubre hasta "
+              f"{ultimo_mes_utm}); se valoran con el mes más cercano", file=sys.stderr)
+    resultados = generar(df, args.salida, args.años, args.png, args.procesos)
+    print(f"{len(df):,} licitaciones cargadas en {t_carga:.2f}s | {len(resultados)} reportes en {args.salida}/ "
+          f"| total {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
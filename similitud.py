@@ -0,0 +1,182 @@
+"""
+Licitaciones casi idénticas (re-licitaciones) con MinHash y LSH
+
+Cada licitación se representa por los shingles de 5 caracteres de NombreLicitacion y
+Descripcion (normalizados como en el buscador). Su firma MinHash estima la similitud
+de Jaccard entre dos licitaciones; las bandas LSH agrupan las firmas parecidas, así
+solo se comparan pares candidatos y el costo crece casi linealmente con las filas.
+
+- Re-licitaciones: pares candidatos del mismo Organismo con similitud estimada sobre
+  UMBRAL_SIMILITUD, unidos en grupos; de cada grupo se conserva la publicación más reciente
+- Similares: para una licitación, las de sus mismos buckets ordenadas por similitud
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from busqueda import normalizar
+
+# Similitud de Jaccard estimada desde la que dos licitaciones del mismo organismo son una re-licitación
+UMBRAL_SIMILITUD = float(os.environ.get('LICITACIONES_UMBRAL_SIMILITUD', '0.8'))
+COLUMNAS_SIMILITUD = ('NombreLicitacion', 'Descripcion')
+LARGO_SHINGLE = 5
+# Firma de PERMUTACIONES valores en BANDAS de PERMUTACIONES // BANDAS filas: con 64 y 16,
+# un par con similitud 0,8 cae en algún bucket común con probabilidad > 0,999
+PERMUTACIONES = 64
+BANDAS = 16
+FILAS_POR_BLOQUE = 16_384
+_VACIA = np.uint32(0xFFFFFFFF)
+# Pares comparados a la vez al verificar candidatos (acota la memoria de la comparación)
+_PARES_POR_BLOQUE = 262_144
+
+
+def _permutaciones(semilla=0):
+    """
+    Coeficientes (a, b) de cada permutación, h(x) = (a·x + b) mod 2^64 >> 32
+    - Hash multiplicativo: evita el módulo por un primo, que es lo más caro del cálculo
+    """
+    rng = np.random.default_rng(semilla)
+    return (rng.integers(0, 2 ** 63, PERMUTACIONES, dtype=np.uint64) * np.uint64(2) + np.uint64(1),
+            rng.integers(0, 2 ** 63, PERMUTACIONES, dtype=np.uint64))
+
+
+def _shingles(textos):
+    """
+    (documento, shingle) de cada shingle distinto de cada texto, ordenados por documento
+    - Un shingle se reduce a 32 bits con un hash multiplicativo
+    """
+    # Un byte por carácter, como en el buscador: lo que no es ASCII pasa a '?'
+    datos = np.frombuffer(''.join(textos).encode('ascii', 'replace'), dtype=np.uint8).astype(np.uint64)
+    largos = textos.str.len().to_numpy()
+    if len(datos) < LARGO_SHINGLE:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+    codigos = np.zeros(len(datos) - LARGO_SHINGLE + 1, dtype=np.uint64)
+    for k in range(LARGO_SHINGLE):
+        codigos = (codigos << np.uint64(8)) | datos[k:len(datos) - LARGO_SHINGLE + 1 + k]
+    codigos = (codigos * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)
+    documentos = np.repeat(np.arange(len(textos), dtype=np.int64), largos)
+    # Un shingle que cruza el final de un texto no pertenece a ninguno
+    validos = documentos[:len(codigos)] == documentos[LARGO_SHINGLE - 1:]
+    claves = np.sort((documentos[:len(codigos)][validos].astype(np.uint64) << np.uint64(32)) | codigos[validos])
+    claves = claves[np.concatenate(([True], claves[1:] != claves[:-1]))]
+    return (claves >> np.uint64(32)).astype(np.int64), claves & np.uint64(0xFFFFFFFF)
+
+
+def firmas_minhash(textos, semilla=0):
+    """Firma MinHash (filas x PERMUTACIONES, uint32) de cada texto; los textos sin shingles quedan en _VACIA"""
+    a, b = _permutaciones(semilla)
+    firmas = np.full((len(textos), PERMUTACIONES), _VACIA, dtype=np.uint32)
+    for inicio in range(0, len(textos), FILAS_POR_BLOQUE):
+        documentos, shingles = _shingles(textos.iloc[inicio:inicio + FILAS_POR_BLOQUE])
+        if len(shingles) == 0:
+            continue
+        cortes = np.flatnonzero(np.concatenate(([True], documentos[1:] != documentos[:-1])))
+        filas = inicio + documentos[cortes]
+        for i in range(PERMUTACIONES):
+            valores = (a[i] * shingles + b[i]) >> np.uint64(32)
+            firmas[filas, i] = np.minimum.reduceat(valores, cortes)
+    return firmas
+
+
+def _claves_bandas(firmas):
+    """Hash de cada banda de la firma (filas x BANDAS, uint64)"""
+    filas_banda = PERMUTACIONES // BANDAS
+    claves = np.zeros((len(firmas), BANDAS), dtype=np.uint64)
+    for j in range(filas_banda):
+        claves = claves * np.uint64(1_000_003) + firmas[:, j::filas_banda][:, :BANDAS].astype(np.uint64)
+    return claves
+
+
+def _componentes(filas, aristas_origen, aristas_destino):
+    """Etiqueta de cada fila: la menor posición de su componente conexa"""
+    etiquetas = np.arange(filas)
+    while len(aristas_origen):
+        minimo = np.minimum(etiquetas[aristas_origen], etiquetas[aristas_destino])
+        anteriores = etiquetas.copy()
+        np.minimum.at(etiquetas, aristas_origen, minimo)
+        np.minimum.at(etiquetas, aristas_destino, minimo)
+        etiquetas = etiquetas[etiquetas]
+        if np.array_equal(etiquetas, anteriores):
+            break
+    return etiquetas
+
+
+class IndiceSimilitud:
+    """
+    Firmas MinHash y buckets LSH de las licitaciones de un dataset
+    - Se construye una vez por dataset (el Tablero lo guarda junto a sus otros índices)
+    - representantes: posiciones que quedan al colapsar las re-licitaciones
+    """
+
+    def __init__(self, df, umbral=UMBRAL_SIMILITUD):
+        columnas = [columna for columna in COLUMNAS_SIMILITUD if columna in df.columns]
+        self.filas = len(df)
+        self.umbral = umbral
+        textos = pd.Series([''] * self.filas, index=df.index, dtype=str)
+        for columna in columnas:
+            textos = textos + normalizar(df[columna]) + ' '
+        self.firmas = firmas_minhash(textos.reset_index(drop=True))
+        vacias = self.firmas[:, 0] == _VACIA
+
+        # Buckets de cada banda: posiciones ordenadas por clave (y organismo, para las re-licitaciones)
+        claves = _claves_bandas(self.firmas)
+        organismos = (df['Organismo'].cat.codes.to_numpy() if 'Organismo' in df.columns
+                      else np.zeros(self.filas, dtype=np.int8))
+        self.claves, self.orden = [], []
+        origen, destino = [], []
+        for banda in range(BANDAS):
+            orden = np.lexsort((organismos, claves[:, banda]))
+            orden = orden[~vacias[orden]]
+            ordenadas = claves[orden, banda]
+            self.orden.append(orden)
+            self.claves.append(ordenadas)
+            # Vecinos consecutivos de un mismo bucket y organismo: una arista por fila, no por par
+            mismo = (ordenadas[1:] == ordenadas[:-1]) & (organismos[orden[1:]] == organismos[orden[:-1]])
+            origen.append(orden[:-1][mismo])
+            destino.append(orden[1:][mismo])
+        pares = np.sort((np.concatenate(origen) << 32) | np.concatenate(destino))
+        pares = pares[np.concatenate(([True], pares[1:] != pares[:-1]))]
+        origen, destino = pares >> 32, pares & 0xFFFFFFFF
+        similares = self.similitud(origen, destino) >= umbral
+        self.grupos = _componentes(self.filas, origen[similares], destino[similares])
+
+        # De cada grupo se conserva la publicación más reciente (la que siguió su curso)
+        fechas = (df['FechaPublicacion'].to_numpy(dtype='datetime64[us]').astype(np.int64)
+                  if 'FechaPublicacion' in df.columns else np.zeros(self.filas, dtype=np.int64))
+        orden = np.lexsort((np.arange(self.filas), fechas, self.grupos))
+        ultimas = np.concatenate((self.grupos[orden][1:] != self.grupos[orden][:-1], [True]))
+        self.representantes = np.sort(orden[ultimas])
+
+    @property
+    def colapsadas(self):
+        """Cantidad de licitaciones que se ocultan al colapsar las re-licitaciones"""
+        return self.filas - len(self.representantes)
+
+    def similitud(self, i, j):
+        """Similitud de Jaccard estimada (fracción de la firma que coincide) de los pares (i, j)"""
+        i, j = np.broadcast_arrays(np.asarray(i), np.asarray(j))
+        resultado = np.empty(i.shape)
+        for inicio in range(0, len(i), _PARES_POR_BLOQUE):
+            bloque = slice(inicio, inicio + _PARES_POR_BLOQUE)
+            resultado[bloque] = (self.firmas[i[bloque]] == self.firmas[j[bloque]]).mean(axis=1)
+        return resultado
+
+    def similares(self, posicion, n=10, minimo=0.5):
+        """
+        Posiciones y similitud de las licitaciones más parecidas a la de la posición dada
+        - Candidatas: las que comparten algún bucket LSH; minimo descarta las poco parecidas
+        """
+        if self.firmas[posicion, 0] == _VACIA:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        claves = _claves_bandas(self.firmas[posicion:posicion + 1])[0]
+        candidatas = [
+            self.orden[banda][np.searchsorted(self.claves[banda], clave):
+                              np.searchsorted(self.claves[banda], clave, side='right')]
+            for banda, clave in enumerate(claves)
+        ]
+        candidatas = np.setdiff1d(np.concatenate(candidatas), [posicion])
+        similitudes = self.similitud(candidatas, posicion)
+        orden = np.argsort(-similitudes, kind='stable')
+        orden = orden[similitudes[orden] >= minimo][:n]
+        return candidatas[orden], similitudes[orden]
@@ -0,0 +1,368 @@
+"""
+Capa de cálculo del dashboard, sin dependencias de Streamlit
+
+Uso típico:
+    tablero = Tablero.desde_csv('ListaLicitaciones.csv')
+    seleccion = tablero.filtrar({'Año': [2024], 'Region': ['Maule']}, busqueda='hospital')
+    seleccion.evolucion_anual()
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+import concentracion
+from busqueda import IndiceBusqueda
+from cache_disco import cargar_con_cache
+from cubo import agregar, con_calendario, construir_cubo
+from filtros import IndiceFiltros
+from orden import IndiceOrden
+from procesamiento import COLUMNAS_FRIAS, montos_fuera_de_tabla_utm
+from similitud import IndiceSimilitud
+from trazas import etapa
+
+# Motor de consultas: 'pandas' (cubo en memoria) o 'duckdb' (requiere el paquete duckdb)
+MOTOR = os.environ.get('LICITACIONES_MOTOR', 'pandas')
+
+
+def _bytes(*objetos):
+    """Bytes de arreglos de numpy, objetos de pandas y de lo que los contiene (colecciones, índices)"""
+    total = 0
+    for objeto in objetos:
+        if isinstance(objeto, np.ndarray):
+            total += objeto.nbytes
+        elif isinstance(objeto, (pd.Series, pd.DataFrame, pd.Index)):
+            total += int(np.sum(objeto.memory_usage(deep=True)))
+        elif isinstance(objeto, dict):
+            total += _bytes(*list(objeto.values()))
+        elif isinstance(objeto, (list, tuple)):
+            total += _bytes(*objeto)
+        elif hasattr(objeto, '__dict__'):
+            total += _bytes(*vars(objeto).values())
+    return total
+
+
+class Tablero:
+    """
+    Dataset procesado con sus índices y su cubo base
+    - Los índices se construyen la primera vez que se necesitan
+    - Es de solo lectura: puede compartirse entre sesiones
+    - Los textos largos (COLUMNAS_FRIAS) quedan fuera de df, en textos_frios: siguen en memoria,
+      pero solo los leen el buscador, las re-licitaciones y la huella del dataset
+    - celdas: cubo ya calculado (p. ej. el que mantiene el almacén incremental)
+    """
+
+    def __init__(self, df, celdas=None):
+        frias = [columna for columna in COLUMNAS_FRIAS if columna in df.columns]
+        self.df = df.drop(columns=frias)
+        self.textos_frios = df[frias]
+        self._indice_filtros = None
+        self._indice_busqueda = None
+        self._indice_orden = None
+        self._indice_similitud = None
+        self._cubo = None if celdas is None else (celdas, IndiceFiltros(celdas))
+        self._cubo_colapsado = None
+        self._grillas_concentracion = {}
+        self._version = None
+        self._fuera_de_tabla_utm = None
+        self._tamanos = {}
+
+    @classmethod
+    def desde_csv(cls, origen):
+        """Carga (o recupera del cache en disco) y procesa un CSV de licitaciones"""
+        return cls(cargar_con_cache(origen))
+
+    @property
+    def version(self):
+        """Huella del contenido del dataset, para claves de cache que dependen de él"""
+        if self._version is None:
+            completo = pd.concat([self.df, self.textos_frios], axis=1)
+            hashes = pd.util.hash_pandas_object(completo, index=False).to_numpy()
+            self._version = hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+        return self._version
+
+    @property
+    def fuera_de_tabla_utm(self):
+        """(filas, último mes de la tabla) de los montos valorados con un mes sin UTM; se calcula una vez"""
+        if self._fuera_de_tabla_utm is None:
+            self._fuera_de_tabla_utm = montos_fuera_de_tabla_utm(self.df)
+        return self._fuera_de_tabla_utm
+
+    def tamano(self):
+        """
+        Bytes de los índices y cubos construidos hasta ahora (df y textos_frios los cuenta el cache)
+        - Crece a medida que el dashboard usa los índices, que son perezosos
+        - Las estructuras fijas se miden una vez; los órdenes y las grillas, en cada llamada
+        """
+        fijas = {'filtros': self._indice_filtros, 'busqueda': self._indice_busqueda,
+                 'similitud': self._indice_similitud, 'cubo': self._cubo, 'cubo_colapsado': self._cubo_colapsado}
+        for nombre, estructura in fijas.items():
+            if estructura is not None and nombre not in self._tamanos:
+                self._tamanos[nombre] = _bytes(estructura)
+        # IndiceOrden guarda una referencia a df: solo se cuentan sus órdenes
+        ordenes = [] if self._indice_orden is None else list(self._indice_orden._ordenes.values())
+        return sum(self._tamanos.values()) + _bytes(ordenes, self._grillas_concentracion)
+
+    @property
+    def indice_filtros(self):
+        if self._indice_filtros is None:
+            self._indice_filtros = IndiceFiltros(self.df)
+        return self._indice_filtros
+
+    @property
+    def indice_busqueda(self):
+        if self._indice_busqueda is None:
+            self._indice_busqueda = IndiceBusqueda(pd.concat([self.df, self.textos_frios], axis=1))
+        return self._indice_busqueda
+
+    @property
+    def indice_orden(self):
+        if self._indice_orden is None:
+            self._indice_orden = IndiceOrden(self.df)
+        return self._indice_orden
+
+    @property
+    def indice_similitud(self):
+        if self._indice_similitud is None:
+            self._indice_similitud = IndiceSimilitud(pd.concat([self.df, self.textos_frios], axis=1))
+        return self._indice_similitud
+
+    @property
+    def cubo(self):
+        """Celdas del cubo del dataset completo y su índice de filtros"""
+        if self._cubo is None:
+            celdas = construir_cubo(self.df)
+            self._cubo = celdas, IndiceFiltros(celdas)
+        return self._cubo
+
+    @property
+    def cubo_colapsado(self):
+        """Cubo de las filas que quedan al colapsar las re-licitaciones, y su índice de filtros"""
+        if self._cubo_colapsado is None:
+            celdas = construir_cubo(self.df.take(self.indice_similitud.representantes))
+            self._cubo_colapsado = celdas, IndiceFiltros(celdas)
+        return self._cubo_colapsado
+
+    def grilla_concentracion(self, medida='Licitaciones', colapsar=False):
+        """Concentración de todos los segmentos Año × Region × CategoriaOrganismo; se calcula una vez"""
+        clave = (medida, colapsar)
+        if clave not in self._grillas_concentracion:
+            celdas, _ = self.cubo_colapsado if colapsar else self.cubo
+            self._grillas_concentracion[clave] = concentracion.grilla(celdas, medida)
+        return self._grillas_concentracion[clave]
+
+    def similares(self, id_licitacion, n=10):
+        """Filas de las licitaciones más parecidas a la indicada, con su Similitud estimada"""
+        posiciones = np.flatnonzero((self.df['IDLicitacion'] == id_licitacion).to_numpy(dtype=bool, na_value=False))
+        if len(posiciones) == 0:
+            return self.df.iloc[:0].assign(Similitud=pd.Series(dtype=float))
+        encontradas, similitudes = self.indice_similitud.similares(posiciones[-1], n)
+        return self.df.take(encontradas).assign(Similitud=similitudes)
+
+    def seleccionar(self, selecciones, busqueda='', colapsar=False):
+        """Posiciones de las filas que cumplen filtros y búsqueda; None si no hay restricciones"""
+        with etapa('filtros') as registro:
+            posiciones = self.indice_filtros.seleccionar(selecciones)
+            registro.filas = len(self.df) if posiciones is None else len(posiciones)
+        if colapsar:
+            with etapa('re-licitaciones') as registro:
+                representantes = self.indice_similitud.representantes
+                posiciones = (representantes if posiciones is None
+                              else np.intersect1d(posiciones, representantes, assume_unique=True))
+                registro.filas = len(posiciones)
+        if busqueda:
+            with etapa('búsqueda') as registro:
+                posiciones = self.indice_busqueda.buscar(busqueda, candidatos=posiciones)
+                registro.filas = len(posiciones)
+        return posiciones
+
+    def filtrar(self, selecciones, busqueda='', colapsar=False):
+        """
+        Aplica los filtros de la barra lateral y la búsqueda de texto
+        - Sin búsqueda, las agregaciones salen del cubo base filtrado
+        - La búsqueda no es una dimensión del cubo: en ese caso se agregan las filas encontradas
+        - colapsar deja una licitación por grupo de re-licitaciones (ver similitud.py)
+        """
+        posiciones = self.seleccionar(selecciones, busqueda, colapsar)
+        if busqueda:
+            filas = self.df if posiciones is None else self.df.take(posiciones)
+            return Seleccion(construir_cubo(filas), self.df, posiciones, self.indice_orden)
+        celdas, indice = self.cubo_colapsado if colapsar else self.cubo
+        return Seleccion(indice.filtrar(celdas, selecciones), self.df, posiciones, self.indice_orden)
+
+
+class Seleccion:
+    """
+    Resultado de un filtrado: cubo filtrado y acceso perezoso a las filas
+    - Cada método entrega los datos de un gráfico o métrica del dashboard
+    - Todos se apoyan en _agregar, _total y _distintos, que son lo que redefine otro motor
+    """
+
+    def __init__(self, celdas, df=None, posiciones=None, indice_orden=None):
+        self.celdas = celdas
+        self._df = df
+        self._posiciones = posiciones
+        self._indice_orden = indice_orden
+        self._filas = None
+
+    @property
+    def vacia(self):
+        return self.celdas.empty
+
+    @property
+    def posiciones(self):
+        """Posiciones de las filas de la selección en el dataset; None si son todas"""
+        return self._posiciones
+
+    @property
+    def filas(self):
+        """Filas filtradas; solo se materializan al pedirlas"""
+        if self._filas is None:
+            self._filas = self._df if self.posiciones is None else self._df.take(self.posiciones)
+        return self._filas
+
+    @property
+    def cantidad_filas(self):
+        """Filas de la selección, sin materializarlas"""
+        return len(self._df) if self.posiciones is None else len(self.posiciones)
+
+    def posiciones_ordenadas(self, orden_por=None, ascendente=True):
+        """Posiciones de las filas de la selección, ordenadas con los índices precalculados"""
+        if orden_por:
+            return self._indice_orden.ordenar(self.posiciones, orden_por, ascendente)
+        return np.arange(len(self._df)) if self.posiciones is None else self.posiciones
+
+    def pagina(self, columnas, numero=1, tamano=100, orden_por=None, ascendente=True):
+        """Una página de la tabla de detalle; solo se copian las filas de la página"""
+        posiciones = self.posiciones_ordenadas(orden_por, ascendente)
+        inicio = (numero - 1) * tamano
+        return self._df.take(posiciones[inicio:inicio + tamano])[columnas]
+
+    def bloques(self, columnas, tamano=50_000, orden_por=None, ascendente=True):
+        """Recorre las filas de la selección en bloques, sin copiarlas todas a la vez"""
+        posiciones = self.posiciones_ordenadas(orden_por, ascendente)
+        for inicio in range(0, len(posiciones), tamano):
+            yield self._df.take(posiciones[inicio:inicio + tamano])[columnas]
+
+    def rango_fechas(self):
+        """Primera y última FechaPublicacion de la selección"""
+        fechas = self._df['FechaPublicacion']
+        if self.posiciones is not None:
+            fechas = fechas.take(self.posiciones)
+        return fechas.min(), fechas.max()
+
+    def por_region(self, region):
+        return Seleccion(self.celdas[self.celdas['Region'] == region])
+
+    def por_categoria(self, categoria):
+        if categoria == 'Todos':
+            return Seleccion(self.celdas)
+        return Seleccion(self.celdas[self.celdas['CategoriaOrganismo'] == categoria])
+
+    # --- Consultas base ---
+
+    def _agregar(self, por, medidas=('Filas',)):
+        """Suma de medidas agrupando por columnas del cubo (MesNombre y Trimestre se derivan de Mes)"""
+        columnas = [por] if isinstance(por, str) else por
+        celdas = con_calendario(self.celdas) if {'MesNombre', 'Trimestre'} & set(columnas) else self.celdas
+        return agregar(celdas, por, medidas)
+
+    def _total(self, medida):
+        return self.celdas[medida].sum()
+
+    def _distintos(self, columna):
+        return sorted(self.celdas[columna].dropna().unique())
+
+    # --- Métricas ---
+
+    def total_licitaciones(self):
+        return int(self._total('Filas'))
+
+    def monto_total(self):
+        return self._total('Monto')
+
+    def monto_promedio(self):
+        """Promedio de Monto_CLP_Millones por licitación con monto disponible"""
+        montos = self._total('Montos')
+        return self._total('Monto') / montos if montos else np.nan
+
+    def organismos(self):
+        return len(self._distintos('Organismo'))
+
+    def valores(self, columna):
+        """Valores distintos de una dimensión, ordenados"""
+        return self._distintos(columna)
+
+    # --- Visión general ---
+
+    def distribucion_regiones(self):
+        return self._agregar('Region').rename(columns={'Filas': 'count'})
+
+    def licitaciones_por_categoria(self):
+        conteo = self._agregar('CategoriaOrganismo').sort_values('Filas', ascending=False)
+        return conteo.rename(columns={'Filas': 'count'})
+
+    def evolucion_anual(self):
+        return self._agregar('Año', ['Licitaciones', 'Monto']).rename(
+            columns={'Licitaciones': 'Cantidad', 'Monto': 'Monto_CLP_Millones'})
+
+    # --- Análisis regional ---
+
+    def top_organismos_por_cantidad(self, n=10):
+        """Serie Organismo -> licitaciones, como value_counts().head(n)"""
+        conteo = self._agregar('Organismo').set_index('Organismo')['Filas']
+        return conteo.sort_values(ascending=False, kind='stable').head(n)
+
+    def licitaciones_por_año(self):
+        return self._agregar('Año').rename(columns={'Filas': 'Cantidad'})
+
+    def mapa_calor_mensual(self):
+        return self._agregar(['Año', 'MesNombre']).rename(columns={'Filas': 'Cantidad'})
+
+    # --- Análisis por organismo ---
+
+    def top_organismos(self, n=20):
+        """Ranking de organismos por cantidad con su monto total"""
+        ranking = self._agregar('Organismo', ['Licitaciones', 'Monto']).round(2).rename(
+            columns={'Licitaciones': 'Cantidad', 'Monto': 'Monto_Total_MM'})
+        return ranking.sort_values('Cantidad', ascending=False).head(n).reset_index(drop=True)
+
+    def concentracion(self, medida='Licitaciones', por=()):
+        """HHI, Gini y participación de los primeros organismos sobre todo el mercado (ver concentracion.py)"""
+        return concentracion.metricas(self._agregar([*por, 'Organismo'], [medida]), por, medida)
+
+    def concentracion_anual(self, medida='Licitaciones'):
+        return self.concentracion(medida, ['Año'])
+
+    def curva_lorenz(self, medida='Licitaciones'):
+        return concentracion.lorenz(self._agregar('Organismo', [medida]), (), medida)
+
+    # --- Tendencia temporal ---
+
+    def tendencia_mensual(self):
+        tendencia = self._agregar(['Año', 'Mes']).rename(columns={'Filas': 'Cantidad'})
+        tendencia['Fecha'] = (tendencia['Año'].astype(int).astype(str) + '-' +
+                              tendencia['Mes'].astype(int).astype(str).str.zfill(2))
+        return tendencia
+
+    def trimestres(self):
+        trimestres = self._agregar(['Año', 'Trimestre']).rename(columns={'Filas': 'Cantidad'})
+        trimestres['Año-Trim'] = trimestres['Año'].astype(str) + '-T' + trimestres['Trimestre'].astype(str)
+        return trimestres
+
+    def estacionalidad(self):
+        return self._agregar('MesNombre').rename(columns={'Filas': 'Cantidad'})
+
+    def crecimiento_interanual(self):
+        yoy = self.licitaciones_por_año()
+        yoy['Crecimiento %'] = yoy['Cantidad'].pct_change() * 100
+        return yoy
+
+
+def crear_tablero(df, celdas=None, motor=MOTOR):
+    """Tablero con el motor de consultas configurado"""
+    if motor == 'duckdb':
+        from motor_duckdb import TableroDuckDB
+        return TableroDuckDB(df)
+    return Tablero(df, celdas)
@@ -0,0 +1,131 @@
+"""
+Instrumentación por etapas de cada ejecución del dashboard
+
+Las etapas del camino caliente (lectura del CSV, fechas, clasificación, filtros, pestañas,
+figuras, tabla) se envuelven en `with etapa('nombre'):`. Solo se registran cuando hay una
+Traza activa en el hilo actual; si no, etapa() solo consulta una variable de contexto.
+
+La memoria es la residente del proceso (compartida por todas las sesiones): su delta
+por etapa es orientativo.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Activa el panel de diagnóstico por defecto en todas las sesiones
+TRAZAS_POR_DEFECTO = os.environ.get('LICITACIONES_TRAZAS', '') not in ('', '0')
+
+PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+_traza_actual = contextvars.ContextVar('traza_actual', default=None)
+
+
+def memoria_residente():
+    """Memoria residente actual del proceso en bytes (Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGINA
+    except OSError:
+        return 0
+
+
+class Registro:
+    """Datos de una etapa; filas puede asignarse dentro del bloque, cuando se conoce"""
+
+    __slots__ = ('nombre', 'inicio', 'duracion', 'filas', 'memoria', 'profundidad', 'hilo')
+
+    def __init__(self, nombre, filas=None, profundidad=0):
+        self.nombre = nombre
+        self.filas = filas
+        self.profundidad = profundidad
+        self.hilo = threading.get_ident()
+        self.inicio = self.duracion = self.memoria = 0
+
+
+class _RegistroNulo:
+    """Destino de las asignaciones cuando no hay traza activa"""
+
+    __slots__ = ('filas',)
+
+
+_NULO = _RegistroNulo()
+
+
+class Traza:
+    """Etapas de una ejecución, en el orden en que terminan; se activa con activar()"""
+
+    def __init__(self):
+        self.origen = time.perf_counter()
+        self.etapas = []
+        self._profundidad = 0
+
+    def tabla(self):
+        """Una fila por etapa, con tiempos en milisegundos y memoria en MB"""
+        return pd.DataFrame([{
+            'etapa': '  ' * registro.profundidad + registro.nombre,
+            'ms': registro.duracion * 1000,
+            'filas': registro.filas,
+            'memoria_MB': registro.memoria / 1024 / 1024,
+        } for registro in sorted(self.etapas, key=lambda registro: registro.inicio)], columns=['etapa', 'ms', 'filas', 'memoria_MB']).astype({'filas': 'Int64'})
+
+    def a_json(self):
+        return json.dumps([{
+            'etapa': registro.nombre,
+            'inicio_ms': registro.inicio * 1000,
+            'duracion_ms': registro.duracion * 1000,
+            'filas': registro.filas,
+            'memoria_bytes': registro.memoria,
+            'profundidad': registro.profundidad,
+        } for registro in self.etapas], ensure_ascii=False, indent=2)
+
+    def a_chrome_trace(self):
+        """Formato Trace Event (chrome://tracing, Perfetto): un evento completo por etapa"""
+        eventos = [{
+            'name': registro.nombre,
+            'ph': 'X',
+            'ts': registro.inicio * 1e6,
+            'dur': registro.duracion * 1e6,
+            'pid': os.getpid(),
+            'tid': registro.hilo,
+            'args': {'filas': registro.filas, 'memoria_bytes': registro.memoria},
+        } for registro in self.etapas]
+        return json.dumps({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, ensure_ascii=False)
+
+
+def activar(traza):
+    """
+    Fija la traza del hilo actual (None la desactiva)
+    - Se llama al inicio de cada ejecución: así no queda activa la de una ejecución anterior
+    """
+    _traza_actual.set(traza)
+
+
+@contextmanager
+def etapa(nombre, filas=None):
+    """
+    Mide una etapa si hay una Traza activa
+    - Entrega un registro donde puede fijarse filas al conocerlas
+    """
+    traza = _traza_actual.get()
+    if traza is None:
+        yield _NULO
+        return
+    registro = Registro(nombre, filas, traza._profundidad)
+    traza._profundidad += 1
+    memoria = memoria_residente()
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        fin = time.perf_counter()
+        traza._profundidad -= 1
+        registro.inicio = inicio - traza.origen
+        registro.duracion = fin - inicio
+        registro.memoria = memoria_residente() - memoria
+        registro.filas = None if registro.filas is None else int(registro.filas)
+        traza.etapas.append(registro)